@@ -5,6 +5,7 @@ Perfect Community Coordinates - Fix trailing spaces and complete mapping
 
 import pandas as pd
 from pathlib import Path
+import sys
 
 def get_perfect_dubai_coordinates():
     """Perfect coordinate mapping for ALL Dubai communities - handles trailing spaces"""
@@ -350,3 +351,7 @@ def main():
 
 if __name__ == "__main__":
     result = main()
+    
+    # Exit non-zero on failure so the pipeline runner does not record the stage as done
+    if result is None:
+        sys.exit(1)
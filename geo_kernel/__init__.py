@@ -0,0 +1,14 @@
+"""
+Shared geo kernel for the school selection platform
+Batched great-circle distances plus nearest-k and within-radius primitives,
+tiled and process-sharded reductions, and BallTree spatial indexes, used by
+every stage instead of per-pair distance loops
+"""
+
+from .haversine import EARTH_RADIUS_KM, haversine_distance, haversine_distance_matrix
+from .neighbors import (nearest, nearest_k, within_radius_counts, within_radius_pairs,
+                        sort_distance_rows, sort_weighted_distance_rows, sort_csr_rows, sum_csr_rows,
+                        build_radius_index, count_within_sorted, sum_within_sorted)
+from .blocked import tile_shape_for_budget, reduce_distances_blocked
+from .parallel import run_sharded, merge_shard_reductions, reduce_distances_sharded, distance_matrix_sharded
+from .index import build_spatial_index, query_spatial_index, query_spatial_index_pairs
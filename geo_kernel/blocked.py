@@ -0,0 +1,90 @@
+"""
+Tiled reduction of a point set against a target set under a memory budget,
+without materializing the full distance block
+"""
+
+import numpy as np
+from .haversine import haversine_distance_matrix
+
+def tile_shape_for_budget(n_points, n_targets, max_memory_mb):
+    """
+    Pick a (points, targets) tile whose haversine working set fits in
+    max_memory_mb. About six float64 arrays of tile size are alive at once
+    """
+    tile_elements = max(1, int(max_memory_mb * 1024 * 1024) // (8 * 6))
+    target_tile = max(1, min(n_targets, tile_elements))
+    point_tile = max(1, min(n_points, tile_elements // target_tile))
+    
+    return point_tile, target_tile
+
+def require_targets(n_targets):
+    """Nearest-target reductions are undefined without targets; fail before any tiles or pools are built"""
+    if n_targets == 0:
+        raise ValueError("Distance reduction needs at least one target")
+
+def reduce_distances_blocked(lats, lons, target_lats, target_lons, max_memory_mb, cutoff_km, radii_km):
+    """
+    Stream point tiles against target tiles and reduce each tile on the fly
+    to nearest target, radius counts, distance sums and pairs within cutoff_km
+    Peak memory is set by max_memory_mb instead of the full point x target block
+    Returns (sparse_pairs, nearest_km, within_counts); sparse_pairs holds the
+    CSR pairs (indptr, indices, distances) and per-point nearest_id, nearest_km
+    and mean_km vectors
+    """
+    n_points, n_targets = len(lats), len(target_lats)
+    require_targets(n_targets)
+    point_tile, target_tile = tile_shape_for_budget(n_points, n_targets, max_memory_mb)
+    
+    nearest_km = np.full(n_points, np.inf)
+    nearest_id = np.zeros(n_points, dtype=np.int32)
+    sum_km = np.zeros(n_points)
+    within_counts = {radius: np.zeros(n_points, dtype=np.int64) for radius in radii_km}
+    # Seeded with empty arrays so no points (no tiles) still yields an empty CSR
+    pair_point = [np.empty(0, dtype=np.int64)]
+    pair_target = [np.empty(0, dtype=np.int64)]
+    pair_distance = [np.empty(0, dtype=np.float32)]
+    
+    for p0 in range(0, n_points, point_tile):
+        p1 = min(n_points, p0 + point_tile)
+        
+        for t0 in range(0, n_targets, target_tile):
+            t1 = min(n_targets, t0 + target_tile)
+            tile = haversine_distance_matrix(lats[p0:p1], lons[p0:p1],
+                                             target_lats[t0:t1], target_lons[t0:t1])
+            
+            # Nearest: strict < keeps the first target on ties, as argmin does
+            tile_arg = tile.argmin(axis=1)
+            tile_min = tile[np.arange(p1 - p0), tile_arg]
+            closer = tile_min < nearest_km[p0:p1]
+            nearest_km[p0:p1][closer] = tile_min[closer]
+            nearest_id[p0:p1][closer] = tile_arg[closer] + t0
+            
+            sum_km[p0:p1] += tile.sum(axis=1)
+            for radius in radii_km:
+                within_counts[radius][p0:p1] += np.count_nonzero(tile <= radius, axis=1)
+            
+            rows, cols = np.nonzero(tile <= cutoff_km)
+            pair_point.append(rows + p0)
+            pair_target.append(cols + t0)
+            pair_distance.append(tile[rows, cols].astype(np.float32))
+    
+    # Regroup the within-cutoff pairs by point into CSR layout
+    pair_point = np.concatenate(pair_point)
+    pair_target = np.concatenate(pair_target)
+    pair_distance = np.concatenate(pair_distance)
+    order = np.lexsort((pair_target, pair_point))
+    indptr = np.zeros(n_points + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pair_point, minlength=n_points), out=indptr[1:])
+    
+    sparse_pairs = {
+        'cutoff_km': np.float32(cutoff_km),
+        'n_facilities': np.int64(n_targets),
+        'indptr': indptr,
+        'indices': pair_target[order].astype(np.int32),
+        'distances': pair_distance[order],
+        'nearest_id': nearest_id,
+        'nearest_km': nearest_km.astype(np.float32),
+        'mean_km': (sum_km / n_targets).astype(np.float32)
+    }
+    
+    return sparse_pairs, nearest_km, within_counts
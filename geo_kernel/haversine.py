@@ -0,0 +1,47 @@
+"""
+Great-circle (haversine) distances in kilometers between points given in
+decimal degrees, for one pair or for every pair of two point sets
+"""
+
+from math import radians, cos, sin, asin, sqrt
+import numpy as np
+
+# Radius of earth in kilometers
+EARTH_RADIUS_KM = 6371
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """
+    Calculate the great circle distance between two points 
+    on the earth (specified in decimal degrees)
+    Returns distance in kilometers
+    """
+    # Convert decimal degrees to radians
+    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    
+    # Haversine formula
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+    c = 2 * asin(sqrt(a))
+    
+    return c * EARTH_RADIUS_KM
+
+def haversine_distance_matrix(lats1, lons1, lats2, lons2):
+    """
+    Calculate the great circle distance between every point in the first set
+    and every point in the second set (specified in decimal degrees)
+    Returns an (n1, n2) array of distances in kilometers
+    """
+    # Convert decimal degrees to radians and broadcast rows against columns
+    lat1 = np.radians(np.asarray(lats1, dtype=float))[:, np.newaxis]
+    lon1 = np.radians(np.asarray(lons1, dtype=float))[:, np.newaxis]
+    lat2 = np.radians(np.asarray(lats2, dtype=float))[np.newaxis, :]
+    lon2 = np.radians(np.asarray(lons2, dtype=float))[np.newaxis, :]
+    
+    # Haversine formula
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
+    c = 2 * np.arcsin(np.sqrt(a))
+    
+    return c * EARTH_RADIUS_KM
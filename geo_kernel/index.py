@@ -0,0 +1,72 @@
+"""
+BallTree spatial indexes over (latitude, longitude) points for nearest and
+radius-count queries without a full distance block
+"""
+
+import numpy as np
+from .haversine import EARTH_RADIUS_KM
+
+def build_spatial_index(coords):
+    """
+    Build a BallTree over (latitude, longitude) points in decimal degrees
+    The tree uses the haversine metric, so query radii are in radians
+    (distance_km / EARTH_RADIUS_KM) and returned distances must be scaled by it
+    """
+    from sklearn.neighbors import BallTree
+    
+    return BallTree(np.radians(coords), metric='haversine')
+
+def query_spatial_index(spatial_index, coords, radii_km):
+    """
+    Find the nearest indexed point and count indexed points within each radius
+    for every (latitude, longitude) query point in decimal degrees
+    """
+    tree = spatial_index['tree']
+    earth_radius_km = spatial_index.get('earth_radius_km', EARTH_RADIUS_KM)
+    query_points = np.radians(np.asarray(coords, dtype=float))
+    
+    # Haversine BallTree works in radians on the unit sphere
+    nearest_distance, nearest_index = tree.query(query_points, k=1)
+    
+    within_counts = {}
+    for radius in radii_km:
+        within_counts[radius] = tree.query_radius(query_points, r=radius / earth_radius_km, count_only=True)
+    
+    return {
+        'nearest_index': nearest_index[:, 0],
+        'nearest_distance_km': nearest_distance[:, 0] * earth_radius_km,
+        'within_counts': within_counts
+    }
+
+def query_spatial_index_pairs(spatial_index, coords, cutoff_km):
+    """
+    Every indexed point within cutoff_km of each query point as CSR pairs
+    (ordered by indexed point within each row) plus nearest_id / nearest_km,
+    in the layout of reduce_distances_blocked. The mean over all indexed points
+    needs every pair, which an index query never forms, so mean_km is NaN
+    """
+    tree = spatial_index['tree']
+    earth_radius_km = spatial_index.get('earth_radius_km', EARTH_RADIUS_KM)
+    query_points = np.radians(np.asarray(coords, dtype=float))
+    n_points = len(query_points)
+    
+    row_indices, row_distances = tree.query_radius(query_points, r=cutoff_km / earth_radius_km, return_distance=True)
+    nearest_distance, nearest_index = tree.query(query_points, k=1)
+    
+    pair_point = np.repeat(np.arange(n_points), [len(row) for row in row_indices])
+    pair_target = np.concatenate(list(row_indices)).astype(np.int64) if n_points else np.empty(0, dtype=np.int64)
+    pair_distance = np.concatenate(list(row_distances)) * earth_radius_km if n_points else np.empty(0)
+    order = np.lexsort((pair_target, pair_point))
+    indptr = np.zeros(n_points + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pair_point, minlength=n_points), out=indptr[1:])
+    
+    return {
+        'cutoff_km': np.float32(cutoff_km),
+        'n_facilities': np.int64(spatial_index.get('n_points', tree.data.shape[0])),
+        'indptr': indptr,
+        'indices': pair_target[order].astype(np.int32),
+        'distances': pair_distance[order].astype(np.float32),
+        'nearest_id': nearest_index[:, 0].astype(np.int32),
+        'nearest_km': (nearest_distance[:, 0] * earth_radius_km).astype(np.float32),
+        'mean_km': np.full(n_points, np.nan, dtype=np.float32)
+    }
@@ -0,0 +1,136 @@
+"""
+Nearest-k and within-radius queries over an (n_points, n_targets) distance block
+"""
+
+import numpy as np
+
+def nearest(distance_matrix):
+    """Nearest target id and distance per row; the first target wins ties"""
+    distance_matrix = np.asarray(distance_matrix)
+    nearest_id = distance_matrix.argmin(axis=1)
+    
+    return nearest_id, distance_matrix[np.arange(len(nearest_id)), nearest_id]
+
+def nearest_k(distance_matrix, k):
+    """
+    The k nearest target ids and distances per row, closest first
+    Uses a partial sort, so only the k selected columns are fully ordered;
+    when several targets tie at the k-th distance any of them may be kept
+    """
+    distance_matrix = np.asarray(distance_matrix)
+    k = min(k, distance_matrix.shape[1])
+    rows = np.arange(distance_matrix.shape[0])[:, np.newaxis]
+    
+    if k < distance_matrix.shape[1]:
+        candidates = np.argpartition(distance_matrix, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(k), (len(rows), k))
+    
+    # Order the candidates by distance, then by id so equal distances keep target order
+    candidate_km = distance_matrix[rows, candidates]
+    order = np.lexsort((candidates, candidate_km), axis=1)
+    nearest_ids = candidates[rows, order]
+    
+    return nearest_ids, distance_matrix[rows, nearest_ids]
+
+def within_radius_counts(distance_matrix, radii_km):
+    """Number of targets within each radius per row, as a radius -> counts dict"""
+    distance_matrix = np.asarray(distance_matrix)
+    
+    return {radius: np.count_nonzero(distance_matrix <= radius, axis=1) for radius in radii_km}
+
+def within_radius_pairs(distance_matrix, cutoff_km):
+    """
+    Targets within cutoff_km of each row in CSR layout
+    Returns (indptr, indices, distances): row i holds indices[indptr[i]:indptr[i + 1]]
+    """
+    distance_matrix = np.asarray(distance_matrix)
+    within = distance_matrix <= cutoff_km
+    
+    # np.nonzero walks rows in order, so pairs come out grouped by row
+    rows, indices = np.nonzero(within)
+    indptr = np.zeros(distance_matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(within.sum(axis=1), out=indptr[1:])
+    
+    return indptr, indices, distance_matrix[rows, indices]
+
+def sort_distance_rows(distance_matrix):
+    """Every row's distances in ascending order, in CSR layout (indptr, distances)"""
+    distance_matrix = np.asarray(distance_matrix)
+    indptr = np.arange(distance_matrix.shape[0] + 1, dtype=np.int64) * distance_matrix.shape[1]
+    
+    return indptr, np.sort(distance_matrix, axis=1).ravel()
+
+def sort_weighted_distance_rows(distance_matrix, weights):
+    """
+    Every row's distances in ascending order with the target weights carried
+    along, in CSR layout (indptr, distances, weights)
+    """
+    distance_matrix = np.asarray(distance_matrix)
+    order = np.argsort(distance_matrix, axis=1)
+    indptr = np.arange(distance_matrix.shape[0] + 1, dtype=np.int64) * distance_matrix.shape[1]
+    
+    return indptr, np.take_along_axis(distance_matrix, order, axis=1).ravel(), np.asarray(weights)[order].ravel()
+
+def sort_csr_rows(indptr, distances):
+    """Sort the distances inside each row of CSR pairs ascending"""
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    
+    return indptr, distances[np.lexsort((distances, rows))]
+
+def sum_csr_rows(indptr, values):
+    """
+    Per-row sums of CSR values (a vector, or one row of columns per entry);
+    empty rows sum to zero
+    """
+    values = np.asarray(values)
+    sums = np.zeros((len(indptr) - 1,) + values.shape[1:], dtype=values.dtype)
+    
+    # reduceat over the starts of non-empty rows only: each segment then ends where the next row starts
+    nonempty = np.diff(indptr) > 0
+    if nonempty.any():
+        sums[nonempty] = np.add.reduceat(values, indptr[:-1][nonempty], axis=0)
+    
+    return sums
+
+def build_radius_index(indptr, sorted_distances, sorted_weights=None):
+    """
+    Flatten per-row sorted distances into one ascending key array by offsetting
+    row i by i * span, so counts within any radius for all rows are a single
+    np.searchsorted instead of a pass over the distances. With sorted_weights,
+    a running prefix sum makes weighted totals within any radius a lookup too
+    """
+    sorted_distances = np.asarray(sorted_distances)
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    span = np.ceil(float(sorted_distances.max())) + 1.0 if len(sorted_distances) else 1.0
+    
+    radius_index = {
+        'indptr': indptr,
+        'distances': sorted_distances,
+        'span': span,
+        'keys': sorted_distances.astype(np.float64) + rows * span
+    }
+    if sorted_weights is not None:
+        radius_index['prefix'] = np.concatenate([[0], np.cumsum(sorted_weights)])
+    
+    return radius_index
+
+def _radius_ends(radius_index, radius_km):
+    """End offset of each row's distances <= radius_km in a radius index"""
+    span = radius_index['span']
+    
+    # Radii past the largest distance take the whole row without spilling into the next one
+    radius_km = min(float(radius_km), span - 1.0)
+    row_starts = np.arange(len(radius_index['indptr']) - 1) * span
+    
+    return np.searchsorted(radius_index['keys'], row_starts + radius_km, side='right')
+
+def count_within_sorted(radius_index, radius_km):
+    """Number of stored distances <= radius_km per row of a radius index"""
+    return _radius_ends(radius_index, radius_km) - radius_index['indptr'][:-1]
+
+def sum_within_sorted(radius_index, radius_km):
+    """Total weight of targets within radius_km per row of a weighted radius index"""
+    prefix = radius_index['prefix']
+    
+    return prefix[_radius_ends(radius_index, radius_km)] - prefix[radius_index['indptr'][:-1]]
@@ -0,0 +1,104 @@
+"""
+Process-sharded distance work: points are split into contiguous shards across
+a process pool while the target coordinates live once in shared memory
+"""
+
+import numpy as np
+from multiprocessing import Pool, shared_memory
+from .haversine import haversine_distance_matrix
+from .blocked import require_targets, reduce_distances_blocked
+
+# Target coordinates mapped from shared memory inside each pool worker
+_shared_targets = {}
+
+def _attach_shared_targets(shm_name, n_targets):
+    """Pool initializer: map the shared (2, n_targets) coordinate block once per worker"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _shared_targets['shm'] = shm  # keep the mapping alive for the worker's lifetime
+    _shared_targets['coords'] = np.ndarray((2, n_targets), dtype=np.float64, buffer=shm.buf)
+
+def _reduce_shard(task):
+    """Pool task: tiled reduction of one point shard against the shared targets"""
+    lats, lons, max_memory_mb, cutoff_km, radii_km = task
+    target_lats, target_lons = _shared_targets['coords']
+    
+    return reduce_distances_blocked(lats, lons, target_lats, target_lons, max_memory_mb, cutoff_km, radii_km)
+
+def _distance_block_shard(task):
+    """Pool task: dense distance rows of one point shard against the shared targets"""
+    lats, lons = task
+    target_lats, target_lons = _shared_targets['coords']
+    
+    return haversine_distance_matrix(lats, lons, target_lats, target_lons)
+
+def run_sharded(worker_task, lats, lons, target_lats, target_lons, workers, task_args=()):
+    """
+    Shard points across a process pool. Target coordinates are placed in
+    shared memory once instead of being pickled into every task
+    Returns the per-shard results in point order
+    """
+    n_targets = len(target_lats)
+    n_shards = min(workers, len(lats))
+    if n_shards < 1:
+        raise ValueError(f"Cannot shard {len(lats)} points across {workers} workers")
+    shard_bounds = np.linspace(0, len(lats), n_shards + 1).astype(int)
+    
+    shm = shared_memory.SharedMemory(create=True, size=max(1, 2 * n_targets * 8))
+    try:
+        coords = np.ndarray((2, n_targets), dtype=np.float64, buffer=shm.buf)
+        coords[0] = target_lats
+        coords[1] = target_lons
+        
+        tasks = [(lats[p0:p1], lons[p0:p1]) + tuple(task_args)
+                 for p0, p1 in zip(shard_bounds[:-1], shard_bounds[1:])]
+        with Pool(len(tasks), initializer=_attach_shared_targets, initargs=(shm.name, n_targets)) as pool:
+            results = pool.map(worker_task, tasks)
+        del coords
+    finally:
+        shm.close()
+        shm.unlink()
+    
+    return results
+
+def merge_shard_reductions(shard_results, radii_km):
+    """Concatenate per-shard tiled reductions back into one reduction over all points"""
+    shard_pairs = [pairs for pairs, _, _ in shard_results]
+    
+    # Shift each shard's CSR row pointers by the pairs held in earlier shards
+    pair_offsets = np.cumsum([0] + [pairs['indptr'][-1] for pairs in shard_pairs[:-1]])
+    indptr = np.concatenate([[0]] + [pairs['indptr'][1:] + offset for pairs, offset in zip(shard_pairs, pair_offsets)])
+    
+    sparse_pairs = {
+        'cutoff_km': shard_pairs[0]['cutoff_km'],
+        'n_facilities': shard_pairs[0]['n_facilities'],
+        'indptr': indptr.astype(np.int64)
+    }
+    for key in ['indices', 'distances', 'nearest_id', 'nearest_km', 'mean_km']:
+        sparse_pairs[key] = np.concatenate([pairs[key] for pairs in shard_pairs])
+    
+    nearest_km = np.concatenate([km for _, km, _ in shard_results])
+    within_counts = {radius: np.concatenate([counts[radius] for _, _, counts in shard_results]) for radius in radii_km}
+    
+    return sparse_pairs, nearest_km, within_counts
+
+def reduce_distances_sharded(lats, lons, target_lats, target_lons, max_memory_mb, cutoff_km, radii_km, workers):
+    """Tiled reduction of every point against every target, sharded across workers if workers > 1"""
+    coords = [np.asarray(values, dtype=float) for values in (lats, lons, target_lats, target_lons)]
+    require_targets(len(coords[2]))
+    
+    # No points leaves nothing to shard; the in-process reduction returns empty results
+    if workers > 1 and len(coords[0]) > 0:
+        shard_results = run_sharded(_reduce_shard, *coords, workers,
+                                    task_args=(max_memory_mb, cutoff_km, list(radii_km)))
+        return merge_shard_reductions(shard_results, radii_km)
+    
+    return reduce_distances_blocked(*coords, max_memory_mb, cutoff_km, radii_km)
+
+def distance_matrix_sharded(lats, lons, target_lats, target_lons, workers):
+    """Dense point x target distance block computed by point shards across a process pool"""
+    coords = [np.asarray(values, dtype=float) for values in (lats, lons, target_lats, target_lons)]
+    
+    if workers > 1 and len(coords[0]) > 0:
+        return np.vstack(run_sharded(_distance_block_shard, *coords, workers))
+    
+    return haversine_distance_matrix(*coords)
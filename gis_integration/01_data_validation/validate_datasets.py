@@ -1,5 +1,6 @@
 import pandas as pd
 import os
+import sys
 import numpy as np
 from pathlib import Path
 
@@ -110,3 +111,7 @@ def main():
 
 if __name__ == "__main__":
     validation_results = main()
+    
+    # Let the pipeline runner see a failed validation
+    if not all(result["success"] for result in validation_results.values()):
+        sys.exit(1)
@@ -1,8 +1,15 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+import pickle
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+sys.path.append(str(Path(__file__).resolve().parents[1] / '04_distance_calculations'))
+from geo_kernel import EARTH_RADIUS_KM, build_spatial_index
+from distance_store import CATEGORY_FLAGS, category_mask, category_flag_table
+
 def create_spatial_objects():
     """Convert coordinate data to spatial objects and prepare for GIS analysis"""
     print("🌍 CREATING SPATIAL OBJECTS")
@@ -113,9 +120,6 @@ def prepare_for_distance_calculations(schools_df, healthcare_df, metro_df):
     # Create spatial indexes for efficient calculations
     print("Creating spatial data structures...")
     
-    # For now, we'll create simple coordinate arrays
-    # In the next phase, we'll use proper spatial libraries
-    
     schools_coords = schools_df[['latitude', 'longitude']].values
     healthcare_coords = healthcare_df[['Latitude', 'Longitude']].values
     metro_coords = metro_df[['Latitude', 'Longitude']].values
@@ -126,7 +130,105 @@ def prepare_for_distance_calculations(schools_df, healthcare_df, metro_df):
     
     return schools_coords, healthcare_coords, metro_coords
 
-def save_spatial_prepared_data(schools_df, healthcare_df, metro_df, community_df):
+def assign_category_masks(healthcare_df, metro_df):
+    """Resolve facility types and venue categories to integer bitmasks once, here"""
+    print("\n🏷️ ASSIGNING CATEGORY BITMASKS")
+    print("="*60)
+    
+    healthcare_df['Category_Mask'] = category_mask('healthcare', healthcare_df['Type'])
+    metro_df['Category_Mask'] = category_mask('metro', metro_df['Venue_Category'])
+    
+    for kind, df in [('healthcare', healthcare_df), ('metro', metro_df)]:
+        flag_counts = category_flag_table(kind, df['Category_Mask']).sum()
+        print(f"✅ {kind.title()}: " + ", ".join(f"{flag}={count}" for flag, count in flag_counts.items()))
+    
+    return healthcare_df, metro_df
+
+def create_metro_station_index(metro_df):
+    """
+    Collapse (station, venue category) rows to one row per station with its
+    venue count, plus a station x category flag count matrix in the same order
+    """
+    print("\n🚉 CREATING METRO STATION INDEX")
+    print("="*60)
+    
+    metro_stations_df = metro_df.groupby('Station', sort=False).agg(
+        Latitude=('Latitude', 'first'),
+        Longitude=('Longitude', 'first'),
+        Venue_Count=('Venue_Category', 'size')
+    ).reset_index()
+    
+    # Venues per category flag at each station, summed from the per-venue bitmasks
+    venue_flags = category_flag_table('metro', metro_df['Category_Mask'])
+    station_categories_df = venue_flags.groupby(metro_df['Station'].values, sort=False).sum()
+    station_categories_df = station_categories_df.reindex(metro_stations_df['Station'].values)
+    station_categories_df.insert(0, 'Station', metro_stations_df['Station'].values)
+    station_categories_df = station_categories_df.reset_index(drop=True)
+    
+    print(f"✅ {len(metro_df)} venue rows -> {len(metro_stations_df)} stations x "
+          f"{len(CATEGORY_FLAGS['metro'])} category flags")
+    
+    return metro_stations_df, station_categories_df
+
+def load_community_coordinates():
+    """Load community centroids used by the community spatial index"""
+    community_coords_df = pd.read_csv('community_coordinates/community_coordinates/dubai_communities_perfect_coordinates.csv')
+    community_coords_df['Latitude'] = community_coords_df['Latitude'].astype(float)
+    community_coords_df['Longitude'] = community_coords_df['Longitude'].astype(float)
+    print(f"✅ Community coordinates loaded: {len(community_coords_df)} records")
+    
+    return community_coords_df
+
+def create_spatial_indexes(healthcare_coords, metro_coords, community_coords_df):
+    """Create spatial indexes over healthcare, metro and community points"""
+    print("\n🌲 CREATING SPATIAL INDEXES")
+    print("="*60)
+    
+    community_coords = community_coords_df[['Latitude', 'Longitude']].values
+    
+    # Tree row i is row i of the matching source file
+    spatial_indexes = {
+        'healthcare': {
+            'tree': build_spatial_index(healthcare_coords),
+            'source': 'healthcare_spatial_ready.csv',
+            'n_points': len(healthcare_coords)
+        },
+        'metro': {
+            'tree': build_spatial_index(metro_coords),
+            'source': 'metro_stations_spatial_ready.csv',
+            'n_points': len(metro_coords)
+        },
+        'community': {
+            'tree': build_spatial_index(community_coords),
+            'source': 'community_coordinates/community_coordinates/dubai_communities_perfect_coordinates.csv',
+            'n_points': len(community_coords)
+        }
+    }
+    
+    for name, index in spatial_indexes.items():
+        index['metric'] = 'haversine'
+        index['earth_radius_km'] = EARTH_RADIUS_KM
+        print(f"✅ {name.title()} BallTree: {index['n_points']} points")
+    
+    return spatial_indexes
+
+def save_spatial_indexes(spatial_indexes):
+    """Persist spatial indexes for distance calculations, phase2 and dashboards"""
+    print("\n💾 SAVING SPATIAL INDEXES")
+    print("="*60)
+    
+    index_dir = 'gis_integration/03_spatial_preparation/spatial_indexes'
+    os.makedirs(index_dir, exist_ok=True)
+    
+    for name, index in spatial_indexes.items():
+        with open(f'{index_dir}/{name}_balltree.pkl', 'wb') as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    print(f"✅ Spatial indexes saved to: {index_dir}")
+    
+    return index_dir
+
+def save_spatial_prepared_data(schools_df, healthcare_df, metro_df, community_df, metro_stations_df, station_categories_df):
     """Save prepared spatial data for next phase"""
     print("\n💾 SAVING SPATIAL PREPARED DATA")
     print("="*60)
@@ -139,6 +241,8 @@ def save_spatial_prepared_data(schools_df, healthcare_df, metro_df, community_df
     schools_df.to_csv(f'{output_dir}/schools_spatial_ready.csv', index=False)
     healthcare_df.to_csv(f'{output_dir}/healthcare_spatial_ready.csv', index=False)
     metro_df.to_csv(f'{output_dir}/metro_spatial_ready.csv', index=False)
+    metro_stations_df.to_csv(f'{output_dir}/metro_stations_spatial_ready.csv', index=False)
+    station_categories_df.to_csv(f'{output_dir}/metro_station_categories.csv', index=False)
     community_df.to_csv(f'{output_dir}/community_population_spatial_ready.csv', index=False)
     
     print(f"✅ Spatial prepared data saved to: {output_dir}")
@@ -164,8 +268,21 @@ def main():
         schools_df, healthcare_df, metro_df
     )
     
-    # Step 5: Save prepared data
-    output_dir = save_spatial_prepared_data(schools_df, healthcare_df, metro_df, community_df)
+    # Step 5: Category bitmasks, then collapse metro venue rows to unique stations
+    healthcare_df, metro_df = assign_category_masks(healthcare_df, metro_df)
+    metro_stations_df, station_categories_df = create_metro_station_index(metro_df)
+    
+    # Step 6: Build spatial indexes (metro over unique stations)
+    community_coords_df = load_community_coordinates()
+    spatial_indexes = create_spatial_indexes(
+        healthcare_coords, metro_stations_df[['Latitude', 'Longitude']].values, community_coords_df
+    )
+    
+    # Step 7: Save prepared data and indexes
+    output_dir = save_spatial_prepared_data(
+        schools_df, healthcare_df, metro_df, community_df, metro_stations_df, station_categories_df
+    )
+    index_dir = save_spatial_indexes(spatial_indexes)
     
     # Summary report
     print("\n" + "="*60)
@@ -174,8 +291,9 @@ def main():
     
     print(f"✅ Schools: {len(schools_df)} ready for spatial analysis")
     print(f"✅ Healthcare: {len(healthcare_df)} ready for spatial analysis")
-    print(f"✅ Metro: {len(metro_df)} ready for spatial analysis")
+    print(f"✅ Metro: {len(metro_df)} venue rows, {len(metro_stations_df)} stations ready for spatial analysis")
     print(f"✅ Community Population: {len(community_df)} ready for spatial joining")
+    print(f"✅ Spatial indexes: {', '.join(spatial_indexes)} BallTrees persisted")
     
     print(f"\n🎯 Spatial Data Preparation Complete!")
     print(f"🚀 Ready for Step 4: Distance Calculations!")
@@ -184,8 +302,12 @@ def main():
         'schools': schools_df,
         'healthcare': healthcare_df,
         'metro': metro_df,
+        'metro_stations': metro_stations_df,
+        'metro_station_categories': station_categories_df,
         'community': community_df,
-        'output_dir': output_dir
+        'spatial_indexes': spatial_indexes,
+        'output_dir': output_dir,
+        'index_dir': index_dir
     }
 
 if __name__ == "__main__":
@@ -1,178 +1,211 @@
 import pandas as pd
-import numpy as np
 import os
-from math import radians, cos, sin, asin, sqrt
+import sys
+import argparse
+import pickle
+from pathlib import Path
+from distance_store import (build_facility_table, save_distance_store, save_sparse_store, save_category_matrix,
+                            save_sorted_distances, summarize_distance_matrix, category_flag_table)
 
-def haversine_distance(lat1, lon1, lat2, lon2):
-    """
-    Calculate the great circle distance between two points 
-    on the earth (specified in decimal degrees)
-    Returns distance in kilometers
-    """
-    # Convert decimal degrees to radians
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
-    
-    # Radius of earth in kilometers
-    r = 6371
-    return c * r
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from geo_kernel import (distance_matrix_sharded, nearest, within_radius_counts, reduce_distances_sharded,
+                        tile_shape_for_budget, query_spatial_index, query_spatial_index_pairs, sort_distance_rows,
+                        sort_csr_rows)
+from scoring import load_weights, weighted_sum
 
-def calculate_school_to_healthcare_distances(schools_df, healthcare_df):
+# Radius bands (km) reported in the enriched school profiles
+ACCESSIBILITY_RADII_KM = [1.0, 2.0, 5.0]
+
+def calculate_distance_matrix(schools_df, facilities_df, workers=1):
+    """Calculate the school x facility distance block as a NumPy array"""
+    return distance_matrix_sharded(
+        schools_df['latitude'].values, schools_df['longitude'].values,
+        facilities_df['Latitude'].values, facilities_df['Longitude'].values,
+        workers
+    )
+
+def calculate_school_to_healthcare_distances(schools_df, healthcare_df, workers=1):
     """Calculate distances from each school to all healthcare facilities"""
     print("🏥 Calculating School to Healthcare Distances...")
     
-    distances = []
+    distance_matrix = calculate_distance_matrix(schools_df, healthcare_df, workers)
+    print(f"✅ Calculated {distance_matrix.size} school-healthcare distances")
     
-    for _, school in schools_df.iterrows():
-        school_lat, school_lon = school['latitude'], school['longitude']
-        school_name = school['school_name']
-        
-        # Calculate distances to all healthcare facilities
-        for _, facility in healthcare_df.iterrows():
-            facility_lat, facility_lon = facility['Latitude'], facility['Longitude']
-            facility_name = facility['Facility_Name']
-            facility_type = facility['Type']
-            
-            distance = haversine_distance(school_lat, school_lon, facility_lat, facility_lon)
-            
-            distances.append({
-                'school_name': school_name,
-                'facility_name': facility_name,
-                'facility_type': facility_type,
-                'distance_km': distance,
-                'school_lat': school_lat,
-                'school_lon': school_lon,
-                'facility_lat': facility_lat,
-                'facility_lon': facility_lon
-            })
-    
-    distances_df = pd.DataFrame(distances)
-    print(f"✅ Calculated {len(distances_df)} school-healthcare distances")
-    
-    return distances_df
-
-def calculate_school_to_metro_distances(schools_df, metro_df):
+    return distance_matrix
+
+def calculate_school_to_metro_distances(schools_df, metro_df, workers=1):
     """Calculate distances from each school to all metro stations"""
     print("🚇 Calculating School to Metro Distances...")
     
-    distances = []
-    
-    for _, school in schools_df.iterrows():
-        school_lat, school_lon = school['latitude'], school['longitude']
-        school_name = school['school_name']
-        
-        # Calculate distances to all metro stations
-        for _, metro in metro_df.iterrows():
-            metro_lat, metro_lon = metro['Latitude'], metro['Longitude']
-            station_name = metro['Station']
-            venue_category = metro['Venue_Category']
-            
-            distance = haversine_distance(school_lat, school_lon, metro_lat, metro_lon)
-            
-            distances.append({
-                'school_name': school_name,
-                'metro_station': station_name,
-                'venue_category': venue_category,
-                'distance_km': distance,
-                'school_lat': school_lat,
-                'school_lon': school_lon,
-                'metro_lat': metro_lat,
-                'metro_lon': metro_lon
-            })
-    
-    distances_df = pd.DataFrame(distances)
-    print(f"✅ Calculated {len(distances_df)} school-metro distances")
-    
-    return distances_df
-
-def create_enriched_school_profiles(schools_df, healthcare_distances, metro_distances):
-    """Create enriched school profiles with proximity metrics"""
-    print("🏫 Creating Enriched School Profiles...")
+    distance_matrix = calculate_distance_matrix(schools_df, metro_df, workers)
+    print(f"✅ Calculated {distance_matrix.size} school-metro distances")
     
-    enriched_profiles = []
-    
-    for _, school in schools_df.iterrows():
-        school_name = school['school_name']
-        
-        # Get healthcare distances for this school
-        school_healthcare = healthcare_distances[healthcare_distances['school_name'] == school_name]
-        
-        # Get metro distances for this school
-        school_metro = metro_distances[metro_distances['school_name'] == school_name]
-        
-        # Calculate proximity metrics
-        nearest_healthcare = school_healthcare.loc[school_healthcare['distance_km'].idxmin()]
-        nearest_metro = school_metro.loc[school_metro['distance_km'].idxmin()]
+    return distance_matrix
+
+def build_enriched_school_profiles(schools_df, nearest_healthcare, nearest_metro, healthcare_counts, metro_counts):
+    """Create enriched school profiles from per-school nearest pairs and radius counts"""
+    enriched_df = pd.DataFrame({
+        'school_name': schools_df['school_name'].values,
+        'location': schools_df['location'].values,
+        'latitude': schools_df['latitude'].values,
+        'longitude': schools_df['longitude'].values,
+        'grades': schools_df['grades_2014_15'].values,
+        'students': schools_df['students_2014_15'].values,
+        'year_established': schools_df['year_established_in_dubai'].values,
+        'type_of_school': schools_df['type_of_school'].values,
         
-        # Count facilities within different distance ranges
-        healthcare_within_1km = len(school_healthcare[school_healthcare['distance_km'] <= 1.0])
-        healthcare_within_2km = len(school_healthcare[school_healthcare['distance_km'] <= 2.0])
-        healthcare_within_5km = len(school_healthcare[school_healthcare['distance_km'] <= 5.0])
+        # Nearest healthcare
+        'nearest_healthcare_name': nearest_healthcare['facility_name'].values,
+        'nearest_healthcare_type': nearest_healthcare['facility_type'].values,
+        'nearest_healthcare_distance_km': nearest_healthcare['distance_km'].values,
         
-        metro_within_1km = len(school_metro[school_metro['distance_km'] <= 1.0])
-        metro_within_2km = len(school_metro[school_metro['distance_km'] <= 2.0])
-        metro_within_5km = len(school_metro[school_metro['distance_km'] <= 5.0])
+        # Nearest metro
+        'nearest_metro_station': nearest_metro['metro_station'].values,
+        'nearest_metro_distance_km': nearest_metro['distance_km'].values,
         
-        # Create enriched profile
-        enriched_profile = {
-            'school_name': school_name,
-            'location': school['location'],
-            'latitude': school['latitude'],
-            'longitude': school['longitude'],
-            'grades': school['grades_2014_15'],
-            'students': school['students_2014_15'],
-            'year_established': school['year_established_in_dubai'],
-            'type_of_school': school['type_of_school'],
-            
-            # Nearest healthcare
-            'nearest_healthcare_name': nearest_healthcare['facility_name'],
-            'nearest_healthcare_type': nearest_healthcare['facility_type'],
-            'nearest_healthcare_distance_km': nearest_healthcare['distance_km'],
-            
-            # Nearest metro
-            'nearest_metro_station': nearest_metro['metro_station'],
-            'nearest_metro_distance_km': nearest_metro['distance_km'],
-            
-            # Healthcare accessibility
-            'healthcare_within_1km': healthcare_within_1km,
-            'healthcare_within_2km': healthcare_within_2km,
-            'healthcare_within_5km': healthcare_within_5km,
-            
-            # Metro accessibility
-            'metro_within_1km': metro_within_1km,
-            'metro_within_2km': metro_within_2km,
-            'metro_within_5km': metro_within_5km,
-            
-            # Overall accessibility score (lower is better)
-            'accessibility_score': (
-                nearest_healthcare['distance_km'] * 0.4 +  # Healthcare weight
-                nearest_metro['distance_km'] * 0.6         # Metro weight
-            )
-        }
+        # Healthcare accessibility
+        'healthcare_within_1km': healthcare_counts[1.0],
+        'healthcare_within_2km': healthcare_counts[2.0],
+        'healthcare_within_5km': healthcare_counts[5.0],
         
-        enriched_profiles.append(enriched_profile)
+        # Metro accessibility
+        'metro_within_1km': metro_counts[1.0],
+        'metro_within_2km': metro_counts[2.0],
+        'metro_within_5km': metro_counts[5.0]
+    })
+    
+    # Overall accessibility score (lower is better), weighted per scoring/weights.json
+    enriched_df['accessibility_score'] = weighted_sum(enriched_df, load_weights()['accessibility_score'])
+    
+    return enriched_df
+
+def nearest_pairs_from_ids(kind, facilities_df, nearest_id, nearest_km):
+    """Nearest facility per school in the pairwise-table layout, from facility ids"""
+    nearest_pairs = build_facility_table(kind, facilities_df).iloc[nearest_id].reset_index(drop=True)
+    nearest_pairs['distance_km'] = nearest_km
     
-    enriched_df = pd.DataFrame(enriched_profiles)
+    return nearest_pairs
+
+def create_enriched_school_profiles(schools_df, healthcare_df, metro_df, healthcare_matrix, metro_matrix):
+    """Create enriched school profiles with proximity metrics straight from the distance matrices"""
+    print("🏫 Creating Enriched School Profiles...")
+    
+    nearest_healthcare = nearest_pairs_from_ids('healthcare', healthcare_df, *nearest(healthcare_matrix))
+    nearest_metro = nearest_pairs_from_ids('metro', metro_df, *nearest(metro_matrix))
+    
+    enriched_df = build_enriched_school_profiles(
+        schools_df, nearest_healthcare, nearest_metro,
+        within_radius_counts(healthcare_matrix, ACCESSIBILITY_RADII_KM),
+        within_radius_counts(metro_matrix, ACCESSIBILITY_RADII_KM)
+    )
     print(f"✅ Created enriched profiles for {len(enriched_df)} schools")
     
     return enriched_df
 
-def save_distance_data(healthcare_distances, metro_distances, enriched_profiles):
-    """Save all distance calculation results"""
+def load_spatial_index(name):
+    """Load a spatial index persisted by the spatial preparation step"""
+    with open(f'gis_integration/03_spatial_preparation/spatial_indexes/{name}_balltree.pkl', 'rb') as f:
+        return pickle.load(f)
+
+def create_enriched_school_profiles_from_indexes(schools_df, healthcare_df, metro_df, cutoff_km=5.0):
+    """
+    Create enriched school profiles with proximity metrics from the spatial indexes
+    Also returns the within-cutoff_km pairs per facility class for the sparse store
+    """
+    print("🌲 Querying spatial indexes for nearest facilities and radius counts...")
+    
+    school_coords = schools_df[['latitude', 'longitude']].values
+    healthcare_index = load_spatial_index('healthcare')
+    metro_index = load_spatial_index('metro')
+    healthcare_summary = query_spatial_index(healthcare_index, school_coords, ACCESSIBILITY_RADII_KM)
+    metro_summary = query_spatial_index(metro_index, school_coords, ACCESSIBILITY_RADII_KM)
+    healthcare_pairs = query_spatial_index_pairs(healthcare_index, school_coords, cutoff_km)
+    metro_pairs = query_spatial_index_pairs(metro_index, school_coords, cutoff_km)
+    
+    nearest_healthcare = nearest_pairs_from_ids(
+        'healthcare', healthcare_df, healthcare_summary['nearest_index'], healthcare_summary['nearest_distance_km']
+    )
+    nearest_metro = nearest_pairs_from_ids(
+        'metro', metro_df, metro_summary['nearest_index'], metro_summary['nearest_distance_km']
+    )
+    
+    enriched_df = build_enriched_school_profiles(
+        schools_df, nearest_healthcare, nearest_metro,
+        healthcare_summary['within_counts'], metro_summary['within_counts']
+    )
+    print(f"✅ Created enriched profiles for {len(enriched_df)} schools")
+    
+    return enriched_df, healthcare_pairs, metro_pairs
+
+def reduce_school_distances(schools_df, facilities_df, max_memory_mb, cutoff_km=5.0, workers=1):
+    """Tiled reduction of every school against every facility, sharded across workers if workers > 1"""
+    return reduce_distances_sharded(
+        schools_df['latitude'].values, schools_df['longitude'].values,
+        facilities_df['Latitude'].values, facilities_df['Longitude'].values,
+        max_memory_mb, cutoff_km, ACCESSIBILITY_RADII_KM, workers
+    )
+
+def create_enriched_school_profiles_blocked(schools_df, healthcare_df, metro_df, max_memory_mb, cutoff_km=5.0, workers=1):
+    """Create enriched school profiles with tiled distance reductions under a memory budget"""
+    school_tile, facility_tile = tile_shape_for_budget(len(schools_df), len(healthcare_df), max_memory_mb)
+    print(f"🧱 Reducing distances in tiles of {school_tile} schools x {facility_tile} facilities "
+          f"({max_memory_mb} MB budget per worker, {workers} worker(s))...")
+    
+    healthcare_pairs, healthcare_km, healthcare_counts = reduce_school_distances(
+        schools_df, healthcare_df, max_memory_mb, cutoff_km, workers
+    )
+    metro_pairs, metro_km, metro_counts = reduce_school_distances(
+        schools_df, metro_df, max_memory_mb, cutoff_km, workers
+    )
+    
+    nearest_healthcare = nearest_pairs_from_ids('healthcare', healthcare_df, healthcare_pairs['nearest_id'], healthcare_km)
+    nearest_metro = nearest_pairs_from_ids('metro', metro_df, metro_pairs['nearest_id'], metro_km)
+    
+    enriched_df = build_enriched_school_profiles(
+        schools_df, nearest_healthcare, nearest_metro, healthcare_counts, metro_counts
+    )
+    print(f"✅ Created enriched profiles for {len(enriched_df)} schools")
+    
+    return enriched_df, healthcare_pairs, metro_pairs
+
+def save_sorted_pairs(kind, sparse_pairs):
+    """Persist per-school sorted distances of CSR within-cutoff pairs (valid up to the cutoff)"""
+    indptr, sorted_distances = sort_csr_rows(sparse_pairs['indptr'], sparse_pairs['distances'])
+    save_sorted_distances(kind, indptr, sorted_distances, sparse_pairs['cutoff_km'])
+
+def save_distance_data(enriched_profiles, schools_df, healthcare_df, metro_df, station_categories_df,
+                       healthcare_matrix=None, metro_matrix=None, storage='dense', cutoff_km=5.0):
+    """
+    Save all distance calculation results
+    storage='dense' keeps every school x facility distance, storage='sparse'
+    keeps pairs within cutoff_km plus per-school nearest and mean distances.
+    Healthcare and metro category flag matrices are stored alongside for category counts
+    """
     print("\n💾 Saving Distance Calculation Results...")
     
     # Create output directory
     output_dir = 'gis_integration/04_distance_calculations/distance_results'
     os.makedirs(output_dir, exist_ok=True)
     
-    # Save detailed distance data
-    healthcare_distances.to_csv(f'{output_dir}/school_to_healthcare_distances.csv', index=False)
-    metro_distances.to_csv(f'{output_dir}/school_to_metro_distances.csv', index=False)
+    # Save detailed distance data (not produced in index mode)
+    for kind, distance_matrix, facilities_df in [('healthcare', healthcare_matrix, healthcare_df),
+                                                 ('metro', metro_matrix, metro_df)]:
+        if distance_matrix is None:
+            continue
+        if storage == 'sparse':
+            sparse_pairs = summarize_distance_matrix(distance_matrix, cutoff_km)
+            save_sparse_store(kind, sparse_pairs, schools_df, facilities_df)
+            save_sorted_pairs(kind, sparse_pairs)
+            print(f"✅ {kind.title()}: {len(sparse_pairs['indices']):,} of {distance_matrix.size:,} pairs within {cutoff_km:g} km stored")
+        else:
+            save_distance_store(kind, distance_matrix, schools_df, facilities_df)
+            save_sorted_distances(kind, *sort_distance_rows(distance_matrix))
+    
+    # Facility x category flag matrices for type / venue breakdowns
+    save_category_matrix('healthcare', pd.concat(
+        [healthcare_df[['Facility_Name']], category_flag_table('healthcare', healthcare_df['Category_Mask'])], axis=1
+    ))
+    save_category_matrix('metro', station_categories_df)
     
     # Save enriched school profiles
     enriched_profiles.to_csv(f'{output_dir}/enriched_school_profiles.csv', index=False)
@@ -180,9 +213,9 @@ def save_distance_data(healthcare_distances, metro_distances, enriched_profiles)
     # Save summary statistics
     summary_stats = {
         'total_schools': len(enriched_profiles),
-        'total_healthcare_facilities': len(healthcare_distances['facility_name'].unique()),
-        'total_metro_stations': len(metro_distances['metro_station'].unique()),
-        'total_distance_calculations': len(healthcare_distances) + len(metro_distances)
+        'total_healthcare_facilities': healthcare_df['Facility_Name'].nunique(),
+        'total_metro_stations': metro_df['Station'].nunique(),
+        'total_distance_calculations': len(enriched_profiles) * (len(healthcare_df) + len(metro_df))
     }
     
     summary_df = pd.DataFrame([summary_stats])
@@ -192,8 +225,16 @@ def save_distance_data(healthcare_distances, metro_distances, enriched_profiles)
     
     return output_dir
 
-def main():
-    """Main distance calculation function"""
+def main(mode='pairwise', storage='dense', cutoff_km=5.0, max_memory_mb=256, workers=1):
+    """
+    Main distance calculation function
+    mode='pairwise' stores school x facility distances (dense, or sparse pairs
+    within cutoff_km), mode='blocked' streams tiles under max_memory_mb and
+    stores sparse pairs, mode='index' answers nearest and radius-count queries
+    from the spatial indexes and stores the sparse pairs within cutoff_km from a
+    radius query (mean distances are not available and are stored as NaN).
+    workers > 1 shards schools across processes
+    """
     print("📏 DISTANCE CALCULATIONS FOR SCHOOL SELECTION PLATFORM")
     print("="*70)
     
@@ -201,23 +242,45 @@ def main():
     print("📊 Loading spatial prepared data...")
     schools_df = pd.read_csv('gis_integration/03_spatial_preparation/spatial_prepared_data/schools_spatial_ready.csv')
     healthcare_df = pd.read_csv('gis_integration/03_spatial_preparation/spatial_prepared_data/healthcare_spatial_ready.csv')
-    metro_df = pd.read_csv('gis_integration/03_spatial_preparation/spatial_prepared_data/metro_spatial_ready.csv')
+    # One row per station: distances are computed once per station, not per venue row
+    metro_df = pd.read_csv('gis_integration/03_spatial_preparation/spatial_prepared_data/metro_stations_spatial_ready.csv')
+    station_categories_df = pd.read_csv('gis_integration/03_spatial_preparation/spatial_prepared_data/metro_station_categories.csv')
     
     print(f"✅ Schools: {len(schools_df)}")
     print(f"✅ Healthcare: {len(healthcare_df)}")
-    print(f"✅ Metro: {len(metro_df)}")
-    
-    # Step 1: Calculate school to healthcare distances
-    healthcare_distances = calculate_school_to_healthcare_distances(schools_df, healthcare_df)
-    
-    # Step 2: Calculate school to metro distances
-    metro_distances = calculate_school_to_metro_distances(schools_df, metro_df)
+    print(f"✅ Metro: {len(metro_df)} stations ({metro_df['Venue_Count'].sum()} venue rows)")
     
-    # Step 3: Create enriched school profiles
-    enriched_profiles = create_enriched_school_profiles(schools_df, healthcare_distances, metro_distances)
+    if mode in ('index', 'blocked'):
+        # Steps 1-3: only within-cutoff pairs are ever kept, from index radius queries or tiled reductions
+        healthcare_matrix = None
+        metro_matrix = None
+        if mode == 'index':
+            enriched_profiles, healthcare_pairs, metro_pairs = create_enriched_school_profiles_from_indexes(
+                schools_df, healthcare_df, metro_df, cutoff_km
+            )
+        else:
+            enriched_profiles, healthcare_pairs, metro_pairs = create_enriched_school_profiles_blocked(
+                schools_df, healthcare_df, metro_df, max_memory_mb, cutoff_km, workers
+            )
+        save_sparse_store('healthcare', healthcare_pairs, schools_df, healthcare_df)
+        save_sparse_store('metro', metro_pairs, schools_df, metro_df)
+        save_sorted_pairs('healthcare', healthcare_pairs)
+        save_sorted_pairs('metro', metro_pairs)
+    else:
+        # Step 1: Calculate school to healthcare distances
+        healthcare_matrix = calculate_school_to_healthcare_distances(schools_df, healthcare_df, workers)
+        
+        # Step 2: Calculate school to metro distances
+        metro_matrix = calculate_school_to_metro_distances(schools_df, metro_df, workers)
+        
+        # Step 3: Create enriched school profiles
+        enriched_profiles = create_enriched_school_profiles(
+            schools_df, healthcare_df, metro_df, healthcare_matrix, metro_matrix
+        )
     
     # Step 4: Save all results
-    output_dir = save_distance_data(healthcare_distances, metro_distances, enriched_profiles)
+    output_dir = save_distance_data(enriched_profiles, schools_df, healthcare_df, metro_df, station_categories_df,
+                                    healthcare_matrix, metro_matrix, storage=storage, cutoff_km=cutoff_km)
     
     # Summary report
     print("\n" + "="*70)
@@ -227,17 +290,42 @@ def main():
     print(f"🏫 Schools analyzed: {len(schools_df)}")
     print(f"🏥 Healthcare facilities: {len(healthcare_df)}")
     print(f"🚇 Metro stations: {len(metro_df)}")
-    print(f"📏 Total distance calculations: {len(healthcare_distances) + len(metro_distances):,}")
+    if mode == 'index':
+        print(f"🌲 Spatial index queries: {len(schools_df) * (len(ACCESSIBILITY_RADII_KM) + 1) * 2:,}")
+    elif mode == 'blocked':
+        print(f"📏 Total distance calculations: {len(schools_df) * (len(healthcare_df) + len(metro_df)):,} (tiled)")
+    else:
+        print(f"📏 Total distance calculations: {healthcare_matrix.size + metro_matrix.size:,}")
     
     print(f"\n🎯 Distance Calculations Complete!")
     print(f"🚀 Ready for Step 5: Data Integration!")
     
     return {
-        'healthcare_distances': healthcare_distances,
-        'metro_distances': metro_distances,
+        'healthcare_matrix': healthcare_matrix,
+        'metro_matrix': metro_matrix,
         'enriched_profiles': enriched_profiles,
         'output_dir': output_dir
     }
 
 if __name__ == "__main__":
-    results = main()
+    parser = argparse.ArgumentParser(description="Distance calculations for the school selection platform")
+    parser.add_argument('--mode', choices=['pairwise', 'blocked', 'index'], default='pairwise',
+                        help="'blocked' streams tiles under --max-memory-mb and always stores sparse pairs, "
+                             "'index' queries the spatial indexes; both store sparse pairs within --cutoff-km")
+    parser.add_argument('--storage', choices=['dense', 'sparse'], default=None,
+                        help="'sparse' stores only pairs within --cutoff-km plus per-school nearest/mean vectors "
+                             "(default: dense in pairwise mode; blocked and index modes are always sparse)")
+    parser.add_argument('--cutoff-km', type=float, default=5.0,
+                        help="distance cutoff for sparse storage (downstream stages need at least 5 km)")
+    parser.add_argument('--max-memory-mb', type=float, default=256,
+                        help="working memory budget per worker that sets the tile size in blocked mode")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="shard schools across this many processes (pairwise and blocked modes)")
+    args = parser.parse_args()
+    
+    # Blocked and index modes never hold the full matrix, so they cannot store it
+    if args.mode != 'pairwise' and args.storage == 'dense':
+        parser.error(f"--storage dense is not available in {args.mode} mode, which only keeps pairs within --cutoff-km")
+    
+    results = main(mode=args.mode, storage=args.storage or 'dense', cutoff_km=args.cutoff_km,
+                   max_memory_mb=args.max_memory_mb, workers=args.workers)
@@ -0,0 +1,276 @@
+"""
+Compact binary storage for school x facility distances
+Either a dense float32 distance matrix (.npy) or CSR pairs within a cutoff plus
+per-school nearest/mean vectors (.npz), with small school and facility id tables,
+loaded by downstream stages instead of parsing pairwise CSV tables.
+Per-school sorted distances (.npz) answer "how many within r km" for any r
+"""
+
+import os
+import sys
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from geo_kernel import build_radius_index, count_within_sorted, sum_csr_rows
+
+STORE_DIR = 'gis_integration/04_distance_calculations/distance_results/distance_store'
+
+# Spatial-ready column -> pairwise table column, per facility class
+FACILITY_COLUMNS = {
+    'healthcare': {
+        'Facility_Name': 'facility_name',
+        'Type': 'facility_type',
+        'Latitude': 'facility_lat',
+        'Longitude': 'facility_lon'
+    },
+    'metro': {
+        'Station': 'metro_station',
+        'Venue_Count': 'venue_count',
+        'Latitude': 'metro_lat',
+        'Longitude': 'metro_lon'
+    },
+    'community': {
+        'Community_Name': 'community_name',
+        'Population': 'community_population',
+        'Latitude': 'community_lat',
+        'Longitude': 'community_lon'
+    }
+}
+
+# Category flags per facility class: (flag, case-insensitive keyword); flag i is bit 1 << i
+CATEGORY_FLAGS = {
+    'healthcare': [('hospitals', 'Hospital'), ('clinics', 'Clinic'), ('pharmacies', 'Pharmacy')],
+    'metro': [('food_venues', 'Food'), ('shopping_venues', 'Shop'), ('entertainment_venues', 'Entertainment')]
+}
+
+def category_mask(kind, labels):
+    """
+    Integer category bitmask per facility from its type / category label.
+    Keywords are matched once per distinct label, not once per facility
+    """
+    codes, uniques = pd.factorize(pd.Series(labels))
+    unique_labels = pd.Series(uniques, dtype=object)
+    
+    unique_masks = np.zeros(len(unique_labels) + 1, dtype=np.int64)
+    for bit, (_, keyword) in enumerate(CATEGORY_FLAGS[kind]):
+        matches = unique_labels.str.contains(keyword, case=False, regex=False, na=False).values
+        unique_masks[:-1] |= matches.astype(np.int64) << bit
+    
+    # Missing labels (code -1) pick up the trailing empty mask
+    return unique_masks[codes]
+
+def category_flag_table(kind, masks):
+    """Facility x flag 0/1 table from category bitmasks"""
+    masks = np.asarray(masks, dtype=np.int64)
+    
+    return pd.DataFrame({flag: (masks >> bit) & 1 for bit, (flag, _) in enumerate(CATEGORY_FLAGS[kind])})
+
+def sparse_store_path(kind, store_dir=STORE_DIR):
+    """Location of the CSR within-cutoff pair store for a facility class"""
+    return f'{store_dir}/{kind}_pairs.npz'
+
+def facility_label_columns(facility_table):
+    """Descriptive columns of a facility id table (name, type / station, category)"""
+    return [c for c in facility_table.columns[1:] if not c.endswith(('_lat', '_lon'))]
+
+def build_school_table(schools_df):
+    """School id table: row i of the distance matrix is school_id i"""
+    return pd.DataFrame({
+        'school_id': np.arange(len(schools_df), dtype=np.int32),
+        'school_name': schools_df['school_name'].values,
+        'school_lat': schools_df['latitude'].values,
+        'school_lon': schools_df['longitude'].values
+    })
+
+def build_facility_table(kind, facilities_df):
+    """Facility id table: column j of the distance matrix is facility_id j"""
+    columns = FACILITY_COLUMNS[kind]
+    facility_table = facilities_df[list(columns)].rename(columns=columns).reset_index(drop=True)
+    facility_table.insert(0, 'facility_id', np.arange(len(facility_table), dtype=np.int32))
+    
+    return facility_table
+
+def save_distance_store(kind, distance_matrix, schools_df, facilities_df, store_dir=STORE_DIR, dtype=np.float32):
+    """Save a school x facility distance matrix (float32 unless dtype says otherwise) with its id tables"""
+    os.makedirs(store_dir, exist_ok=True)
+    
+    np.save(f'{store_dir}/{kind}_distances.npy', np.asarray(distance_matrix, dtype=dtype))
+    build_school_table(schools_df).to_csv(f'{store_dir}/schools.csv', index=False)
+    build_facility_table(kind, facilities_df).to_csv(f'{store_dir}/{kind}_facilities.csv', index=False)
+    
+    # Keep one store per facility class so loaders never pick up a stale one
+    if os.path.exists(sparse_store_path(kind, store_dir)):
+        os.remove(sparse_store_path(kind, store_dir))
+    
+    return store_dir
+
+def load_distance_store(kind, store_dir=STORE_DIR, mmap_mode='r'):
+    """Memory-map a stored distance matrix and load its id tables"""
+    distance_matrix = np.load(f'{store_dir}/{kind}_distances.npy', mmap_mode=mmap_mode)
+    school_table = pd.read_csv(f'{store_dir}/schools.csv')
+    facility_table = pd.read_csv(f'{store_dir}/{kind}_facilities.csv')
+    
+    return distance_matrix, school_table, facility_table
+
+def summarize_distance_matrix(distance_matrix, cutoff_km):
+    """
+    Compress a school x facility distance block into CSR pairs within cutoff_km
+    plus dense per-school nearest, mean and facility-count vectors
+    """
+    distance_matrix = np.asarray(distance_matrix)
+    within = distance_matrix <= cutoff_km
+    
+    # np.nonzero walks rows in order, so pairs come out grouped by school (CSR layout)
+    school_idx, facility_idx = np.nonzero(within)
+    indptr = np.zeros(distance_matrix.shape[0] + 1, dtype=np.int64)
+    np.cumsum(within.sum(axis=1), out=indptr[1:])
+    
+    return {
+        'cutoff_km': np.float32(cutoff_km),
+        'n_facilities': np.int64(distance_matrix.shape[1]),
+        'indptr': indptr,
+        'indices': facility_idx.astype(np.int32),
+        'distances': distance_matrix[school_idx, facility_idx].astype(np.float32),
+        'nearest_id': distance_matrix.argmin(axis=1).astype(np.int32),
+        'nearest_km': distance_matrix.min(axis=1).astype(np.float32),
+        'mean_km': distance_matrix.mean(axis=1).astype(np.float32)
+    }
+
+def save_sparse_store(kind, sparse_pairs, schools_df, facilities_df, store_dir=STORE_DIR):
+    """Save CSR within-cutoff pairs and per-school vectors with their id tables"""
+    os.makedirs(store_dir, exist_ok=True)
+    
+    np.savez_compressed(sparse_store_path(kind, store_dir), **sparse_pairs)
+    build_school_table(schools_df).to_csv(f'{store_dir}/schools.csv', index=False)
+    build_facility_table(kind, facilities_df).to_csv(f'{store_dir}/{kind}_facilities.csv', index=False)
+    
+    # Keep one store per facility class so loaders never pick up a stale one
+    dense_path = f'{store_dir}/{kind}_distances.npy'
+    if os.path.exists(dense_path):
+        os.remove(dense_path)
+    
+    return store_dir
+
+def load_sparse_store(kind, store_dir=STORE_DIR):
+    """Load CSR within-cutoff pairs and per-school vectors with their id tables"""
+    with np.load(sparse_store_path(kind, store_dir)) as stored:
+        sparse_pairs = {key: stored[key] for key in stored.files}
+    school_table = pd.read_csv(f'{store_dir}/schools.csv')
+    facility_table = pd.read_csv(f'{store_dir}/{kind}_facilities.csv')
+    
+    return sparse_pairs, school_table, facility_table
+
+def check_sparse_cutoff(kind, sparse_pairs, max_distance_km):
+    """Fail loudly when a sparse store cannot answer a query out to max_distance_km"""
+    if max_distance_km is None or max_distance_km > sparse_pairs['cutoff_km']:
+        raise ValueError(
+            f"{kind} sparse store only holds pairs within {sparse_pairs['cutoff_km']:g} km; "
+            f"rerun distance calculations with a larger --cutoff-km or --storage dense"
+        )
+
+def save_sorted_distances(kind, indptr, sorted_distances, cutoff_km=np.inf, store_dir=STORE_DIR):
+    """
+    Save each school's ascending distances to a facility class in CSR layout
+    cutoff_km=inf means every facility is present, otherwise only those within it
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    
+    np.savez_compressed(f'{store_dir}/{kind}_sorted.npz', indptr=np.asarray(indptr, dtype=np.int64),
+                        distances=np.asarray(sorted_distances, dtype=np.float32), cutoff_km=np.float32(cutoff_km))
+    
+    return store_dir
+
+def load_radius_index(kind, store_dir=STORE_DIR):
+    """Load a facility class's sorted distances as a radius index plus its cutoff and school table"""
+    with np.load(f'{store_dir}/{kind}_sorted.npz') as stored:
+        radius_index = build_radius_index(stored['indptr'], stored['distances'])
+        cutoff_km = float(stored['cutoff_km'])
+    school_table = pd.read_csv(f'{store_dir}/schools.csv')
+    
+    return radius_index, cutoff_km, school_table
+
+def count_within_radius(kind, radius_km, store_dir=STORE_DIR):
+    """Facilities of a class within radius_km of every school, by binary search over sorted distances"""
+    radius_index, cutoff_km, school_table = load_radius_index(kind, store_dir)
+    check_sparse_cutoff(kind, {'cutoff_km': cutoff_km}, radius_km)
+    
+    return pd.DataFrame({
+        'school_name': school_table['school_name'].values,
+        f'{kind}_within_{radius_km:g}km': count_within_sorted(radius_index, radius_km)
+    })
+
+def load_distance_summary(kind, store_dir=STORE_DIR):
+    """Per-school nearest facility, mean distance and facility count from either store"""
+    if os.path.exists(sparse_store_path(kind, store_dir)):
+        sparse_pairs, school_table, facility_table = load_sparse_store(kind, store_dir)
+        nearest_id = sparse_pairs['nearest_id']
+        nearest_km = sparse_pairs['nearest_km']
+        mean_km = sparse_pairs['mean_km']
+        n_facilities = int(sparse_pairs['n_facilities'])
+    else:
+        distance_matrix, school_table, facility_table = load_distance_store(kind, store_dir)
+        nearest_id = distance_matrix.argmin(axis=1)
+        nearest_km = distance_matrix.min(axis=1)
+        mean_km = distance_matrix.mean(axis=1, dtype=np.float64)
+        n_facilities = distance_matrix.shape[1]
+    
+    summary = pd.DataFrame({
+        'school_name': school_table['school_name'].values,
+        'nearest_facility_id': nearest_id,
+        'nearest_distance_km': np.asarray(nearest_km, dtype=float),
+        'mean_distance_km': np.asarray(mean_km, dtype=float),
+        'n_facilities': n_facilities
+    })
+    
+    # Attach the nearest facility's labels (name, type / station, category)
+    for col in facility_label_columns(facility_table):
+        summary[f'nearest_{col}'] = facility_table[col].values[nearest_id]
+    
+    return summary
+
+def save_category_matrix(kind, categories_df, store_dir=STORE_DIR):
+    """
+    Save a facility x category count matrix; row j belongs to facility_id j and
+    the first column of categories_df (the facility key) is replaced by the id
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    
+    category_table = categories_df.iloc[:, 1:].reset_index(drop=True)
+    category_table.insert(0, 'facility_id', np.arange(len(category_table), dtype=np.int32))
+    category_table.to_csv(f'{store_dir}/{kind}_categories.csv', index=False)
+    
+    return store_dir
+
+def load_category_matrix(kind, store_dir=STORE_DIR):
+    """Load a facility x category count matrix and its category names"""
+    category_table = pd.read_csv(f'{store_dir}/{kind}_categories.csv')
+    
+    return category_table.iloc[:, 1:].values, list(category_table.columns[1:])
+
+def load_category_counts(kind, max_distance_km, store_dir=STORE_DIR):
+    """
+    Per-school category counts over facilities within max_distance_km. From the
+    sparse store the category rows of each school's within-radius pairs are summed
+    along its CSR row, so no school x facility mask is built; from the dense store
+    it is one matrix product of the within-radius mask and the category matrix
+    """
+    category_matrix, categories = load_category_matrix(kind, store_dir)
+    
+    if os.path.exists(sparse_store_path(kind, store_dir)):
+        sparse_pairs, school_table, facility_table = load_sparse_store(kind, store_dir)
+        check_sparse_cutoff(kind, sparse_pairs, max_distance_km)
+        
+        # Row boundaries of the pairs left after dropping those beyond the radius
+        keep = sparse_pairs['distances'] <= max_distance_km
+        kept_indptr = np.concatenate([[0], np.cumsum(keep)])[sparse_pairs['indptr']]
+        counts = sum_csr_rows(kept_indptr, category_matrix[sparse_pairs['indices'][keep]])
+    else:
+        distance_matrix, school_table, facility_table = load_distance_store(kind, store_dir)
+        counts = (distance_matrix <= max_distance_km).astype(np.int64) @ category_matrix
+    
+    category_counts = pd.DataFrame(counts, columns=categories)
+    category_counts.insert(0, 'school_name', school_table['school_name'].values)
+    
+    return category_counts
@@ -1,8 +1,18 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+import time
+import argparse
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[1] / '04_distance_calculations'))
+from distance_store import load_distance_summary, load_category_counts
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from scoring import (score_ladder, score_weighted_terms, weighted_term_features, weight_sensitivity, load_weights,
+                     RankingIndex, HEALTHCARE_PROXIMITY, METRO_PROXIMITY, URBAN_AMENITY)
+
 def load_distance_calculation_results():
     """Load all distance calculation results"""
     print("📊 Loading Distance Calculation Results...")
@@ -11,164 +21,109 @@ def load_distance_calculation_results():
     enriched_profiles = pd.read_csv('gis_integration/04_distance_calculations/distance_results/enriched_school_profiles.csv')
     print(f"✅ Enriched profiles: {len(enriched_profiles)} schools")
     
-    # Load detailed distance data
-    healthcare_distances = pd.read_csv('gis_integration/04_distance_calculations/distance_results/school_to_healthcare_distances.csv')
-    metro_distances = pd.read_csv('gis_integration/04_distance_calculations/distance_results/school_to_metro_distances.csv')
+    # Facility type / venue category counts within 5km from the category flag matrices
+    healthcare_type_counts = load_category_counts('healthcare', 5.0)
+    metro_venue_counts = load_category_counts('metro', 5.0)
     
-    print(f"✅ Healthcare distances: {len(healthcare_distances):,} calculations")
-    print(f"✅ Metro distances: {len(metro_distances):,} calculations")
+    # Per-school nearest/mean/count vectors
+    distance_summaries = {
+        'healthcare': load_distance_summary('healthcare'),
+        'metro': load_distance_summary('metro')
+    }
     
-    return enriched_profiles, healthcare_distances, metro_distances
+    print(f"✅ Healthcare type counts: {len(healthcare_type_counts)} schools x {healthcare_type_counts.shape[1] - 1} types")
+    print(f"✅ Metro venue counts: {len(metro_venue_counts)} schools x {metro_venue_counts.shape[1] - 1} categories")
+    
+    return enriched_profiles, healthcare_type_counts, metro_venue_counts, distance_summaries
 
-def create_comprehensive_school_profiles(enriched_profiles, healthcare_distances, metro_distances):
+def create_comprehensive_school_profiles(enriched_profiles, healthcare_type_counts, metro_venue_counts, distance_summaries):
     """Create comprehensive school profiles with all spatial and accessibility data"""
     print("\n🏫 Creating Comprehensive School Profiles...")
     
-    comprehensive_profiles = []
-    
-    for _, school in enriched_profiles.iterrows():
-        school_name = school['school_name']
+    # Per-school category counts come precomputed from the within-5km mask and flag matrices
+    healthcare_summaries = analyze_healthcare_accessibility(
+        healthcare_type_counts, distance_summaries['healthcare'], enriched_profiles['school_name']
+    )
+    metro_summaries = analyze_metro_accessibility(
+        metro_venue_counts, distance_summaries['metro'], enriched_profiles['school_name']
+    )
+    
+    school = enriched_profiles.reset_index(drop=True)
+    
+    # Create comprehensive profiles column by column
+    comprehensive_profiles = {
+        # Basic school information
+        'school_name': school['school_name'],
+        'location': school['location'],
+        'latitude': school['latitude'],
+        'longitude': school['longitude'],
+        'grades': school['grades'],
+        'students': school['students'],
+        'year_established': school['year_established'],
+        'type_of_school': school['type_of_school'],
         
-        # Get all healthcare facilities for this school
-        school_healthcare = healthcare_distances[healthcare_distances['school_name'] == school_name]
-        school_metro = metro_distances[metro_distances['school_name'] == school_name]
+        # Healthcare accessibility
+        'nearest_healthcare_name': school['nearest_healthcare_name'],
+        'nearest_healthcare_type': school['nearest_healthcare_type'],
+        'nearest_healthcare_distance_km': school['nearest_healthcare_distance_km'],
+        'healthcare_within_1km': school['healthcare_within_1km'],
+        'healthcare_within_2km': school['healthcare_within_2km'],
+        'healthcare_within_5km': school['healthcare_within_5km'],
+        'total_healthcare_facilities': healthcare_summaries['total_healthcare_facilities'],
         
-        # Healthcare analysis
-        healthcare_summary = analyze_healthcare_accessibility(school_healthcare)
-        metro_summary = analyze_metro_accessibility(school_metro)
+        # Metro accessibility
+        'nearest_metro_station': school['nearest_metro_station'],
+        'nearest_metro_distance_km': school['nearest_metro_distance_km'],
+        'metro_within_1km': school['metro_within_1km'],
+        'metro_within_2km': school['metro_within_2km'],
+        'metro_within_5km': school['metro_within_5km'],
+        'total_metro_stations': metro_summaries['total_metro_stations'],
         
-        # Create comprehensive profile
-        comprehensive_profile = {
-            # Basic school information
-            'school_name': school['school_name'],
-            'location': school['location'],
-            'latitude': school['latitude'],
-            'longitude': school['longitude'],
-            'grades': school['grades'],
-            'students': school['students'],
-            'year_established': school['year_established'],
-            'type_of_school': school['type_of_school'],
-            
-            # Healthcare accessibility
-            'nearest_healthcare_name': school['nearest_healthcare_name'],
-            'nearest_healthcare_type': school['nearest_healthcare_type'],
-            'nearest_healthcare_distance_km': school['nearest_healthcare_distance_km'],
-            'healthcare_within_1km': school['healthcare_within_1km'],
-            'healthcare_within_2km': school['healthcare_within_2km'],
-            'healthcare_within_5km': school['healthcare_within_5km'],
-            'total_healthcare_facilities': len(school_healthcare),
-            
-            # Metro accessibility
-            'nearest_metro_station': school['nearest_metro_station'],
-            'nearest_metro_distance_km': school['nearest_metro_distance_km'],
-            'metro_within_1km': school['metro_within_1km'],
-            'metro_within_2km': school['metro_within_2km'],
-            'metro_within_5km': school['metro_within_5km'],
-            'total_metro_stations': len(school_metro),
-            
-            # Healthcare type breakdown
-            'hospitals_within_5km': healthcare_summary['hospitals_within_5km'],
-            'clinics_within_5km': healthcare_summary['clinics_within_5km'],
-            'pharmacies_within_5km': healthcare_summary['pharmacies_within_5km'],
-            
-            # Metro venue breakdown
-            'food_venues_within_5km': metro_summary['food_venues_within_5km'],
-            'shopping_venues_within_5km': metro_summary['shopping_venues_within_5km'],
-            'entertainment_venues_within_5km': metro_summary['entertainment_venues_within_5km'],
-            
-            # Overall accessibility metrics
-            'accessibility_score': school['accessibility_score'],
-            'healthcare_accessibility_score': calculate_healthcare_score(school),
-            'metro_accessibility_score': calculate_metro_score(school),
-            'overall_urban_score': calculate_overall_urban_score(school, healthcare_summary, metro_summary)
-        }
+        # Healthcare type breakdown
+        'hospitals_within_5km': healthcare_summaries['hospitals_within_5km'],
+        'clinics_within_5km': healthcare_summaries['clinics_within_5km'],
+        'pharmacies_within_5km': healthcare_summaries['pharmacies_within_5km'],
         
-        comprehensive_profiles.append(comprehensive_profile)
+        # Metro venue breakdown
+        'food_venues_within_5km': metro_summaries['food_venues_within_5km'],
+        'shopping_venues_within_5km': metro_summaries['shopping_venues_within_5km'],
+        'entertainment_venues_within_5km': metro_summaries['entertainment_venues_within_5km'],
+        
+        # Overall accessibility metrics
+        'accessibility_score': school['accessibility_score']
+    }
     
     comprehensive_df = pd.DataFrame(comprehensive_profiles)
+    
+    # Score every school at once from the declared ladders
+    comprehensive_df['healthcare_accessibility_score'] = score_ladder(comprehensive_df, HEALTHCARE_PROXIMITY)
+    comprehensive_df['metro_accessibility_score'] = score_ladder(comprehensive_df, METRO_PROXIMITY)
+    comprehensive_df['overall_urban_score'] = score_weighted_terms(comprehensive_df, URBAN_AMENITY)
     print(f"✅ Created comprehensive profiles for {len(comprehensive_df)} schools")
     
     return comprehensive_df
 
-def analyze_healthcare_accessibility(school_healthcare):
-    """Analyze healthcare accessibility for a specific school"""
-    # Count facilities by type within 5km
-    within_5km = school_healthcare[school_healthcare['distance_km'] <= 5.0]
-    
-    # Categorize by facility type
-    hospitals = within_5km[within_5km['facility_type'].str.contains('Hospital', case=False, na=False)]
-    clinics = within_5km[within_5km['facility_type'].str.contains('Clinic', case=False, na=False)]
-    pharmacies = within_5km[within_5km['facility_type'].str.contains('Pharmacy', case=False, na=False)]
-    
-    return {
-        'hospitals_within_5km': len(hospitals),
-        'clinics_within_5km': len(clinics),
-        'pharmacies_within_5km': len(pharmacies)
-    }
-
-def analyze_metro_accessibility(school_metro):
-    """Analyze metro venue accessibility for a specific school"""
-    # Count venues by category within 5km
-    within_5km = school_metro[school_metro['distance_km'] <= 5.0]
-    
-    # Categorize by venue type
-    food_venues = within_5km[within_5km['venue_category'].str.contains('Food', case=False, na=False)]
-    shopping_venues = within_5km[within_5km['venue_category'].str.contains('Shop', case=False, na=False)]
-    entertainment_venues = within_5km[within_5km['venue_category'].str.contains('Entertainment', case=False, na=False)]
-    
-    return {
-        'food_venues_within_5km': len(food_venues),
-        'shopping_venues_within_5km': len(shopping_venues),
-        'entertainment_venues_within_5km': len(entertainment_venues)
-    }
-
-def calculate_healthcare_score(school):
-    """Calculate healthcare accessibility score (lower is better)"""
-    base_score = school['nearest_healthcare_distance_km']
-    
-    # Bonus for having multiple facilities nearby
-    if school['healthcare_within_1km'] > 0:
-        base_score *= 0.8  # 20% bonus
-    elif school['healthcare_within_2km'] > 0:
-        base_score *= 0.9  # 10% bonus
-    
-    return round(base_score, 3)
-
-def calculate_metro_score(school):
-    """Calculate metro accessibility score (lower is better)"""
-    base_score = school['nearest_metro_distance_km']
-    
-    # Bonus for having multiple stations nearby
-    if school['metro_within_1km'] > 0:
-        base_score *= 0.8  # 20% bonus
-    elif school['metro_within_2km'] > 0:
-        base_score *= 0.9  # 10% bonus
-    
-    return round(base_score, 3)
+def analyze_healthcare_accessibility(healthcare_type_counts, healthcare_summary, school_names):
+    """Analyze healthcare accessibility for every school from per-type facility counts"""
+    type_counts = healthcare_type_counts.set_index('school_name').reindex(school_names)
+    
+    return pd.DataFrame({
+        'total_healthcare_facilities': healthcare_summary.set_index('school_name')['n_facilities'].reindex(school_names).values,
+        'hospitals_within_5km': type_counts['hospitals'].values,
+        'clinics_within_5km': type_counts['clinics'].values,
+        'pharmacies_within_5km': type_counts['pharmacies'].values
+    })
 
-def calculate_overall_urban_score(school, healthcare_summary, metro_summary):
-    """Calculate overall urban accessibility score"""
-    # Weighted combination of healthcare and metro accessibility
-    healthcare_weight = 0.4
-    metro_weight = 0.6
-    
-    # Normalize scores (lower distance = higher score)
-    max_healthcare_distance = 10.0  # 10km as maximum reasonable distance
-    max_metro_distance = 5.0        # 5km as maximum reasonable distance
-    
-    healthcare_normalized = max(0, 1 - (school['nearest_healthcare_distance_km'] / max_healthcare_distance))
-    metro_normalized = max(0, 1 - (school['nearest_metro_distance_km'] / max_metro_distance))
-    
-    # Bonus for variety of amenities
-    variety_bonus = min(0.2, (healthcare_summary['hospitals_within_5km'] + 
-                              healthcare_summary['clinics_within_5km'] + 
-                              metro_summary['food_venues_within_5km']) * 0.01)
-    
-    overall_score = (healthcare_normalized * healthcare_weight + 
-                    metro_normalized * metro_weight + 
-                    variety_bonus)
-    
-    return round(overall_score, 3)
+def analyze_metro_accessibility(metro_venue_counts, metro_summary, school_names):
+    """Analyze metro venue accessibility for every school from per-category venue counts"""
+    venue_counts = metro_venue_counts.set_index('school_name').reindex(school_names)
+    
+    return pd.DataFrame({
+        'total_metro_stations': metro_summary.set_index('school_name')['n_facilities'].reindex(school_names).values,
+        'food_venues_within_5km': venue_counts['food_venues'].values,
+        'shopping_venues_within_5km': venue_counts['shopping_venues'].values,
+        'entertainment_venues_within_5km': venue_counts['entertainment_venues'].values
+    })
 
 def create_insights_and_recommendations(comprehensive_df):
     """Create insights and recommendations for parents"""
@@ -176,17 +131,25 @@ def create_insights_and_recommendations(comprehensive_df):
     
     insights = []
     
+    # Partial-sort top-k per score column (ascending = lower is better)
+    rankings = RankingIndex(comprehensive_df, {
+        'accessibility_score': True,
+        'healthcare_accessibility_score': True,
+        'metro_accessibility_score': True,
+        'overall_urban_score': False
+    })
+    
     # Top schools by accessibility
-    top_accessible = comprehensive_df.nsmallest(10, 'accessibility_score')
+    top_accessible = rankings.top('accessibility_score', 10)
     
     # Schools with best healthcare access
-    best_healthcare = comprehensive_df.nsmallest(10, 'healthcare_accessibility_score')
+    best_healthcare = rankings.top('healthcare_accessibility_score', 10)
     
     # Schools with best metro access
-    best_metro = comprehensive_df.nsmallest(10, 'metro_accessibility_score')
+    best_metro = rankings.top('metro_accessibility_score', 10)
     
     # Schools with highest urban scores
-    best_urban = comprehensive_df.nlargest(10, 'overall_urban_score')
+    best_urban = rankings.top('overall_urban_score', 10)
     
     insights_data = {
         'top_accessible_schools': top_accessible,
@@ -203,7 +166,11 @@ def create_insights_and_recommendations(comprehensive_df):
     print(f"✅ Created insights for {len(comprehensive_df)} schools")
     return insights_data
 
-def save_final_integrated_dataset(comprehensive_df, insights_data):
+def facility_totals(distance_summaries):
+    """Facilities of each class in the distance store (healthcare facilities, metro stations)"""
+    return {kind: int(summary['n_facilities'].iloc[0]) for kind, summary in distance_summaries.items()}
+
+def save_final_integrated_dataset(comprehensive_df, insights_data, totals):
     """Save the final integrated dataset and insights"""
     print("\n💾 Saving Final Integrated Dataset...")
     
@@ -227,8 +194,8 @@ def save_final_integrated_dataset(comprehensive_df, insights_data):
         'average_metro_distance_km': round(insights_data['average_metro_distance'], 3),
         'schools_within_1km_healthcare': insights_data['schools_within_1km_healthcare'],
         'schools_within_1km_metro': insights_data['schools_within_1km_metro'],
-        'total_healthcare_facilities': 2312,
-        'total_metro_stations': 540
+        'total_healthcare_facilities': totals['healthcare'],
+        'total_metro_stations': totals['metro']
     }
     
     summary_df = pd.DataFrame([summary_stats])
@@ -238,22 +205,61 @@ def save_final_integrated_dataset(comprehensive_df, insights_data):
     
     return output_dir
 
-def main():
+def analyze_weight_sensitivity(comprehensive_df, output_dir, n_samples=5000, concentration=20.0, seed=None):
+    """Check how robust the weighted top-10 rankings are to the chosen weights"""
+    print(f"\n🎲 Weight Sensitivity Analysis ({n_samples:,} weight vectors)...")
+    
+    # Weighted rankings from create_insights_and_recommendations as (features, weights, ascending)
+    accessibility_weights = load_weights()['accessibility_score']
+    urban_features, urban_weights = weighted_term_features(comprehensive_df, URBAN_AMENITY)
+    rankings = {
+        'accessibility_score': (comprehensive_df[list(accessibility_weights)], accessibility_weights, True),
+        'overall_urban_score': (urban_features, urban_weights, False)
+    }
+    
+    sensitivity = {}
+    for score, (features, weights, ascending) in rankings.items():
+        start = time.perf_counter()
+        summary, stats = weight_sensitivity(
+            features, list(weights.values()), n_samples, ascending, 10, concentration, seed
+        )
+        elapsed = time.perf_counter() - start
+        
+        summary.insert(0, 'school_name', comprehensive_df.loc[summary.index, 'school_name'].values)
+        summary.to_csv(f'{output_dir}/weight_sensitivity_{score}.csv', index=False)
+        sensitivity[score] = stats
+        
+        print(f"✅ {score}: {elapsed * 1000:.0f} ms")
+        print(f"   - Mean rank correlation with baseline: {stats['mean_spearman']:.3f} (min {stats['min_spearman']:.3f})")
+        print(f"   - Baseline top-10 retained on average: {stats['mean_top10_overlap']:.1%}")
+        stable = summary[summary['top10_frequency'] >= 0.9]
+        print(f"   - Schools in the top 10 for >= 90% of weight vectors: {len(stable)}")
+    
+    return sensitivity
+
+def main(sensitivity_samples=0, sensitivity_seed=None):
     """Main data integration function"""
     print("🔗 FINAL DATA INTEGRATION FOR SCHOOL SELECTION PLATFORM")
     print("="*70)
     
     # Step 1: Load distance calculation results
-    enriched_profiles, healthcare_distances, metro_distances = load_distance_calculation_results()
+    enriched_profiles, healthcare_type_counts, metro_venue_counts, distance_summaries = load_distance_calculation_results()
     
     # Step 2: Create comprehensive school profiles
-    comprehensive_df = create_comprehensive_school_profiles(enriched_profiles, healthcare_distances, metro_distances)
+    comprehensive_df = create_comprehensive_school_profiles(
+        enriched_profiles, healthcare_type_counts, metro_venue_counts, distance_summaries
+    )
     
     # Step 3: Create insights and recommendations
     insights_data = create_insights_and_recommendations(comprehensive_df)
     
     # Step 4: Save final integrated dataset
-    output_dir = save_final_integrated_dataset(comprehensive_df, insights_data)
+    totals = facility_totals(distance_summaries)
+    output_dir = save_final_integrated_dataset(comprehensive_df, insights_data, totals)
+    
+    # Step 5: Optional weight-sensitivity analysis of the rankings
+    if sensitivity_samples > 0:
+        analyze_weight_sensitivity(comprehensive_df, output_dir, sensitivity_samples, seed=sensitivity_seed)
     
     # Final summary
     print("\n" + "="*70)
@@ -261,9 +267,9 @@ def main():
     print("="*70)
     
     print(f"🏫 Total schools integrated: {len(comprehensive_df)}")
-    print(f"🏥 Healthcare facilities analyzed: 2,312")
-    print(f"🚇 Metro stations analyzed: 540")
-    print(f"📏 Total distance calculations: 484,840")
+    print(f"🏥 Healthcare facilities analyzed: {totals['healthcare']:,}")
+    print(f"🚇 Metro stations analyzed: {totals['metro']:,}")
+    print(f"📏 School-facility pairs covered: {len(comprehensive_df) * sum(totals.values()):,}")
     
     print(f"\n🎉 Your Dubai School Selection Platform is ready!")
     print(f"🚀 Data is prepared for dashboard creation!")
@@ -280,6 +286,12 @@ def main():
     }
 
 if __name__ == "__main__":
-    results = main()
+    parser = argparse.ArgumentParser(description='Final data integration for the school selection platform')
+    parser.add_argument('--sensitivity-samples', type=int, default=0,
+                        help='Sample this many weight vectors and report ranking stability (0 disables)')
+    parser.add_argument('--sensitivity-seed', type=int, default=None, help='Random seed for the weight samples')
+    args = parser.parse_args()
+    
+    results = main(args.sensitivity_samples, args.sensitivity_seed)
 
 
@@ -7,7 +7,17 @@ Complete spatial analysis combining all datasets
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import os
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'gis_integration' / '04_distance_calculations'))
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from distance_store import load_distance_summary, load_distance_store, build_school_table, build_facility_table
+from scoring import extract_features, save_feature_store, load_weights, rescore, aggregate_insights, COMPREHENSIVE_INSIGHTS
+from profile_schema import project_profiles
+from phase2_school_community_integration import calculate_school_community_distances, create_community_analysis
+
+DISTANCE_STORE_DIR = '../gis_integration/04_distance_calculations/distance_results/distance_store'
+COMMUNITY_STORE_DIR = 'phase2_integration/results/community_distance_store'
 
 def load_all_datasets():
     """Load all datasets for comprehensive integration"""
@@ -31,187 +41,76 @@ def load_all_datasets():
     
     # Load metro data
     print("🚇 Loading metro data...")
-    metro_df = pd.read_csv('../gis_integration/03_spatial_preparation/spatial_prepared_data/metro_spatial_ready.csv')
+    metro_df = pd.read_csv('../gis_integration/03_spatial_preparation/spatial_prepared_data/metro_stations_spatial_ready.csv')
     print(f"✅ Metro data: {len(metro_df)} stations")
     
-    # Load existing distance calculations
-    print("📏 Loading existing distance calculations...")
-    healthcare_distances = pd.read_csv('../gis_integration/04_distance_calculations/distance_results/school_to_healthcare_distances.csv')
-    metro_distances = pd.read_csv('../gis_integration/04_distance_calculations/distance_results/school_to_metro_distances.csv')
-    print(f"✅ Healthcare distances: {len(healthcare_distances)} records")
-    print(f"✅ Metro distances: {len(metro_distances)} records")
+    # Load per-school distance summaries (nearest and radius counts already come with the school profiles)
+    print("📏 Loading existing distance summaries...")
+    distance_summaries = {
+        'healthcare': load_distance_summary('healthcare', DISTANCE_STORE_DIR),
+        'metro': load_distance_summary('metro', DISTANCE_STORE_DIR)
+    }
+    print(f"✅ Healthcare summaries: {len(distance_summaries['healthcare'])} schools")
+    print(f"✅ Metro summaries: {len(distance_summaries['metro'])} schools")
     
-    return community_df, school_df, healthcare_df, metro_df, healthcare_distances, metro_distances
+    return community_df, school_df, healthcare_df, metro_df, distance_summaries
 
-def calculate_school_community_distances(school_df, community_df):
-    """Calculate distances from each school to each community"""
-    print("\n🗺️ Calculating school-community distances...")
-    
-    from math import radians, cos, sin, asin, sqrt
-    
-    def haversine_distance(lat1, lon1, lat2, lon2):
-        """Calculate the great circle distance between two points on Earth"""
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        r = 6371  # Radius of earth in kilometers
-        return c * r
-    
-    # Create distance matrix
-    distances = []
-    total_calculations = len(school_df) * len(community_df)
-    current_calculation = 0
-    
-    print(f"📊 Calculating {total_calculations:,} school-community distances...")
-    
-    for _, school in school_df.iterrows():
-        school_id = school['school_name']
-        school_lat = school['latitude']
-        school_lng = school['longitude']
-        
-        for _, community in community_df.iterrows():
-            community_name = community['Community_Name']
-            community_lat = community['Latitude']
-            community_lng = community['Longitude']
-            community_pop = community['Population']
-            
-            # Calculate distance
-            distance = haversine_distance(school_lat, school_lng, community_lat, community_lng)
-            
-            distances.append({
-                'school_name': school_id,
-                'community_name': community_name,
-                'community_population': community_pop,
-                'distance_km': distance
-            })
-            
-            current_calculation += 1
-            if current_calculation % 10000 == 0:
-                print(f"  Progress: {current_calculation:,}/{total_calculations:,} ({current_calculation/total_calculations*100:.1f}%)")
-    
-    # Convert to DataFrame
-    distance_df = pd.DataFrame(distances)
-    print(f"✅ Completed {len(distance_df):,} distance calculations")
-    
-    return distance_df
+def store_matches(stored_table, current_table, columns):
+    """Whether a stored id table lists the same rows, in the same order, as the current data"""
+    return len(stored_table) == len(current_table) and all(
+        np.array_equal(stored_table[col].values, current_table[col].values) for col in columns
+    )
+
+def load_school_community_distances(school_df, community_df):
+    """
+    Reuse the full-precision school x community distance matrix persisted by
+    Phase 2 when it covers exactly these schools and communities (names and
+    coordinates), otherwise recompute it
+    """
+    try:
+        distance_matrix, school_table, community_table = load_distance_store('community', COMMUNITY_STORE_DIR)
+    except FileNotFoundError:
+        return calculate_school_community_distances(school_df, community_df)
+    
+    if not (distance_matrix.dtype == np.float64 and
+            store_matches(school_table, build_school_table(school_df), ['school_name', 'school_lat', 'school_lon']) and
+            store_matches(community_table, build_facility_table('community', community_df),
+                          ['community_name', 'community_lat', 'community_lon'])):
+        print("⚠️ Stored school-community distances are out of date, recalculating...")
+        return calculate_school_community_distances(school_df, community_df)
+    
+    print(f"\n🗺️ Loaded {distance_matrix.size:,} school-community distances from {COMMUNITY_STORE_DIR}")
+    return distance_matrix
+
+def summarize_facility_access(school_names, summary_df, prefix):
+    """
+    Mean distance to every facility for each school, from the per-school store
+    summary; nearest facility and radius counts come with the school profiles
+    """
+    summary = summary_df.set_index('school_name').reindex(school_names)
+    
+    return pd.DataFrame({
+        'school_name': school_names.values,
+        f'avg_distance_to_{prefix}_km': summary['mean_distance_km'].values
+    })
 
 def create_comprehensive_analysis(school_df, community_df, healthcare_df, metro_df, 
-                                school_community_distances, healthcare_distances, metro_distances):
+                                school_community_distances, distance_summaries):
     """Create comprehensive analysis combining all datasets"""
     print("\n📈 Creating comprehensive analysis...")
     
-    # Community analysis for each school
-    community_analysis = []
-    
-    for school_name in school_df['school_name']:
-        school_distances = school_community_distances[school_community_distances['school_name'] == school_name]
-        
-        # Nearest community
-        nearest_community = school_distances.loc[school_distances['distance_km'].idxmin()]
-        
-        # Communities within different distances
-        within_1km = school_distances[school_distances['distance_km'] <= 1.0]
-        within_2km = school_distances[school_distances['distance_km'] <= 2.0]
-        within_5km = school_distances[school_distances['distance_km'] <= 5.0]
-        
-        # Population analysis
-        total_pop_1km = within_1km['community_population'].sum()
-        total_pop_2km = within_2km['community_population'].sum()
-        total_pop_5km = within_5km['community_population'].sum()
-        
-        # Community count
-        community_count_1km = len(within_1km)
-        community_count_2km = len(within_2km)
-        community_count_5km = len(within_5km)
-        
-        # Average distance to communities
-        avg_community_distance = school_distances['distance_km'].mean()
-        
-        community_analysis.append({
-            'school_name': school_name,
-            'nearest_community': nearest_community['community_name'],
-            'nearest_community_distance_km': nearest_community['distance_km'],
-            'nearest_community_population': nearest_community['community_population'],
-            'communities_within_1km': community_count_1km,
-            'communities_within_2km': community_count_2km,
-            'communities_within_5km': community_count_5km,
-            'population_within_1km': total_pop_1km,
-            'population_within_2km': total_pop_2km,
-            'population_within_5km': total_pop_5km,
-            'avg_distance_to_communities_km': avg_community_distance
-        })
-    
-    community_analysis_df = pd.DataFrame(community_analysis)
+    # Community analysis for each school, straight from the schools x communities matrix
+    community_analysis_df = create_community_analysis(school_df, community_df, school_community_distances)
     
     # Healthcare analysis for each school
-    healthcare_analysis = []
-    
-    for school_name in school_df['school_name']:
-        school_healthcare = healthcare_distances[healthcare_distances['school_name'] == school_name]
-        
-        # Nearest healthcare
-        nearest_healthcare = school_healthcare.loc[school_healthcare['distance_km'].idxmin()]
-        
-        # Healthcare within different distances
-        within_1km = school_healthcare[school_healthcare['distance_km'] <= 1.0]
-        within_2km = school_healthcare[school_healthcare['distance_km'] <= 2.0]
-        within_5km = school_healthcare[school_healthcare['distance_km'] <= 5.0]
-        
-        # Healthcare count
-        healthcare_count_1km = len(within_1km)
-        healthcare_count_2km = len(within_2km)
-        healthcare_count_5km = len(within_5km)
-        
-        # Average distance to healthcare
-        avg_healthcare_distance = school_healthcare['distance_km'].mean()
-        
-        healthcare_analysis.append({
-            'school_name': school_name,
-            'nearest_healthcare': nearest_healthcare['facility_name'],
-            'nearest_healthcare_distance_km': nearest_healthcare['distance_km'],
-            'healthcare_within_1km': healthcare_count_1km,
-            'healthcare_within_2km': healthcare_count_2km,
-            'healthcare_within_5km': healthcare_count_5km,
-            'avg_distance_to_healthcare_km': avg_healthcare_distance
-        })
-    
-    healthcare_analysis_df = pd.DataFrame(healthcare_analysis)
+    healthcare_analysis_df = summarize_facility_access(
+        school_df['school_name'], distance_summaries['healthcare'], 'healthcare'
+    )
     
     # Metro analysis for each school
-    metro_analysis = []
-    
-    for school_name in school_df['school_name']:
-        school_metro = metro_distances[metro_distances['school_name'] == school_name]
-        
-        # Nearest metro
-        nearest_metro = school_metro.loc[school_metro['distance_km'].idxmin()]
-        
-        # Metro within different distances
-        within_1km = school_metro[school_metro['distance_km'] <= 1.0]
-        within_2km = school_metro[school_metro['distance_km'] <= 2.0]
-        within_5km = school_metro[school_metro['distance_km'] <= 5.0]
-        
-        # Metro count
-        metro_count_1km = len(within_1km)
-        metro_count_2km = len(within_2km)
-        metro_count_5km = len(within_5km)
-        
-        # Average distance to metro
-        avg_metro_distance = school_metro['distance_km'].mean()
-        
-        metro_analysis.append({
-            'school_name': school_name,
-            'nearest_metro': nearest_metro['metro_station'],
-            'nearest_metro_distance_km': nearest_metro['distance_km'],
-            'metro_within_1km': metro_count_1km,
-            'metro_within_2km': metro_count_2km,
-            'metro_within_5km': metro_count_5km,
-            'avg_distance_to_metro_km': avg_metro_distance
-        })
-    
-    metro_analysis_df = pd.DataFrame(metro_analysis)
+    metro_analysis_df = summarize_facility_access(
+        school_df['school_name'], distance_summaries['metro'], 'metro'
+    )
     
     print(f"✅ Community analysis: {len(community_analysis_df)} schools")
     print(f"✅ Healthcare analysis: {len(healthcare_analysis_df)} schools")
@@ -226,182 +125,40 @@ def create_comprehensive_school_profiles(school_df, community_analysis_df, healt
     # Start with base school data
     comprehensive_profiles = school_df.copy()
     
-    # Merge community analysis
-    comprehensive_profiles = comprehensive_profiles.merge(community_analysis_df, on='school_name', how='left')
-    
-    # Merge healthcare analysis
-    comprehensive_profiles = comprehensive_profiles.merge(healthcare_analysis_df, on='school_name', how='left')
-    
-    # Merge metro analysis
-    comprehensive_profiles = comprehensive_profiles.merge(metro_analysis_df, on='school_name', how='left')
-    
-    # Calculate comprehensive accessibility scores
-    comprehensive_profiles['community_accessibility_score'] = comprehensive_profiles.apply(
-        lambda row: calculate_community_accessibility_score(row), axis=1
-    )
-    
-    comprehensive_profiles['healthcare_accessibility_score'] = comprehensive_profiles.apply(
-        lambda row: calculate_healthcare_accessibility_score(row), axis=1
-    )
+    # Merge community, healthcare and metro analysis; the school profiles win on
+    # shared columns, so the merges never produce _x/_y duplicates
+    for analysis_df in [community_analysis_df, healthcare_analysis_df, metro_analysis_df]:
+        new_columns = [col for col in analysis_df.columns if col not in comprehensive_profiles.columns]
+        comprehensive_profiles = comprehensive_profiles.merge(
+            analysis_df[['school_name'] + new_columns], on='school_name', how='left'
+        )
     
-    comprehensive_profiles['metro_accessibility_score'] = comprehensive_profiles.apply(
-        lambda row: calculate_metro_accessibility_score(row), axis=1
-    )
+    # Score from the same feature vectors the rescoring CLI reads
+    scores = rescore(extract_features(comprehensive_profiles), load_weights())
+    for score in ['community_accessibility_score', 'healthcare_accessibility_score', 'metro_accessibility_score',
+                  'comprehensive_accessibility_score', 'final_urban_score']:
+        comprehensive_profiles[score] = scores[score].values
     
-    # Calculate overall comprehensive score
-    comprehensive_profiles['comprehensive_accessibility_score'] = (
-        comprehensive_profiles['community_accessibility_score'] * 0.3 +
-        comprehensive_profiles['healthcare_accessibility_score'] * 0.4 +
-        comprehensive_profiles['metro_accessibility_score'] * 0.3
-    )
-    
-    # Add urban amenity score (existing)
-    if 'overall_urban_score' in comprehensive_profiles.columns:
-        comprehensive_profiles['final_urban_score'] = (
-            comprehensive_profiles['overall_urban_score'] * 0.4 +
-            comprehensive_profiles['comprehensive_accessibility_score'] * 0.6
-        )
-    else:
-        comprehensive_profiles['final_urban_score'] = comprehensive_profiles['comprehensive_accessibility_score']
+    # Fixed column set, order and dtypes for every downstream reader
+    comprehensive_profiles = project_profiles(comprehensive_profiles)
     
     print(f"✅ Comprehensive profiles created for {len(comprehensive_profiles)} schools")
     
     return comprehensive_profiles
 
-def calculate_community_accessibility_score(row):
-    """Calculate community accessibility score (0-5, lower is better)"""
-    nearest_dist = row.get('nearest_community_distance_km', 999)
-    communities_1km = row.get('communities_within_1km', 0)
-    communities_2km = row.get('communities_within_2km', 0)
-    
-    # Base score from nearest community distance
-    if nearest_dist <= 0.5:
-        base_score = 1.0
-    elif nearest_dist <= 1.0:
-        base_score = 2.0
-    elif nearest_dist <= 2.0:
-        base_score = 3.0
-    elif nearest_dist <= 5.0:
-        base_score = 4.0
-    else:
-        base_score = 5.0
-    
-    # Bonus for multiple communities nearby
-    if communities_1km >= 3:
-        base_score -= 0.5
-    elif communities_1km >= 1:
-        base_score -= 0.2
-    
-    if communities_2km >= 5:
-        base_score -= 0.3
-    
-    return max(1.0, min(5.0, base_score))
-
-def calculate_healthcare_accessibility_score(row):
-    """Calculate healthcare accessibility score (0-5, lower is better)"""
-    nearest_dist = row.get('nearest_healthcare_distance_km', 999)
-    healthcare_1km = row.get('healthcare_within_1km', 0)
-    healthcare_2km = row.get('healthcare_within_2km', 0)
-    
-    # Base score from nearest healthcare distance
-    if nearest_dist <= 0.5:
-        base_score = 1.0
-    elif nearest_dist <= 1.0:
-        base_score = 2.0
-    elif nearest_dist <= 2.0:
-        base_score = 3.0
-    elif nearest_dist <= 5.0:
-        base_score = 4.0
-    else:
-        base_score = 5.0
-    
-    # Bonus for multiple healthcare facilities nearby
-    if healthcare_1km >= 5:
-        base_score -= 0.5
-    elif healthcare_1km >= 2:
-        base_score -= 0.2
-    
-    if healthcare_2km >= 10:
-        base_score -= 0.3
-    
-    return max(1.0, min(5.0, base_score))
-
-def calculate_metro_accessibility_score(row):
-    """Calculate metro accessibility score (0-5, lower is better)"""
-    nearest_dist = row.get('nearest_metro_distance_km', 999)
-    metro_1km = row.get('metro_within_1km', 0)
-    metro_2km = row.get('metro_within_2km', 0)
-    
-    # Base score from nearest metro distance
-    if nearest_dist <= 0.5:
-        base_score = 1.0
-    elif nearest_dist <= 1.0:
-        base_score = 2.0
-    elif nearest_dist <= 2.0:
-        base_score = 3.0
-    elif nearest_dist <= 5.0:
-        base_score = 4.0
-    else:
-        base_score = 5.0
-    
-    # Bonus for multiple metro stations nearby
-    if metro_1km >= 2:
-        base_score -= 0.5
-    elif metro_1km >= 1:
-        base_score -= 0.2
-    
-    if metro_2km >= 3:
-        base_score -= 0.3
-    
-    return max(1.0, min(5.0, base_score))
-
-def create_comprehensive_insights(comprehensive_profiles):
+def create_comprehensive_insights(comprehensive_profiles, community_df, distance_summaries):
     """Create comprehensive insights combining all datasets"""
     print("\n💡 Creating comprehensive insights...")
     
     insights = {
-        # Basic counts
+        # Basic counts; facility totals are the columns of the stored distance matrices
         'total_schools': len(comprehensive_profiles),
-        'total_communities_analyzed': 226,
-        'total_healthcare_facilities': 2312,
-        'total_metro_stations': 540,
-        
-        # Community insights
-        'avg_nearest_community_distance': comprehensive_profiles['nearest_community_distance_km'].mean(),
-        'schools_within_1km_community': len(comprehensive_profiles[comprehensive_profiles['nearest_community_distance_km'] <= 1.0]),
-        'schools_within_2km_community': len(comprehensive_profiles[comprehensive_profiles['nearest_community_distance_km'] <= 2.0]),
-        'schools_within_5km_community': len(comprehensive_profiles[comprehensive_profiles['nearest_community_distance_km'] <= 5.0]),
-        'avg_communities_within_1km': comprehensive_profiles['communities_within_1km'].mean(),
-        'avg_communities_within_2km': comprehensive_profiles['communities_within_2km'].mean(),
-        'avg_communities_within_5km': comprehensive_profiles['communities_within_5km'].mean(),
-        'avg_population_within_1km': comprehensive_profiles['population_within_1km'].mean(),
-        'avg_population_within_2km': comprehensive_profiles['population_within_2km'].mean(),
-        'avg_population_within_5km': comprehensive_profiles['population_within_5km'].mean(),
+        'total_communities_analyzed': len(community_df),
+        'total_healthcare_facilities': int(distance_summaries['healthcare']['n_facilities'].iloc[0]),
+        'total_metro_stations': int(distance_summaries['metro']['n_facilities'].iloc[0]),
         
-        # Healthcare insights
-        'avg_nearest_healthcare_distance': comprehensive_profiles.get('nearest_healthcare_distance_km', pd.Series([0])).mean(),
-        'schools_within_1km_healthcare': len(comprehensive_profiles[comprehensive_profiles['nearest_healthcare_distance_km'] <= 1.0]) if 'nearest_healthcare_distance_km' in comprehensive_profiles.columns else 0,
-        'schools_within_2km_healthcare': len(comprehensive_profiles[comprehensive_profiles['nearest_healthcare_distance_km'] <= 2.0]) if 'nearest_healthcare_distance_km' in comprehensive_profiles.columns else 0,
-        'schools_within_5km_healthcare': len(comprehensive_profiles[comprehensive_profiles['nearest_healthcare_distance_km'] <= 5.0]) if 'nearest_healthcare_distance_km' in comprehensive_profiles.columns else 0,
-        'avg_healthcare_within_1km': comprehensive_profiles.get('healthcare_within_1km', pd.Series([0])).mean(),
-        'avg_healthcare_within_2km': comprehensive_profiles.get('healthcare_within_2km', pd.Series([0])).mean(),
-        'avg_healthcare_within_5km': comprehensive_profiles.get('healthcare_within_5km', pd.Series([0])).mean(),
-        
-        # Metro insights
-        'avg_nearest_metro_distance': comprehensive_profiles.get('nearest_metro_distance_km', pd.Series([0])).mean(),
-        'schools_within_1km_metro': len(comprehensive_profiles[comprehensive_profiles['nearest_metro_distance_km'] <= 1.0]) if 'nearest_metro_distance_km' in comprehensive_profiles.columns else 0,
-        'schools_within_2km_metro': len(comprehensive_profiles[comprehensive_profiles['nearest_metro_distance_km'] <= 2.0]) if 'nearest_metro_distance_km' in comprehensive_profiles.columns else 0,
-        'schools_within_5km_metro': len(comprehensive_profiles[comprehensive_profiles['nearest_metro_distance_km'] <= 5.0]) if 'nearest_metro_distance_km' in comprehensive_profiles.columns else 0,
-        'avg_metro_within_1km': comprehensive_profiles.get('metro_within_1km', pd.Series([0])).mean(),
-        'avg_metro_within_2km': comprehensive_profiles.get('metro_within_2km', pd.Series([0])).mean(),
-        'avg_metro_within_5km': comprehensive_profiles.get('metro_within_5km', pd.Series([0])).mean(),
-        
-        # Accessibility scores
-        'avg_community_accessibility_score': comprehensive_profiles['community_accessibility_score'].mean(),
-        'avg_healthcare_accessibility_score': comprehensive_profiles['healthcare_accessibility_score'].mean(),
-        'avg_metro_accessibility_score': comprehensive_profiles['metro_accessibility_score'].mean(),
-        'avg_comprehensive_accessibility_score': comprehensive_profiles['comprehensive_accessibility_score'].mean(),
-        'avg_final_urban_score': comprehensive_profiles['final_urban_score'].mean()
+        # Community, healthcare and metro metrics and score averages in one pass
+        **aggregate_insights(comprehensive_profiles, COMPREHENSIVE_INSIGHTS)
     }
     
     print(f"✅ Created {len(insights)} comprehensive insights")
@@ -418,6 +175,9 @@ def save_comprehensive_results(comprehensive_profiles, insights):
     # Save comprehensive school profiles
     comprehensive_profiles.to_csv(output_dir / "comprehensive_school_profiles_all_datasets.csv", index=False)
     
+    # Save the per-school feature store for rescoring with new weights
+    save_feature_store(extract_features(comprehensive_profiles), output_dir / "school_features.csv")
+    
     # Save insights
     import json
     with open(output_dir / "comprehensive_insights.json", 'w') as f:
@@ -480,15 +240,15 @@ def main():
     """Main comprehensive integration function"""
     try:
         # Step 1: Load all datasets
-        community_df, school_df, healthcare_df, metro_df, healthcare_distances, metro_distances = load_all_datasets()
+        community_df, school_df, healthcare_df, metro_df, distance_summaries = load_all_datasets()
         
-        # Step 2: Calculate school-community distances
-        school_community_distances = calculate_school_community_distances(school_df, community_df)
+        # Step 2: Load (or calculate) school-community distances
+        school_community_distances = load_school_community_distances(school_df, community_df)
         
         # Step 3: Create comprehensive analysis
         community_analysis_df, healthcare_analysis_df, metro_analysis_df = create_comprehensive_analysis(
             school_df, community_df, healthcare_df, metro_df, 
-            school_community_distances, healthcare_distances, metro_distances
+            school_community_distances, distance_summaries
         )
         
         # Step 4: Create comprehensive school profiles
@@ -497,7 +257,7 @@ def main():
         )
         
         # Step 5: Create comprehensive insights
-        insights = create_comprehensive_insights(comprehensive_profiles)
+        insights = create_comprehensive_insights(comprehensive_profiles, community_df, distance_summaries)
         
         # Step 6: Save comprehensive results
         output_dir = save_comprehensive_results(comprehensive_profiles, insights)
@@ -518,3 +278,7 @@ def main():
 
 if __name__ == "__main__":
     comprehensive_profiles, insights = main()
+    
+    # Exit non-zero on failure so the pipeline runner does not record the stage as done
+    if comprehensive_profiles is None:
+        sys.exit(1)
@@ -3,60 +3,33 @@
 Corrected Insights for Comprehensive Integration
 """
 
-import pandas as pd
 import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from scoring import COMPREHENSIVE_INSIGHTS, aggregate_insights, metric_columns
+from profile_schema import load_school_profiles, load_dataset_totals
+
+# Profile columns the insights read
+INSIGHT_COLUMNS = metric_columns(COMPREHENSIVE_INSIGHTS)
 
 def create_corrected_insights():
     """Create corrected insights with proper column names"""
     print("🔧 Creating corrected insights...")
     
-    # Load the comprehensive data
-    df = pd.read_csv('phase2_integration/comprehensive_results/comprehensive_school_profiles_all_datasets.csv')
+    # Load only the columns the insights read
+    df = load_school_profiles(columns=INSIGHT_COLUMNS)
     
     # Create corrected insights
     insights = {
         # Basic counts
         'total_schools': len(df),
-        'total_communities_analyzed': 226,
-        'total_healthcare_facilities': 2312,
-        'total_metro_stations': 540,
-        
-        # Community insights
-        'avg_nearest_community_distance': df['nearest_community_distance_km'].mean(),
-        'schools_within_1km_community': len(df[df['nearest_community_distance_km'] <= 1.0]),
-        'schools_within_2km_community': len(df[df['nearest_community_distance_km'] <= 2.0]),
-        'schools_within_5km_community': len(df[df['nearest_community_distance_km'] <= 5.0]),
-        'avg_communities_within_1km': df['communities_within_1km'].mean(),
-        'avg_communities_within_2km': df['communities_within_2km'].mean(),
-        'avg_communities_within_5km': df['communities_within_5km'].mean(),
-        'avg_population_within_1km': df['population_within_1km'].mean(),
-        'avg_population_within_2km': df['population_within_2km'].mean(),
-        'avg_population_within_5km': df['population_within_5km'].mean(),
-        
-        # Healthcare insights (using correct column names)
-        'avg_nearest_healthcare_distance': df['nearest_healthcare_distance_km_x'].mean(),
-        'schools_within_1km_healthcare': len(df[df['nearest_healthcare_distance_km_x'] <= 1.0]),
-        'schools_within_2km_healthcare': len(df[df['nearest_healthcare_distance_km_x'] <= 2.0]),
-        'schools_within_5km_healthcare': len(df[df['nearest_healthcare_distance_km_x'] <= 5.0]),
-        'avg_healthcare_within_1km': df['healthcare_within_1km_x'].mean(),
-        'avg_healthcare_within_2km': df['healthcare_within_2km_x'].mean(),
-        'avg_healthcare_within_5km': df['healthcare_within_5km_x'].mean(),
-        
-        # Metro insights (using correct column names)
-        'avg_nearest_metro_distance': df['nearest_metro_distance_km_x'].mean(),
-        'schools_within_1km_metro': len(df[df['nearest_metro_distance_km_x'] <= 1.0]),
-        'schools_within_2km_metro': len(df[df['nearest_metro_distance_km_x'] <= 2.0]),
-        'schools_within_5km_metro': len(df[df['nearest_metro_distance_km_x'] <= 5.0]),
-        'avg_metro_within_1km': df['metro_within_1km_x'].mean(),
-        'avg_metro_within_2km': df['metro_within_2km_x'].mean(),
-        'avg_metro_within_5km': df['metro_within_5km_x'].mean(),
+        # Dataset totals counted by the comprehensive integration run that wrote the profiles
+        **load_dataset_totals(),
         
-        # Accessibility scores
-        'avg_community_accessibility_score': df['community_accessibility_score'].mean(),
-        'avg_healthcare_accessibility_score': df['healthcare_accessibility_score'].mean(),
-        'avg_metro_accessibility_score': df['metro_accessibility_score'].mean(),
-        'avg_comprehensive_accessibility_score': df['comprehensive_accessibility_score'].mean(),
-        'avg_final_urban_score': df['final_urban_score'].mean()
+        # Community, healthcare and metro metrics and score averages in one pass
+        **aggregate_insights(df, COMPREHENSIVE_INSIGHTS)
     }
     
     # Save corrected insights
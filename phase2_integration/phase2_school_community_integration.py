@@ -8,6 +8,21 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import os
+import sys
+import argparse
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'gis_integration' / '04_distance_calculations'))
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from geo_kernel import (distance_matrix_sharded, nearest, sort_weighted_distance_rows, build_radius_index,
+                        count_within_sorted, sum_within_sorted)
+from distance_store import save_distance_store
+from scoring import (score_ladder, load_weights, weighted_sum, aggregate_insights, COMMUNITY_ACCESSIBILITY,
+                     COMMUNITY_DENSITY, PHASE2_INSIGHTS)
+
+COMMUNITY_STORE_DIR = 'phase2_integration/results/community_distance_store'
+
+# Catchment radii (km) reported in the community analysis
+CATCHMENT_RADII_KM = [1, 2, 5]
 
 def load_phase2_data():
     """Load all required data for Phase 2 integration"""
@@ -24,121 +39,55 @@ def load_phase2_data():
     school_df = pd.read_csv('../gis_integration/05_data_integration/final_integrated_data/comprehensive_school_profiles.csv')
     print(f"✅ School data: {len(school_df)} schools")
     
-    # Load existing distance data
-    print("📏 Loading existing distance calculations...")
-    healthcare_distances = pd.read_csv('../gis_integration/04_distance_calculations/distance_results/school_to_healthcare_distances.csv')
-    metro_distances = pd.read_csv('../gis_integration/04_distance_calculations/distance_results/school_to_metro_distances.csv')
-    print(f"✅ Healthcare distances: {len(healthcare_distances)} records")
-    print(f"✅ Metro distances: {len(metro_distances)} records")
-    
-    return community_df, school_df, healthcare_distances, metro_distances
+    return community_df, school_df
 
-def calculate_school_community_distances(school_df, community_df):
-    """Calculate distances from each school to each community"""
+def calculate_school_community_distances(school_df, community_df, workers=1):
+    """Calculate distances from each school to each community as a schools x communities matrix"""
     print("\n🗺️ Calculating school-community distances...")
     
-    from math import radians, cos, sin, asin, sqrt
+    print(f"📊 Calculating {len(school_df) * len(community_df):,} school-community distances on {workers} worker(s)...")
     
-    def haversine_distance(lat1, lon1, lat2, lon2):
-        """Calculate the great circle distance between two points on Earth"""
-        # Convert decimal degrees to radians
-        lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-        
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-        c = 2 * asin(sqrt(a))
-        r = 6371  # Radius of earth in kilometers
-        return c * r
-    
-    # Create distance matrix
-    distances = []
-    total_calculations = len(school_df) * len(community_df)
-    current_calculation = 0
-    
-    print(f"📊 Calculating {total_calculations:,} school-community distances...")
-    
-    for _, school in school_df.iterrows():
-        school_id = school['school_name']
-        school_lat = school['latitude']
-        school_lng = school['longitude']
-        
-        for _, community in community_df.iterrows():
-            community_name = community['Community_Name']
-            community_lat = community['Latitude']
-            community_lng = community['Longitude']
-            community_pop = community['Population']
-            
-            # Calculate distance
-            distance = haversine_distance(school_lat, school_lng, community_lat, community_lng)
-            
-            distances.append({
-                'school_name': school_id,
-                'community_name': community_name,
-                'community_population': community_pop,
-                'distance_km': distance
-            })
-            
-            current_calculation += 1
-            if current_calculation % 10000 == 0:
-                print(f"  Progress: {current_calculation:,}/{total_calculations:,} ({current_calculation/total_calculations*100:.1f}%)")
-    
-    # Convert to DataFrame
-    distance_df = pd.DataFrame(distances)
-    print(f"✅ Completed {len(distance_df):,} distance calculations")
+    distance_matrix = distance_matrix_sharded(
+        school_df['latitude'].values, school_df['longitude'].values,
+        community_df['Latitude'].values, community_df['Longitude'].values,
+        workers
+    )
+    print(f"✅ Completed {distance_matrix.size:,} distance calculations")
     
-    return distance_df
+    return distance_matrix
 
-def create_community_analysis(school_df, community_df, distance_df):
+def build_community_catchments(distance_matrix, community_df):
+    """
+    Sort each school's community distances once and keep running population
+    totals, so communities and population within any radius are one lookup
+    """
+    return build_radius_index(*sort_weighted_distance_rows(distance_matrix, community_df['Population'].values))
+
+def create_community_analysis(school_df, community_df, distance_matrix):
     """Create comprehensive community analysis for each school"""
     print("\n📈 Creating community analysis...")
     
-    # Find nearest community for each school
-    nearest_communities = distance_df.loc[distance_df.groupby('school_name')['distance_km'].idxmin()]
+    catchments = build_community_catchments(distance_matrix, community_df)
+    nearest_id, nearest_km = nearest(distance_matrix)
     
-    # Find communities within 1km, 2km, 5km for each school
-    community_analysis = []
+    community_analysis_df = pd.DataFrame({
+        'school_name': school_df['school_name'].values,
+        'nearest_community': community_df['Community_Name'].values[nearest_id],
+        'nearest_community_distance_km': nearest_km,
+        'nearest_community_population': community_df['Population'].values[nearest_id]
+    })
     
-    for school_name in school_df['school_name']:
-        school_distances = distance_df[distance_df['school_name'] == school_name]
-        
-        # Nearest community
-        nearest = school_distances.loc[school_distances['distance_km'].idxmin()]
-        
-        # Communities within different distances
-        within_1km = school_distances[school_distances['distance_km'] <= 1.0]
-        within_2km = school_distances[school_distances['distance_km'] <= 2.0]
-        within_5km = school_distances[school_distances['distance_km'] <= 5.0]
-        
-        # Population analysis
-        total_pop_1km = within_1km['community_population'].sum()
-        total_pop_2km = within_2km['community_population'].sum()
-        total_pop_5km = within_5km['community_population'].sum()
-        
-        # Community count
-        community_count_1km = len(within_1km)
-        community_count_2km = len(within_2km)
-        community_count_5km = len(within_5km)
-        
-        # Average distance to communities
-        avg_distance = school_distances['distance_km'].mean()
-        
-        community_analysis.append({
-            'school_name': school_name,
-            'nearest_community': nearest['community_name'],
-            'nearest_community_distance_km': nearest['distance_km'],
-            'nearest_community_population': nearest['community_population'],
-            'communities_within_1km': community_count_1km,
-            'communities_within_2km': community_count_2km,
-            'communities_within_5km': community_count_5km,
-            'population_within_1km': total_pop_1km,
-            'population_within_2km': total_pop_2km,
-            'population_within_5km': total_pop_5km,
-            'avg_distance_to_communities_km': avg_distance
-        })
+    # Communities within different distances
+    for radius in CATCHMENT_RADII_KM:
+        community_analysis_df[f'communities_within_{radius}km'] = count_within_sorted(catchments, radius)
+    
+    # Population analysis
+    for radius in CATCHMENT_RADII_KM:
+        community_analysis_df[f'population_within_{radius}km'] = sum_within_sorted(catchments, radius)
+    
+    # Average distance to communities
+    community_analysis_df['avg_distance_to_communities_km'] = distance_matrix.mean(axis=1)
     
-    community_analysis_df = pd.DataFrame(community_analysis)
     print(f"✅ Created community analysis for {len(community_analysis_df)} schools")
     
     return community_analysis_df
@@ -151,100 +100,36 @@ def create_enhanced_school_profiles(school_df, community_analysis_df):
     enhanced_profiles = school_df.merge(community_analysis_df, on='school_name', how='left')
     
     # Add community accessibility scores
-    enhanced_profiles['community_accessibility_score'] = enhanced_profiles.apply(
-        lambda row: calculate_community_accessibility_score(row), axis=1
-    )
+    enhanced_profiles['community_accessibility_score'] = score_ladder(enhanced_profiles, COMMUNITY_ACCESSIBILITY)
     
     # Add community density score
-    enhanced_profiles['community_density_score'] = enhanced_profiles.apply(
-        lambda row: calculate_community_density_score(row), axis=1
-    )
+    enhanced_profiles['community_density_score'] = score_ladder(enhanced_profiles, COMMUNITY_DENSITY)
     
     # Add overall community score
-    enhanced_profiles['overall_community_score'] = (
-        enhanced_profiles['community_accessibility_score'] * 0.6 +
-        enhanced_profiles['community_density_score'] * 0.4
+    enhanced_profiles['overall_community_score'] = weighted_sum(
+        enhanced_profiles, load_weights()['overall_community_score']
     )
     
     print(f"✅ Enhanced profiles created for {len(enhanced_profiles)} schools")
     
     return enhanced_profiles
 
-def calculate_community_accessibility_score(row):
-    """Calculate community accessibility score (0-5, lower is better)"""
-    nearest_dist = row['nearest_community_distance_km']
-    communities_1km = row['communities_within_1km']
-    communities_2km = row['communities_within_2km']
-    
-    # Base score from nearest community distance
-    if nearest_dist <= 0.5:
-        base_score = 1.0
-    elif nearest_dist <= 1.0:
-        base_score = 2.0
-    elif nearest_dist <= 2.0:
-        base_score = 3.0
-    elif nearest_dist <= 5.0:
-        base_score = 4.0
-    else:
-        base_score = 5.0
-    
-    # Bonus for multiple communities nearby
-    if communities_1km >= 3:
-        base_score -= 0.5
-    elif communities_1km >= 1:
-        base_score -= 0.2
-    
-    if communities_2km >= 5:
-        base_score -= 0.3
-    
-    return max(1.0, min(5.0, base_score))
-
-def calculate_community_density_score(row):
-    """Calculate community density score (0-5, higher is better)"""
-    pop_1km = row['population_within_1km']
-    pop_2km = row['population_within_2km']
-    pop_5km = row['population_within_5km']
-    
-    # Score based on population density
-    if pop_1km >= 50000:
-        score = 5.0
-    elif pop_1km >= 25000:
-        score = 4.0
-    elif pop_2km >= 50000:
-        score = 3.0
-    elif pop_5km >= 100000:
-        score = 2.0
-    else:
-        score = 1.0
-    
-    return score
-
-def create_phase2_insights(enhanced_profiles):
+def create_phase2_insights(enhanced_profiles, community_df):
     """Create insights and statistics for Phase 2"""
     print("\n💡 Creating Phase 2 insights...")
     
     insights = {
         'total_schools': len(enhanced_profiles),
-        'total_communities_analyzed': 226,
-        'avg_nearest_community_distance': enhanced_profiles['nearest_community_distance_km'].mean(),
-        'schools_within_1km_community': len(enhanced_profiles[enhanced_profiles['nearest_community_distance_km'] <= 1.0]),
-        'schools_within_2km_community': len(enhanced_profiles[enhanced_profiles['nearest_community_distance_km'] <= 2.0]),
-        'schools_within_5km_community': len(enhanced_profiles[enhanced_profiles['nearest_community_distance_km'] <= 5.0]),
-        'avg_communities_within_1km': enhanced_profiles['communities_within_1km'].mean(),
-        'avg_communities_within_2km': enhanced_profiles['communities_within_2km'].mean(),
-        'avg_communities_within_5km': enhanced_profiles['communities_within_5km'].mean(),
-        'avg_population_within_1km': enhanced_profiles['population_within_1km'].mean(),
-        'avg_population_within_2km': enhanced_profiles['population_within_2km'].mean(),
-        'avg_population_within_5km': enhanced_profiles['population_within_5km'].mean(),
-        'avg_community_accessibility_score': enhanced_profiles['community_accessibility_score'].mean(),
-        'avg_community_density_score': enhanced_profiles['community_density_score'].mean(),
-        'avg_overall_community_score': enhanced_profiles['overall_community_score'].mean()
+        'total_communities_analyzed': len(community_df),
+        
+        # Community metrics and score averages in one pass
+        **aggregate_insights(enhanced_profiles, PHASE2_INSIGHTS)
     }
     
     print(f"✅ Created {len(insights)} key insights")
     return insights
 
-def save_phase2_results(enhanced_profiles, community_analysis_df, distance_df, insights):
+def save_phase2_results(enhanced_profiles, community_analysis_df, school_df, community_df, distance_matrix, insights):
     """Save all Phase 2 results"""
     print("\n💾 Saving Phase 2 results...")
     
@@ -258,9 +143,9 @@ def save_phase2_results(enhanced_profiles, community_analysis_df, distance_df, i
     # Save community analysis
     community_analysis_df.to_csv(output_dir / "school_community_analysis.csv", index=False)
     
-    # Save distance matrix (sample for performance)
-    distance_sample = distance_df.sample(n=min(10000, len(distance_df)))
-    distance_sample.to_csv(output_dir / "school_community_distances_sample.csv", index=False)
+    # Save the full school x community distance matrix (float64, memory-mappable) with id tables;
+    # kept at full precision so the comprehensive integration reproduces these results exactly
+    save_distance_store('community', distance_matrix, school_df, community_df, COMMUNITY_STORE_DIR, dtype=np.float64)
     
     # Save insights
     import json
@@ -299,7 +184,7 @@ def save_phase2_results(enhanced_profiles, community_analysis_df, distance_df, i
 ## 📁 Files Created
 - `enhanced_school_profiles_with_communities.csv` - Complete school profiles with community data
 - `school_community_analysis.csv` - Detailed community analysis per school
-- `school_community_distances_sample.csv` - Sample of distance calculations
+- `community_distance_store/` - Full school x community distance matrix (float64 .npy) with school and community id tables
 - `phase2_insights.json` - Complete insights and statistics
 
 ## 🚀 Next Steps
@@ -312,26 +197,28 @@ Phase 2 complete! Ready for Phase 3: Enhanced Dashboard Creation
     print(f"✅ Phase 2 results saved to: {output_dir}")
     return output_dir
 
-def main():
+def main(workers=1):
     """Main Phase 2 execution function"""
     try:
         # Step 1: Load data
-        community_df, school_df, healthcare_distances, metro_distances = load_phase2_data()
+        community_df, school_df = load_phase2_data()
         
         # Step 2: Calculate school-community distances
-        distance_df = calculate_school_community_distances(school_df, community_df)
+        distance_matrix = calculate_school_community_distances(school_df, community_df, workers)
         
         # Step 3: Create community analysis
-        community_analysis_df = create_community_analysis(school_df, community_df, distance_df)
+        community_analysis_df = create_community_analysis(school_df, community_df, distance_matrix)
         
         # Step 4: Create enhanced school profiles
         enhanced_profiles = create_enhanced_school_profiles(school_df, community_analysis_df)
         
         # Step 5: Create insights
-        insights = create_phase2_insights(enhanced_profiles)
+        insights = create_phase2_insights(enhanced_profiles, community_df)
         
         # Step 6: Save results
-        output_dir = save_phase2_results(enhanced_profiles, community_analysis_df, distance_df, insights)
+        output_dir = save_phase2_results(
+            enhanced_profiles, community_analysis_df, school_df, community_df, distance_matrix, insights
+        )
         
         print("\n" + "=" * 60)
         print("🎉 PHASE 2 COMPLETE!")
@@ -348,4 +235,13 @@ def main():
         return None, None
 
 if __name__ == "__main__":
-    enhanced_profiles, insights = main()
+    parser = argparse.ArgumentParser(description="Phase 2 school-community integration")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="shard school-community distances across this many processes")
+    args = parser.parse_args()
+    
+    enhanced_profiles, insights = main(workers=args.workers)
+    
+    # Exit non-zero on failure so the pipeline runner does not record the stage as done
+    if enhanced_profiles is None:
+        sys.exit(1)
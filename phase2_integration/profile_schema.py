@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Output schema for the comprehensive school profiles
+One column per metric (no _x/_y merge duplicates), in a fixed order with fixed dtypes
+"""
+
+import json
+import pandas as pd
+from pathlib import Path
+
+PROFILES_PATH = (Path(__file__).resolve().parent / 'phase2_integration' / 'comprehensive_results' /
+                 'comprehensive_school_profiles_all_datasets.csv')
+
+# Dataset totals recorded in comprehensive_insights.json
+DATASET_TOTALS = ['total_communities_analyzed', 'total_healthcare_facilities', 'total_metro_stations']
+
+# Column -> dtype, in output order
+PROFILE_SCHEMA = {
+    # School information
+    'school_name': 'str',
+    'location': 'category',
+    'latitude': 'float64',
+    'longitude': 'float64',
+    'grades': 'category',
+    'students': 'Int32',
+    'year_established': 'Int32',
+    'type_of_school': 'str',
+    
+    # Healthcare accessibility
+    'nearest_healthcare_name': 'str',
+    'nearest_healthcare_type': 'category',
+    'nearest_healthcare_distance_km': 'float64',
+    'healthcare_within_1km': 'int32',
+    'healthcare_within_2km': 'int32',
+    'healthcare_within_5km': 'int32',
+    'total_healthcare_facilities': 'int32',
+    'avg_distance_to_healthcare_km': 'float64',
+    'hospitals_within_5km': 'int32',
+    'clinics_within_5km': 'int32',
+    'pharmacies_within_5km': 'int32',
+    
+    # Metro accessibility
+    'nearest_metro_station': 'category',
+    'nearest_metro_distance_km': 'float64',
+    'metro_within_1km': 'int32',
+    'metro_within_2km': 'int32',
+    'metro_within_5km': 'int32',
+    'total_metro_stations': 'int32',
+    'avg_distance_to_metro_km': 'float64',
+    'food_venues_within_5km': 'int32',
+    'shopping_venues_within_5km': 'int32',
+    'entertainment_venues_within_5km': 'int32',
+    
+    # Community accessibility
+    'nearest_community': 'category',
+    'nearest_community_distance_km': 'float64',
+    'nearest_community_population': 'int64',
+    'communities_within_1km': 'int32',
+    'communities_within_2km': 'int32',
+    'communities_within_5km': 'int32',
+    'population_within_1km': 'int64',
+    'population_within_2km': 'int64',
+    'population_within_5km': 'int64',
+    'avg_distance_to_communities_km': 'float64',
+    
+    # Scores
+    'accessibility_score': 'float64',
+    'overall_urban_score': 'float64',
+    'community_accessibility_score': 'float64',
+    'healthcare_accessibility_score': 'float64',
+    'metro_accessibility_score': 'float64',
+    'comprehensive_accessibility_score': 'float64',
+    'final_urban_score': 'float64'
+}
+
+def project_profiles(profiles):
+    """Select the schema columns in schema order and cast them to the schema dtypes"""
+    missing = [column for column in PROFILE_SCHEMA if column not in profiles.columns]
+    if missing:
+        raise KeyError(f"Profiles are missing schema columns: {missing}")
+    
+    return profiles[list(PROFILE_SCHEMA)].astype(PROFILE_SCHEMA)
+
+def load_school_profiles(path=PROFILES_PATH, columns=None):
+    """Load the comprehensive school profiles (optionally only some columns) with schema dtypes"""
+    columns = list(PROFILE_SCHEMA) if columns is None else list(columns)
+    
+    return pd.read_csv(path, usecols=columns, dtype={column: PROFILE_SCHEMA[column] for column in columns})[columns]
+
+def load_dataset_totals(profiles_path=PROFILES_PATH):
+    """
+    Community, healthcare facility and metro station totals counted by the
+    comprehensive integration, from the comprehensive_insights.json beside the profiles
+    """
+    with open(Path(profiles_path).with_name('comprehensive_insights.json')) as f:
+        insights = json.load(f)
+    
+    return {total: insights[total] for total in DATASET_TOTALS}
@@ -12,8 +12,21 @@ from plotly.subplots import make_subplots
 import plotly.figure_factory as ff
 from dash import Dash, html, dcc, Input, Output, dash_table, State, callback
 from datetime import datetime
+from pathlib import Path
 import json
 import os
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'gis_integration' / '04_distance_calculations'))
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'phase2_integration'))
+from geo_kernel import count_within_sorted
+from distance_store import load_radius_index
+from profile_schema import load_school_profiles, load_dataset_totals
+
+# Default and largest search radius (km) for the facilities-within-radius slider
+DEFAULT_RADIUS_KM = 2.0
+MAX_RADIUS_KM = 10.0
 
 class AdvancedDubaiMapDashboard:
     def __init__(self, data_path):
@@ -21,22 +34,23 @@ class AdvancedDubaiMapDashboard:
         self.df = None
         self.app = None
         self.insights = {}
+        self.radius_indexes = {}
         
     def load_data(self):
         """Load comprehensive integrated data"""
         print("Loading comprehensive integrated data...")
-        self.df = pd.read_csv(self.data_path)
+        self.df = load_school_profiles(self.data_path)
         print(f"Loaded {len(self.df)} schools with complete profiles")
         
         # Create enhanced data structure
         self.df['healthcare_accessibility_tier'] = pd.cut(
-            self.df['nearest_healthcare_distance_km_x'],
+            self.df['nearest_healthcare_distance_km'],
             bins=[0, 0.5, 1.0, 2.0, float('inf')],
             labels=['Excellent', 'Good', 'Moderate', 'Poor']
         )
         
         self.df['metro_accessibility_tier'] = pd.cut(
-            self.df['nearest_metro_distance_km_x'],
+            self.df['nearest_metro_distance_km'],
             bins=[0, 1.0, 2.0, 5.0, float('inf')],
             labels=['Excellent', 'Good', 'Moderate', 'Poor']
         )
@@ -68,20 +82,64 @@ class AdvancedDubaiMapDashboard:
                 4: 'Western Cluster'
             })
         
+        self.load_radius_indexes()
+        self.apply_search_radius(DEFAULT_RADIUS_KM)
+        
         return self.df
     
+    def load_radius_indexes(self):
+        """Load per-school sorted facility distances saved by the distance calculation stage"""
+        for kind in ['healthcare', 'metro']:
+            try:
+                radius_index, cutoff_km, school_table = load_radius_index(kind)
+            except FileNotFoundError:
+                print(f"No sorted {kind} distances found; run the distance calculation stage for radius search")
+                continue
+            
+            # Store rows follow the distance stage's school order; dashboard rows are matched by name
+            positions = pd.Index(school_table['school_name']).get_indexer(self.df['school_name'])
+            self.radius_indexes[kind] = {'index': radius_index, 'cutoff_km': cutoff_km, 'positions': positions}
+        
+        return self.radius_indexes
+    
+    def apply_search_radius(self, radius_km):
+        """Recount healthcare facilities and metro stations within radius_km of every school"""
+        for kind in ['healthcare', 'metro']:
+            counts = np.full(len(self.df), np.nan)
+            radius_index = self.radius_indexes.get(kind)
+            
+            if radius_index is not None and radius_km <= radius_index['cutoff_km']:
+                store_counts = count_within_sorted(radius_index['index'], radius_km)
+                matched = radius_index['positions'] >= 0
+                counts[matched] = store_counts[radius_index['positions'][matched]]
+            
+            self.df[f'{kind}_within_radius'] = counts
+        
+        return self.df
+    
+    def max_search_radius(self):
+        """
+        Largest radius the loaded stores can answer: sparse, blocked and index
+        stores only hold pairs within their cutoff_km, the dense store any radius
+        """
+        cutoffs = [radius_index['cutoff_km'] for radius_index in self.radius_indexes.values()]
+        
+        return min([MAX_RADIUS_KM] + cutoffs)
+    
     def create_insights(self):
         """Create comprehensive insights"""
         print("Creating comprehensive insights...")
         
+        totals = load_dataset_totals(self.data_path)
+        
         self.insights = {
             'total_schools': len(self.df),
-            'total_communities': 226,
-            'total_healthcare': 2312,
-            'total_metro': 540,
+            'total_communities': totals['total_communities_analyzed'],
+            'total_healthcare': totals['total_healthcare_facilities'],
+            'total_metro': totals['total_metro_stations'],
             
             'healthcare_stats': {
-                'mean_distance': round(self.df['nearest_healthcare_distance_km_x'].mean(), 3),
+                'mean_distance': round(self.df['nearest_healthcare_distance_km'].mean(), 3),
                 'excellent_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Excellent']),
                 'good_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Good']),
                 'moderate_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Moderate']),
@@ -89,7 +147,7 @@ class AdvancedDubaiMapDashboard:
             },
             
             'metro_stats': {
-                'mean_distance': round(self.df['nearest_metro_distance_km_x'].mean(), 3),
+                'mean_distance': round(self.df['nearest_metro_distance_km'].mean(), 3),
                 'excellent_access': len(self.df[self.df['metro_accessibility_tier'] == 'Excellent']),
                 'good_access': len(self.df[self.df['metro_accessibility_tier'] == 'Good']),
                 'moderate_access': len(self.df[self.df['metro_accessibility_tier'] == 'Moderate']),
@@ -199,6 +257,8 @@ class AdvancedDubaiMapDashboard:
     
     def create_advanced_filters(self):
         """Create advanced filtering controls with better styling"""
+        max_radius = self.max_search_radius()
+        
         return html.Div([
             html.Div([
                 html.H4("🔍 Advanced Filters", style={'color': '#00d4ff', 'margin-bottom': '25px', 'font-weight': '700', 'font-size': '1.4rem'}),
@@ -283,6 +343,35 @@ class AdvancedDubaiMapDashboard:
                     )
                 ], style={'margin-bottom': '20px'}),
                 
+                # Search Radius (answered from the sorted distance store, up to its cutoff)
+                html.Div([
+                    html.Label("Search Radius (km):", style={'color': '#ffffff', 'font-weight': '600', 'margin-bottom': '8px', 'font-size': '1.1rem'}),
+                    dcc.Slider(
+                        id='radius-slider',
+                        min=0.5,
+                        max=max_radius,
+                        step=0.5,
+                        value=min(DEFAULT_RADIUS_KM, max_radius),
+                        marks={i: f'{i}km' for i in range(0, int(max_radius) + 1, 2 if max_radius > 5 else 1)},
+                        tooltip={"placement": "bottom", "always_visible": True},
+                        className="custom-slider"
+                    )
+                ], style={'margin-bottom': '20px'}),
+                
+                html.Div([
+                    html.Label("Min Healthcare Facilities in Radius:", style={'color': '#ffffff', 'font-weight': '600', 'margin-bottom': '8px', 'font-size': '1.1rem'}),
+                    dcc.Slider(
+                        id='min-healthcare-in-radius-slider',
+                        min=0,
+                        max=100,
+                        step=5,
+                        value=0,
+                        marks={i: f'{i}' for i in range(0, 101, 20)},
+                        tooltip={"placement": "bottom", "always_visible": True},
+                        className="custom-slider"
+                    )
+                ], style={'margin-bottom': '20px'}),
+                
                 # Urban Score Range
                 html.Div([
                     html.Label("Urban Score Range:", style={'color': '#ffffff', 'font-weight': '600', 'margin-bottom': '8px', 'font-size': '1.1rem'}),
@@ -368,12 +457,16 @@ class AdvancedDubaiMapDashboard:
                          'Community: %{customdata[2]:.2f}km<br>' +
                          'Urban Score: %{customdata[3]:.2f}<br>' +
                          'Accessibility: %{marker.color:.2f}<br>' +
+                         'Healthcare in radius: %{customdata[4]}<br>' +
+                         'Metro stations in radius: %{customdata[5]}<br>' +
                          '<extra></extra>',
             customdata=list(zip(
-                self.df['nearest_healthcare_distance_km_x'],
-                self.df['nearest_metro_distance_km_x'],
+                self.df['nearest_healthcare_distance_km'],
+                self.df['nearest_metro_distance_km'],
                 self.df['nearest_community_distance_km'],
-                self.df['final_urban_score']
+                self.df['final_urban_score'],
+                self.df['healthcare_within_radius'],
+                self.df['metro_within_radius']
             )),
             name="Schools",
             showlegend=False
@@ -452,7 +545,7 @@ class AdvancedDubaiMapDashboard:
         # Distance distribution
         hc_fig.add_trace(
             go.Histogram(
-                x=self.df['nearest_healthcare_distance_km_x'],
+                x=self.df['nearest_healthcare_distance_km'],
                 name='Healthcare Distance',
                 marker_color='#00ff88',
                 opacity=0.8,
@@ -476,7 +569,7 @@ class AdvancedDubaiMapDashboard:
         )
         
         # School type analysis
-        school_type_analysis = self.df.groupby('type_of_school')['nearest_healthcare_distance_km_x'].mean().sort_values()
+        school_type_analysis = self.df.groupby('type_of_school')['nearest_healthcare_distance_km'].mean().sort_values()
         hc_fig.add_trace(
             go.Bar(
                 x=school_type_analysis.index,
@@ -529,7 +622,7 @@ class AdvancedDubaiMapDashboard:
         # Distance distribution
         metro_fig.add_trace(
             go.Histogram(
-                x=self.df['nearest_metro_distance_km_x'],
+                x=self.df['nearest_metro_distance_km'],
                 name='Metro Distance',
                 marker_color='#ff6b6b',
                 opacity=0.8,
@@ -555,8 +648,8 @@ class AdvancedDubaiMapDashboard:
         # Correlation scatter
         metro_fig.add_trace(
             go.Scatter(
-                x=self.df['nearest_healthcare_distance_km_x'],
-                y=self.df['nearest_metro_distance_km_x'],
+                x=self.df['nearest_healthcare_distance_km'],
+                y=self.df['nearest_metro_distance_km'],
                 mode='markers',
                 marker=dict(
                     color=self.df['comprehensive_accessibility_score'],
@@ -729,9 +822,15 @@ class AdvancedDubaiMapDashboard:
              Input('healthcare-distance-slider', 'value'),
              Input('metro-distance-slider', 'value'),
              Input('urban-score-slider', 'value'),
+             Input('radius-slider', 'value'),
+             Input('min-healthcare-in-radius-slider', 'value'),
              Input('reset-filters', 'n_clicks')]
         )
-        def update_dashboard(school_type, performance, cluster, hc_distance, metro_distance, urban_score, reset_clicks):
+        def update_dashboard(school_type, performance, cluster, hc_distance, metro_distance, urban_score,
+                             radius_km, min_healthcare_in_radius, reset_clicks):
+            # Radius counts are binary searches over sorted distances, so no distance recomputation
+            self.apply_search_radius(radius_km)
+            
             # Filter data based on inputs
             filtered_df = self.df.copy()
             
@@ -746,27 +845,33 @@ class AdvancedDubaiMapDashboard:
             
             # Distance filters
             filtered_df = filtered_df[
-                (filtered_df['nearest_healthcare_distance_km_x'] >= hc_distance[0]) &
-                (filtered_df['nearest_healthcare_distance_km_x'] <= hc_distance[1]) &
-                (filtered_df['nearest_metro_distance_km_x'] >= metro_distance[0]) &
-                (filtered_df['nearest_metro_distance_km_x'] <= metro_distance[1]) &
+                (filtered_df['nearest_healthcare_distance_km'] >= hc_distance[0]) &
+                (filtered_df['nearest_healthcare_distance_km'] <= hc_distance[1]) &
+                (filtered_df['nearest_metro_distance_km'] >= metro_distance[0]) &
+                (filtered_df['nearest_metro_distance_km'] <= metro_distance[1]) &
                 (filtered_df['final_urban_score'] >= urban_score[0]) &
                 (filtered_df['final_urban_score'] <= urban_score[1])
             ]
             
+            if min_healthcare_in_radius > 0:
+                filtered_df = filtered_df[filtered_df['healthcare_within_radius'] >= min_healthcare_in_radius]
+            
             # Update map
             map_fig = self.create_sophisticated_dubai_map()
             if len(filtered_df) > 0:
-                map_fig.data[1].lat = filtered_df['latitude']
-                map_fig.data[1].lon = filtered_df['longitude']
-                map_fig.data[1].marker.size = filtered_df['final_urban_score'] * 3 + 4
-                map_fig.data[1].marker.color = filtered_df['comprehensive_accessibility_score']
-                map_fig.data[1].text = filtered_df['school_name']
-                map_fig.data[1].customdata = list(zip(
-                    filtered_df['nearest_healthcare_distance_km_x'],
-                    filtered_df['nearest_metro_distance_km_x'],
+                # Trace 0 is the schools layer (trace 1 holds the metro stations)
+                map_fig.data[0].lat = filtered_df['latitude']
+                map_fig.data[0].lon = filtered_df['longitude']
+                map_fig.data[0].marker.size = filtered_df['final_urban_score'] * 3 + 4
+                map_fig.data[0].marker.color = filtered_df['comprehensive_accessibility_score']
+                map_fig.data[0].text = filtered_df['school_name']
+                map_fig.data[0].customdata = list(zip(
+                    filtered_df['nearest_healthcare_distance_km'],
+                    filtered_df['nearest_metro_distance_km'],
                     filtered_df['nearest_community_distance_km'],
-                    filtered_df['final_urban_score']
+                    filtered_df['final_urban_score'],
+                    filtered_df['healthcare_within_radius'],
+                    filtered_df['metro_within_radius']
                 ))
             
             # Update charts
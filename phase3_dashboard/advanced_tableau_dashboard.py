@@ -12,6 +12,13 @@ from datetime import datetime
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'phase2_integration'))
+from scoring import RankingIndex
+from profile_schema import load_school_profiles, load_dataset_totals
 
 class AdvancedTableauDashboard:
     def __init__(self, data_path):
@@ -19,12 +26,21 @@ class AdvancedTableauDashboard:
         self.df = None
         self.insights = {}
         self.dashboard_config = {}
+        self.rankings = None
         
     def load_data(self):
         """Load comprehensive integrated data"""
         print("📊 Loading comprehensive integrated data...")
-        self.df = pd.read_csv(self.data_path)
+        self.df = load_school_profiles(self.data_path)
         print(f"✅ Loaded {len(self.df)} schools with complete profiles")
+        
+        # Partial-sort top-k per ranked column (ascending = lower is better)
+        self.rankings = RankingIndex(self.df, {
+            'nearest_healthcare_distance_km': True,
+            'nearest_metro_distance_km': True,
+            'final_urban_score': False
+        })
+        
         return self.df
     
     def create_advanced_insights(self):
@@ -32,26 +48,28 @@ class AdvancedTableauDashboard:
         print("🧠 Creating advanced insights...")
         
         # Basic statistics
+        totals = load_dataset_totals(self.data_path)
+        
         self.insights = {
             'total_schools': len(self.df),
-            'total_communities': 226,
-            'total_healthcare': 2312,
-            'total_metro': 540,
+            'total_communities': totals['total_communities_analyzed'],
+            'total_healthcare': totals['total_healthcare_facilities'],
+            'total_metro': totals['total_metro_stations'],
             
             # Distance analytics
             'healthcare_distances': {
-                'mean': self.df['nearest_healthcare_distance_km_x'].mean(),
-                'median': self.df['nearest_healthcare_distance_km_x'].median(),
-                'std': self.df['nearest_healthcare_distance_km_x'].std(),
-                'min': self.df['nearest_healthcare_distance_km_x'].min(),
-                'max': self.df['nearest_healthcare_distance_km_x'].max()
+                'mean': self.df['nearest_healthcare_distance_km'].mean(),
+                'median': self.df['nearest_healthcare_distance_km'].median(),
+                'std': self.df['nearest_healthcare_distance_km'].std(),
+                'min': self.df['nearest_healthcare_distance_km'].min(),
+                'max': self.df['nearest_healthcare_distance_km'].max()
             },
             'metro_distances': {
-                'mean': self.df['nearest_metro_distance_km_x'].mean(),
-                'median': self.df['nearest_metro_distance_km_x'].median(),
-                'std': self.df['nearest_metro_distance_km_x'].std(),
-                'min': self.df['nearest_metro_distance_km_x'].min(),
-                'max': self.df['nearest_metro_distance_km_x'].max()
+                'mean': self.df['nearest_metro_distance_km'].mean(),
+                'median': self.df['nearest_metro_distance_km'].median(),
+                'std': self.df['nearest_metro_distance_km'].std(),
+                'min': self.df['nearest_metro_distance_km'].min(),
+                'max': self.df['nearest_metro_distance_km'].max()
             },
             'community_distances': {
                 'mean': self.df['nearest_community_distance_km'].mean(),
@@ -63,35 +81,35 @@ class AdvancedTableauDashboard:
             
             # Accessibility tiers
             'healthcare_tiers': {
-                'excellent': len(self.df[self.df['nearest_healthcare_distance_km_x'] <= 0.5]),
-                'good': len(self.df[(self.df['nearest_healthcare_distance_km_x'] > 0.5) & 
-                                  (self.df['nearest_healthcare_distance_km_x'] <= 1.0)]),
-                'moderate': len(self.df[(self.df['nearest_healthcare_distance_km_x'] > 1.0) & 
-                                      (self.df['nearest_healthcare_distance_km_x'] <= 2.0)]),
-                'poor': len(self.df[self.df['nearest_healthcare_distance_km_x'] > 2.0])
+                'excellent': len(self.df[self.df['nearest_healthcare_distance_km'] <= 0.5]),
+                'good': len(self.df[(self.df['nearest_healthcare_distance_km'] > 0.5) & 
+                                  (self.df['nearest_healthcare_distance_km'] <= 1.0)]),
+                'moderate': len(self.df[(self.df['nearest_healthcare_distance_km'] > 1.0) & 
+                                      (self.df['nearest_healthcare_distance_km'] <= 2.0)]),
+                'poor': len(self.df[self.df['nearest_healthcare_distance_km'] > 2.0])
             },
             'metro_tiers': {
-                'excellent': len(self.df[self.df['nearest_metro_distance_km_x'] <= 1.0]),
-                'good': len(self.df[(self.df['nearest_metro_distance_km_x'] > 1.0) & 
-                                  (self.df['nearest_metro_distance_km_x'] <= 2.0)]),
-                'moderate': len(self.df[(self.df['nearest_metro_distance_km_x'] > 2.0) & 
-                                      (self.df['nearest_metro_distance_km_x'] <= 5.0)]),
-                'poor': len(self.df[self.df['nearest_metro_distance_km_x'] > 5.0])
+                'excellent': len(self.df[self.df['nearest_metro_distance_km'] <= 1.0]),
+                'good': len(self.df[(self.df['nearest_metro_distance_km'] > 1.0) & 
+                                  (self.df['nearest_metro_distance_km'] <= 2.0)]),
+                'moderate': len(self.df[(self.df['nearest_metro_distance_km'] > 2.0) & 
+                                      (self.df['nearest_metro_distance_km'] <= 5.0)]),
+                'poor': len(self.df[self.df['nearest_metro_distance_km'] > 5.0])
             },
             
             # School type analysis
             'school_type_analysis': self.df.groupby('type_of_school').agg({
-                'nearest_healthcare_distance_km_x': 'mean',
-                'nearest_metro_distance_km_x': 'mean',
+                'nearest_healthcare_distance_km': 'mean',
+                'nearest_metro_distance_km': 'mean',
                 'nearest_community_distance_km': 'mean',
                 'comprehensive_accessibility_score': 'mean',
                 'final_urban_score': 'mean'
             }).to_dict(),
             
             # Top performers
-            'top_healthcare_access': self.df.nsmallest(10, 'nearest_healthcare_distance_km_x')[['school_name', 'nearest_healthcare_distance_km_x']].to_dict('records'),
-            'top_metro_access': self.df.nsmallest(10, 'nearest_metro_distance_km_x')[['school_name', 'nearest_metro_distance_km_x']].to_dict('records'),
-            'top_urban_scores': self.df.nlargest(10, 'final_urban_score')[['school_name', 'final_urban_score']].to_dict('records'),
+            'top_healthcare_access': self.rankings.top('nearest_healthcare_distance_km', 10)[['school_name', 'nearest_healthcare_distance_km']].to_dict('records'),
+            'top_metro_access': self.rankings.top('nearest_metro_distance_km', 10)[['school_name', 'nearest_metro_distance_km']].to_dict('records'),
+            'top_urban_scores': self.rankings.top('final_urban_score', 10)[['school_name', 'final_urban_score']].to_dict('records'),
             
             # Geographic clusters
             'geographic_clusters': self._analyze_geographic_clusters(),
@@ -118,8 +136,8 @@ class AdvancedTableauDashboard:
                 cluster_schools = self.df[clusters == i]
                 cluster_analysis[f'cluster_{i}'] = {
                     'school_count': len(cluster_schools),
-                    'avg_healthcare_distance': cluster_schools['nearest_healthcare_distance_km_x'].mean(),
-                    'avg_metro_distance': cluster_schools['nearest_metro_distance_km_x'].mean(),
+                    'avg_healthcare_distance': cluster_schools['nearest_healthcare_distance_km'].mean(),
+                    'avg_metro_distance': cluster_schools['nearest_metro_distance_km'].mean(),
                     'avg_urban_score': cluster_schools['final_urban_score'].mean(),
                     'center_lat': cluster_schools['latitude'].mean(),
                     'center_lon': cluster_schools['longitude'].mean()
@@ -130,9 +148,9 @@ class AdvancedTableauDashboard:
     def _analyze_accessibility_patterns(self):
         """Analyze accessibility patterns and correlations"""
         patterns = {
-            'healthcare_metro_correlation': self.df['nearest_healthcare_distance_km_x'].corr(self.df['nearest_metro_distance_km_x']),
-            'healthcare_community_correlation': self.df['nearest_healthcare_distance_km_x'].corr(self.df['nearest_community_distance_km']),
-            'metro_community_correlation': self.df['nearest_metro_distance_km_x'].corr(self.df['nearest_community_distance_km']),
+            'healthcare_metro_correlation': self.df['nearest_healthcare_distance_km'].corr(self.df['nearest_metro_distance_km']),
+            'healthcare_community_correlation': self.df['nearest_healthcare_distance_km'].corr(self.df['nearest_community_distance_km']),
+            'metro_community_correlation': self.df['nearest_metro_distance_km'].corr(self.df['nearest_community_distance_km']),
             'accessibility_score_correlation': self.df['comprehensive_accessibility_score'].corr(self.df['final_urban_score'])
         }
         return patterns
@@ -195,13 +213,13 @@ class AdvancedTableauDashboard:
         
         # Add calculated fields for better analysis
         enhanced_df['healthcare_accessibility_tier'] = pd.cut(
-            enhanced_df['nearest_healthcare_distance_km_x'],
+            enhanced_df['nearest_healthcare_distance_km'],
             bins=[0, 0.5, 1.0, 2.0, float('inf')],
             labels=['Excellent', 'Good', 'Moderate', 'Poor']
         )
         
         enhanced_df['metro_accessibility_tier'] = pd.cut(
-            enhanced_df['nearest_metro_distance_km_x'],
+            enhanced_df['nearest_metro_distance_km'],
             bins=[0, 1.0, 2.0, 5.0, float('inf')],
             labels=['Excellent', 'Good', 'Moderate', 'Poor']
         )
@@ -255,14 +273,14 @@ class AdvancedTableauDashboard:
         main_data = enhanced_df[[
             'school_name', 'location', 'latitude', 'longitude',
             'type_of_school', 'grades', 'students', 'year_established',
-            'nearest_healthcare_name', 'nearest_healthcare_distance_km_x',
-            'nearest_metro_station', 'nearest_metro_distance_km_x',
+            'nearest_healthcare_name', 'nearest_healthcare_distance_km',
+            'nearest_metro_station', 'nearest_metro_distance_km',
             'nearest_community', 'nearest_community_distance_km',
             'healthcare_accessibility_tier', 'metro_accessibility_tier',
             'community_accessibility_tier', 'performance_category',
             'geographic_cluster_label', 'accessibility_category',
             'comprehensive_accessibility_score', 'final_urban_score',
-            'healthcare_within_1km_x', 'metro_within_1km_x',
+            'healthcare_within_1km', 'metro_within_1km',
             'communities_within_1km', 'population_within_1km'
         ]].copy()
         
@@ -278,9 +296,10 @@ class AdvancedTableauDashboard:
                 'Schools with Excellent Metro Access', 'Schools with Excellent Community Access'
             ],
             'value': [
-                len(enhanced_df), 226, 2312, 540,
-                enhanced_df['nearest_healthcare_distance_km_x'].mean(),
-                enhanced_df['nearest_metro_distance_km_x'].mean(),
+                len(enhanced_df), self.insights['total_communities'], self.insights['total_healthcare'],
+                self.insights['total_metro'],
+                enhanced_df['nearest_healthcare_distance_km'].mean(),
+                enhanced_df['nearest_metro_distance_km'].mean(),
                 enhanced_df['nearest_community_distance_km'].mean(),
                 len(enhanced_df[enhanced_df['healthcare_accessibility_tier'] == 'Excellent']),
                 len(enhanced_df[enhanced_df['metro_accessibility_tier'] == 'Excellent']),
@@ -387,18 +406,18 @@ class AdvancedTableauDashboard:
 ### **Calculated Fields**
 ```tableau
 // Healthcare Accessibility Score
-IF [nearest_healthcare_distance_km_x] <= 0.5 THEN 5
-ELSEIF [nearest_healthcare_distance_km_x] <= 1.0 THEN 4
-ELSEIF [nearest_healthcare_distance_km_x] <= 2.0 THEN 3
-ELSEIF [nearest_healthcare_distance_km_x] <= 5.0 THEN 2
+IF [nearest_healthcare_distance_km] <= 0.5 THEN 5
+ELSEIF [nearest_healthcare_distance_km] <= 1.0 THEN 4
+ELSEIF [nearest_healthcare_distance_km] <= 2.0 THEN 3
+ELSEIF [nearest_healthcare_distance_km] <= 5.0 THEN 2
 ELSE 1
 END
 
 // Metro Accessibility Score
-IF [nearest_metro_distance_km_x] <= 1.0 THEN 5
-ELSEIF [nearest_metro_distance_km_x] <= 2.0 THEN 4
-ELSEIF [nearest_metro_distance_km_x] <= 5.0 THEN 3
-ELSEIF [nearest_metro_distance_km_x] <= 10.0 THEN 2
+IF [nearest_metro_distance_km] <= 1.0 THEN 5
+ELSEIF [nearest_metro_distance_km] <= 2.0 THEN 4
+ELSEIF [nearest_metro_distance_km] <= 5.0 THEN 3
+ELSEIF [nearest_metro_distance_km] <= 10.0 THEN 2
 ELSE 1
 END
 
@@ -512,9 +531,9 @@ For technical support or questions about the dashboard:
         # 1. Healthcare Distance Distribution
         fig1 = px.histogram(
             self.df, 
-            x='nearest_healthcare_distance_km_x',
+            x='nearest_healthcare_distance_km',
             title='Healthcare Distance Distribution',
-            labels={'nearest_healthcare_distance_km_x': 'Distance (km)', 'count': 'Number of Schools'},
+            labels={'nearest_healthcare_distance_km': 'Distance (km)', 'count': 'Number of Schools'},
             color_discrete_sequence=['#2E86AB']
         )
         fig1.update_layout(
@@ -527,9 +546,9 @@ For technical support or questions about the dashboard:
         # 2. Metro Distance Distribution
         fig2 = px.histogram(
             self.df, 
-            x='nearest_metro_distance_km_x',
+            x='nearest_metro_distance_km',
             title='Metro Distance Distribution',
-            labels={'nearest_metro_distance_km_x': 'Distance (km)', 'count': 'Number of Schools'},
+            labels={'nearest_metro_distance_km': 'Distance (km)', 'count': 'Number of Schools'},
             color_discrete_sequence=['#A23B72']
         )
         fig2.update_layout(
@@ -559,15 +578,15 @@ For technical support or questions about the dashboard:
         
         # 4. School Type Analysis
         school_type_analysis = self.df.groupby('type_of_school').agg({
-            'nearest_healthcare_distance_km_x': 'mean',
-            'nearest_metro_distance_km_x': 'mean',
+            'nearest_healthcare_distance_km': 'mean',
+            'nearest_metro_distance_km': 'mean',
             'comprehensive_accessibility_score': 'mean'
         }).reset_index()
         
         fig4 = px.bar(
             school_type_analysis,
             x='type_of_school',
-            y=['nearest_healthcare_distance_km_x', 'nearest_metro_distance_km_x'],
+            y=['nearest_healthcare_distance_km', 'nearest_metro_distance_km'],
             title='Average Distances by School Type',
             barmode='group'
         )
@@ -585,7 +604,7 @@ For technical support or questions about the dashboard:
             lon='longitude',
             color='comprehensive_accessibility_score',
             size='final_urban_score',
-            hover_data=['school_name', 'type_of_school', 'nearest_healthcare_distance_km_x', 'nearest_metro_distance_km_x'],
+            hover_data=['school_name', 'type_of_school', 'nearest_healthcare_distance_km', 'nearest_metro_distance_km'],
             title='School Locations and Accessibility Scores',
             mapbox_style='open-street-map',
             zoom=10
@@ -15,6 +15,13 @@ import dash_bootstrap_components as dbc
 from datetime import datetime
 import json
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'phase2_integration'))
+from scoring import RankingIndex
+from profile_schema import load_school_profiles, load_dataset_totals
 
 class AdvancedWebDashboard:
     def __init__(self, data_path):
@@ -22,22 +29,23 @@ class AdvancedWebDashboard:
         self.df = None
         self.app = None
         self.insights = {}
+        self.rankings = None
         
     def load_data(self):
         """Load comprehensive integrated data"""
         print("📊 Loading comprehensive integrated data...")
-        self.df = pd.read_csv(self.data_path)
+        self.df = load_school_profiles(self.data_path)
         print(f"✅ Loaded {len(self.df)} schools with complete profiles")
         
         # Create enhanced data structure
         self.df['healthcare_accessibility_tier'] = pd.cut(
-            self.df['nearest_healthcare_distance_km_x'],
+            self.df['nearest_healthcare_distance_km'],
             bins=[0, 0.5, 1.0, 2.0, float('inf')],
             labels=['Excellent', 'Good', 'Moderate', 'Poor']
         )
         
         self.df['metro_accessibility_tier'] = pd.cut(
-            self.df['nearest_metro_distance_km_x'],
+            self.df['nearest_metro_distance_km'],
             bins=[0, 1.0, 2.0, 5.0, float('inf')],
             labels=['Excellent', 'Good', 'Moderate', 'Poor']
         )
@@ -54,20 +62,25 @@ class AdvancedWebDashboard:
             labels=['Low', 'Medium', 'High', 'Excellent']
         )
         
+        # Partial-sort top-k for the top performers table
+        self.rankings = RankingIndex(self.df, {'final_urban_score': False})
+        
         return self.df
     
     def create_insights(self):
         """Create comprehensive insights"""
         print("🧠 Creating comprehensive insights...")
         
+        totals = load_dataset_totals(self.data_path)
+        
         self.insights = {
             'total_schools': len(self.df),
-            'total_communities': 226,
-            'total_healthcare': 2312,
-            'total_metro': 540,
+            'total_communities': totals['total_communities_analyzed'],
+            'total_healthcare': totals['total_healthcare_facilities'],
+            'total_metro': totals['total_metro_stations'],
             
             'healthcare_stats': {
-                'mean_distance': self.df['nearest_healthcare_distance_km_x'].mean(),
+                'mean_distance': self.df['nearest_healthcare_distance_km'].mean(),
                 'excellent_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Excellent']),
                 'good_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Good']),
                 'moderate_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Moderate']),
@@ -75,7 +88,7 @@ class AdvancedWebDashboard:
             },
             
             'metro_stats': {
-                'mean_distance': self.df['nearest_metro_distance_km_x'].mean(),
+                'mean_distance': self.df['nearest_metro_distance_km'].mean(),
                 'excellent_access': len(self.df[self.df['metro_accessibility_tier'] == 'Excellent']),
                 'good_access': len(self.df[self.df['metro_accessibility_tier'] == 'Good']),
                 'moderate_access': len(self.df[self.df['metro_accessibility_tier'] == 'Moderate']),
@@ -140,9 +153,9 @@ class AdvancedWebDashboard:
         # Distance distribution
         fig1 = px.histogram(
             self.df, 
-            x='nearest_healthcare_distance_km_x',
+            x='nearest_healthcare_distance_km',
             title='Healthcare Distance Distribution',
-            labels={'nearest_healthcare_distance_km_x': 'Distance (km)', 'count': 'Number of Schools'},
+            labels={'nearest_healthcare_distance_km': 'Distance (km)', 'count': 'Number of Schools'},
             color_discrete_sequence=['#2E86AB']
         )
         fig1.update_layout(
@@ -164,16 +177,16 @@ class AdvancedWebDashboard:
         
         # School type analysis
         school_type_analysis = self.df.groupby('type_of_school').agg({
-            'nearest_healthcare_distance_km_x': 'mean',
-            'healthcare_within_1km_x': 'mean'
+            'nearest_healthcare_distance_km': 'mean',
+            'healthcare_within_1km': 'mean'
         }).reset_index()
         
         fig3 = px.bar(
             school_type_analysis,
             x='type_of_school',
-            y='nearest_healthcare_distance_km_x',
+            y='nearest_healthcare_distance_km',
             title='Average Healthcare Distance by School Type',
-            color='nearest_healthcare_distance_km_x',
+            color='nearest_healthcare_distance_km',
             color_continuous_scale='RdYlGn_r'
         )
         fig3.update_layout(
@@ -190,9 +203,9 @@ class AdvancedWebDashboard:
         # Distance distribution
         fig1 = px.histogram(
             self.df, 
-            x='nearest_metro_distance_km_x',
+            x='nearest_metro_distance_km',
             title='Metro Distance Distribution',
-            labels={'nearest_metro_distance_km_x': 'Distance (km)', 'count': 'Number of Schools'},
+            labels={'nearest_metro_distance_km': 'Distance (km)', 'count': 'Number of Schools'},
             color_discrete_sequence=['#A23B72']
         )
         fig1.update_layout(
@@ -215,14 +228,14 @@ class AdvancedWebDashboard:
         # Metro access vs healthcare access scatter
         fig3 = px.scatter(
             self.df,
-            x='nearest_healthcare_distance_km_x',
-            y='nearest_metro_distance_km_x',
+            x='nearest_healthcare_distance_km',
+            y='nearest_metro_distance_km',
             color='comprehensive_accessibility_score',
             size='final_urban_score',
             title='Healthcare vs Metro Access Correlation',
             labels={
-                'nearest_healthcare_distance_km_x': 'Healthcare Distance (km)',
-                'nearest_metro_distance_km_x': 'Metro Distance (km)',
+                'nearest_healthcare_distance_km': 'Healthcare Distance (km)',
+                'nearest_metro_distance_km': 'Metro Distance (km)',
                 'comprehensive_accessibility_score': 'Accessibility Score'
             }
         )
@@ -328,8 +341,8 @@ class AdvancedWebDashboard:
             size='final_urban_score',
             hover_data=[
                 'school_name', 'type_of_school', 
-                'nearest_healthcare_distance_km_x', 
-                'nearest_metro_distance_km_x',
+                'nearest_healthcare_distance_km', 
+                'nearest_metro_distance_km',
                 'nearest_community_distance_km'
             ],
             title='School Locations and Accessibility Scores',
@@ -351,13 +364,13 @@ class AdvancedWebDashboard:
         """Create correlation heatmap"""
         # Select numeric columns for correlation
         numeric_cols = [
-            'nearest_healthcare_distance_km_x',
-            'nearest_metro_distance_km_x', 
+            'nearest_healthcare_distance_km',
+            'nearest_metro_distance_km', 
             'nearest_community_distance_km',
             'comprehensive_accessibility_score',
             'final_urban_score',
-            'healthcare_within_1km_x',
-            'metro_within_1km_x',
+            'healthcare_within_1km',
+            'metro_within_1km',
             'communities_within_1km',
             'population_within_1km'
         ]
@@ -377,9 +390,9 @@ class AdvancedWebDashboard:
     
     def create_top_performers_table(self):
         """Create top performers table"""
-        top_performers = self.df.nlargest(20, 'final_urban_score')[[
+        top_performers = self.rankings.top('final_urban_score', 20)[[
             'school_name', 'type_of_school', 'location',
-            'nearest_healthcare_distance_km_x', 'nearest_metro_distance_km_x',
+            'nearest_healthcare_distance_km', 'nearest_metro_distance_km',
             'nearest_community_distance_km', 'comprehensive_accessibility_score',
             'final_urban_score'
         ]].round(3)
@@ -390,8 +403,8 @@ class AdvancedWebDashboard:
                 {"name": "School Name", "id": "school_name"},
                 {"name": "Type", "id": "type_of_school"},
                 {"name": "Location", "id": "location"},
-                {"name": "Healthcare Dist (km)", "id": "nearest_healthcare_distance_km_x"},
-                {"name": "Metro Dist (km)", "id": "nearest_metro_distance_km_x"},
+                {"name": "Healthcare Dist (km)", "id": "nearest_healthcare_distance_km"},
+                {"name": "Metro Dist (km)", "id": "nearest_metro_distance_km"},
                 {"name": "Community Dist (km)", "id": "nearest_community_distance_km"},
                 {"name": "Accessibility Score", "id": "comprehensive_accessibility_score"},
                 {"name": "Urban Score", "id": "final_urban_score"}
@@ -11,24 +11,29 @@ from plotly.subplots import make_subplots
 import plotly.offline as pyo
 import json
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'phase2_integration'))
+from profile_schema import load_school_profiles, load_dataset_totals
 
 def create_static_dashboard():
     """Create a static HTML dashboard"""
     print("🚀 Creating static HTML dashboard...")
     
     # Load data
-    df = pd.read_csv('phase2_integration/phase2_integration/comprehensive_results/comprehensive_school_profiles_all_datasets.csv')
+    df = load_school_profiles()
     print(f"✅ Loaded {len(df)} schools with complete profiles")
     
     # Create enhanced data structure
     df['healthcare_accessibility_tier'] = pd.cut(
-        df['nearest_healthcare_distance_km_x'],
+        df['nearest_healthcare_distance_km'],
         bins=[0, 0.5, 1.0, 2.0, float('inf')],
         labels=['Excellent', 'Good', 'Moderate', 'Poor']
     )
     
     df['metro_accessibility_tier'] = pd.cut(
-        df['nearest_metro_distance_km_x'],
+        df['nearest_metro_distance_km'],
         bins=[0, 1.0, 2.0, 5.0, float('inf')],
         labels=['Excellent', 'Good', 'Moderate', 'Poor']
     )
@@ -46,16 +51,17 @@ def create_static_dashboard():
     )
     
     # Create insights
+    totals = load_dataset_totals()
     insights = {
         'total_schools': len(df),
-        'total_communities': 226,
-        'total_healthcare': 2312,
-        'total_metro': 540,
+        'total_communities': totals['total_communities_analyzed'],
+        'total_healthcare': totals['total_healthcare_facilities'],
+        'total_metro': totals['total_metro_stations'],
         'healthcare_excellent': len(df[df['healthcare_accessibility_tier'] == 'Excellent']),
         'metro_excellent': len(df[df['metro_accessibility_tier'] == 'Excellent']),
         'community_excellent': len(df[df['community_accessibility_tier'] == 'Excellent']),
-        'avg_healthcare_distance': round(df['nearest_healthcare_distance_km_x'].mean(), 3),
-        'avg_metro_distance': round(df['nearest_metro_distance_km_x'].mean(), 3),
+        'avg_healthcare_distance': round(df['nearest_healthcare_distance_km'].mean(), 3),
+        'avg_metro_distance': round(df['nearest_metro_distance_km'].mean(), 3),
         'avg_community_distance': round(df['nearest_community_distance_km'].mean(), 3),
         'avg_urban_score': round(df['final_urban_score'].mean(), 3)
     }
@@ -198,7 +204,7 @@ def create_static_dashboard():
         lon='longitude',
         color='comprehensive_accessibility_score',
         size='final_urban_score',
-        hover_data=['school_name', 'type_of_school', 'nearest_healthcare_distance_km_x', 'nearest_metro_distance_km_x'],
+        hover_data=['school_name', 'type_of_school', 'nearest_healthcare_distance_km', 'nearest_metro_distance_km'],
         title='School Locations and Accessibility Scores',
         mapbox_style='open-street-map',
         zoom=10,
@@ -214,9 +220,9 @@ def create_static_dashboard():
     # 2. Healthcare Analysis
     hc_fig1 = px.histogram(
         df, 
-        x='nearest_healthcare_distance_km_x',
+        x='nearest_healthcare_distance_km',
         title='Healthcare Distance Distribution',
-        labels={'nearest_healthcare_distance_km_x': 'Distance (km)', 'count': 'Number of Schools'},
+        labels={'nearest_healthcare_distance_km': 'Distance (km)', 'count': 'Number of Schools'},
         color_discrete_sequence=['#2E86AB']
     )
     hc_fig1.update_layout(xaxis_title="Distance to Nearest Healthcare (km)", yaxis_title="Number of Schools", title_x=0.5, height=400)
@@ -236,9 +242,9 @@ def create_static_dashboard():
     # 3. Metro Analysis
     metro_fig1 = px.histogram(
         df, 
-        x='nearest_metro_distance_km_x',
+        x='nearest_metro_distance_km',
         title='Metro Distance Distribution',
-        labels={'nearest_metro_distance_km_x': 'Distance (km)', 'count': 'Number of Schools'},
+        labels={'nearest_metro_distance_km': 'Distance (km)', 'count': 'Number of Schools'},
         color_discrete_sequence=['#A23B72']
     )
     metro_fig1.update_layout(xaxis_title="Distance to Nearest Metro (km)", yaxis_title="Number of Schools", title_x=0.5, height=400)
@@ -302,9 +308,9 @@ def create_static_dashboard():
     
     # 6. Correlation Heatmap
     numeric_cols = [
-        'nearest_healthcare_distance_km_x', 'nearest_metro_distance_km_x', 'nearest_community_distance_km',
-        'comprehensive_accessibility_score', 'final_urban_score', 'healthcare_within_1km_x',
-        'metro_within_1km_x', 'communities_within_1km', 'population_within_1km'
+        'nearest_healthcare_distance_km', 'nearest_metro_distance_km', 'nearest_community_distance_km',
+        'comprehensive_accessibility_score', 'final_urban_score', 'healthcare_within_1km',
+        'metro_within_1km', 'communities_within_1km', 'population_within_1km'
     ]
     corr_matrix = df[numeric_cols].corr()
     
@@ -14,6 +14,11 @@ from dash import Dash, html, dcc, Input, Output, dash_table, State, callback
 from datetime import datetime
 import json
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'phase2_integration'))
+from profile_schema import load_school_profiles, load_dataset_totals
 
 class FuturisticDashboard:
     def __init__(self, data_path):
@@ -25,18 +30,18 @@ class FuturisticDashboard:
     def load_data(self):
         """Load comprehensive integrated data"""
         print("📊 Loading comprehensive integrated data...")
-        self.df = pd.read_csv(self.data_path)
+        self.df = load_school_profiles(self.data_path)
         print(f"✅ Loaded {len(self.df)} schools with complete profiles")
         
         # Create enhanced data structure
         self.df['healthcare_accessibility_tier'] = pd.cut(
-            self.df['nearest_healthcare_distance_km_x'],
+            self.df['nearest_healthcare_distance_km'],
             bins=[0, 0.5, 1.0, 2.0, float('inf')],
             labels=['Excellent', 'Good', 'Moderate', 'Poor']
         )
         
         self.df['metro_accessibility_tier'] = pd.cut(
-            self.df['nearest_metro_distance_km_x'],
+            self.df['nearest_metro_distance_km'],
             bins=[0, 1.0, 2.0, 5.0, float('inf')],
             labels=['Excellent', 'Good', 'Moderate', 'Poor']
         )
@@ -74,14 +79,16 @@ class FuturisticDashboard:
         """Create comprehensive insights"""
         print("🧠 Creating comprehensive insights...")
         
+        totals = load_dataset_totals(self.data_path)
+        
         self.insights = {
             'total_schools': len(self.df),
-            'total_communities': 226,
-            'total_healthcare': 2312,
-            'total_metro': 540,
+            'total_communities': totals['total_communities_analyzed'],
+            'total_healthcare': totals['total_healthcare_facilities'],
+            'total_metro': totals['total_metro_stations'],
             
             'healthcare_stats': {
-                'mean_distance': round(self.df['nearest_healthcare_distance_km_x'].mean(), 3),
+                'mean_distance': round(self.df['nearest_healthcare_distance_km'].mean(), 3),
                 'excellent_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Excellent']),
                 'good_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Good']),
                 'moderate_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Moderate']),
@@ -89,7 +96,7 @@ class FuturisticDashboard:
             },
             
             'metro_stats': {
-                'mean_distance': round(self.df['nearest_metro_distance_km_x'].mean(), 3),
+                'mean_distance': round(self.df['nearest_metro_distance_km'].mean(), 3),
                 'excellent_access': len(self.df[self.df['metro_accessibility_tier'] == 'Excellent']),
                 'good_access': len(self.df[self.df['metro_accessibility_tier'] == 'Good']),
                 'moderate_access': len(self.df[self.df['metro_accessibility_tier'] == 'Moderate']),
@@ -333,8 +340,8 @@ class FuturisticDashboard:
                          'Urban Score: %{customdata[3]:.2f}<br>' +
                          '<extra></extra>',
             customdata=list(zip(
-                self.df['nearest_healthcare_distance_km_x'],
-                self.df['nearest_metro_distance_km_x'],
+                self.df['nearest_healthcare_distance_km'],
+                self.df['nearest_metro_distance_km'],
                 self.df['nearest_community_distance_km'],
                 self.df['final_urban_score']
             )),
@@ -377,7 +384,7 @@ class FuturisticDashboard:
         # Distance distribution
         hc_fig.add_trace(
             go.Histogram(
-                x=self.df['nearest_healthcare_distance_km_x'],
+                x=self.df['nearest_healthcare_distance_km'],
                 name='Healthcare Distance',
                 marker_color='#00ff88',
                 opacity=0.8
@@ -398,7 +405,7 @@ class FuturisticDashboard:
         )
         
         # School type analysis
-        school_type_analysis = self.df.groupby('type_of_school')['nearest_healthcare_distance_km_x'].mean().sort_values()
+        school_type_analysis = self.df.groupby('type_of_school')['nearest_healthcare_distance_km'].mean().sort_values()
         hc_fig.add_trace(
             go.Bar(
                 x=school_type_analysis.index,
@@ -445,7 +452,7 @@ class FuturisticDashboard:
         # Distance distribution
         metro_fig.add_trace(
             go.Histogram(
-                x=self.df['nearest_metro_distance_km_x'],
+                x=self.df['nearest_metro_distance_km'],
                 name='Metro Distance',
                 marker_color='#ff6b6b',
                 opacity=0.8
@@ -468,8 +475,8 @@ class FuturisticDashboard:
         # Correlation scatter
         metro_fig.add_trace(
             go.Scatter(
-                x=self.df['nearest_healthcare_distance_km_x'],
-                y=self.df['nearest_metro_distance_km_x'],
+                x=self.df['nearest_healthcare_distance_km'],
+                y=self.df['nearest_metro_distance_km'],
                 mode='markers',
                 marker=dict(
                     color=self.df['comprehensive_accessibility_score'],
@@ -741,10 +748,10 @@ class FuturisticDashboard:
             
             # Distance filters
             filtered_df = filtered_df[
-                (filtered_df['nearest_healthcare_distance_km_x'] >= hc_distance[0]) &
-                (filtered_df['nearest_healthcare_distance_km_x'] <= hc_distance[1]) &
-                (filtered_df['nearest_metro_distance_km_x'] >= metro_distance[0]) &
-                (filtered_df['nearest_metro_distance_km_x'] <= metro_distance[1]) &
+                (filtered_df['nearest_healthcare_distance_km'] >= hc_distance[0]) &
+                (filtered_df['nearest_healthcare_distance_km'] <= hc_distance[1]) &
+                (filtered_df['nearest_metro_distance_km'] >= metro_distance[0]) &
+                (filtered_df['nearest_metro_distance_km'] <= metro_distance[1]) &
                 (filtered_df['final_urban_score'] >= urban_score[0]) &
                 (filtered_df['final_urban_score'] <= urban_score[1])
             ]
@@ -758,8 +765,8 @@ class FuturisticDashboard:
                 map_fig.data[0].marker.color = filtered_df['comprehensive_accessibility_score']
                 map_fig.data[0].text = filtered_df['school_name']
                 map_fig.data[0].customdata = list(zip(
-                    filtered_df['nearest_healthcare_distance_km_x'],
-                    filtered_df['nearest_metro_distance_km_x'],
+                    filtered_df['nearest_healthcare_distance_km'],
+                    filtered_df['nearest_metro_distance_km'],
                     filtered_df['nearest_community_distance_km'],
                     filtered_df['final_urban_score']
                 ))
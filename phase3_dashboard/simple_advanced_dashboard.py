@@ -14,6 +14,13 @@ from dash import Dash, html, dcc, Input, Output, dash_table
 from datetime import datetime
 import json
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'phase2_integration'))
+from scoring import RankingIndex
+from profile_schema import load_school_profiles, load_dataset_totals
 
 class SimpleAdvancedDashboard:
     def __init__(self, data_path):
@@ -21,22 +28,23 @@ class SimpleAdvancedDashboard:
         self.df = None
         self.app = None
         self.insights = {}
+        self.rankings = None
         
     def load_data(self):
         """Load comprehensive integrated data"""
         print("📊 Loading comprehensive integrated data...")
-        self.df = pd.read_csv(self.data_path)
+        self.df = load_school_profiles(self.data_path)
         print(f"✅ Loaded {len(self.df)} schools with complete profiles")
         
         # Create enhanced data structure
         self.df['healthcare_accessibility_tier'] = pd.cut(
-            self.df['nearest_healthcare_distance_km_x'],
+            self.df['nearest_healthcare_distance_km'],
             bins=[0, 0.5, 1.0, 2.0, float('inf')],
             labels=['Excellent', 'Good', 'Moderate', 'Poor']
         )
         
         self.df['metro_accessibility_tier'] = pd.cut(
-            self.df['nearest_metro_distance_km_x'],
+            self.df['nearest_metro_distance_km'],
             bins=[0, 1.0, 2.0, 5.0, float('inf')],
             labels=['Excellent', 'Good', 'Moderate', 'Poor']
         )
@@ -53,20 +61,25 @@ class SimpleAdvancedDashboard:
             labels=['Low', 'Medium', 'High', 'Excellent']
         )
         
+        # Partial-sort top-k for the top performers table
+        self.rankings = RankingIndex(self.df, {'final_urban_score': False})
+        
         return self.df
     
     def create_insights(self):
         """Create comprehensive insights"""
         print("🧠 Creating comprehensive insights...")
         
+        totals = load_dataset_totals(self.data_path)
+        
         self.insights = {
             'total_schools': len(self.df),
-            'total_communities': 226,
-            'total_healthcare': 2312,
-            'total_metro': 540,
+            'total_communities': totals['total_communities_analyzed'],
+            'total_healthcare': totals['total_healthcare_facilities'],
+            'total_metro': totals['total_metro_stations'],
             
             'healthcare_stats': {
-                'mean_distance': round(self.df['nearest_healthcare_distance_km_x'].mean(), 3),
+                'mean_distance': round(self.df['nearest_healthcare_distance_km'].mean(), 3),
                 'excellent_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Excellent']),
                 'good_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Good']),
                 'moderate_access': len(self.df[self.df['healthcare_accessibility_tier'] == 'Moderate']),
@@ -74,7 +87,7 @@ class SimpleAdvancedDashboard:
             },
             
             'metro_stats': {
-                'mean_distance': round(self.df['nearest_metro_distance_km_x'].mean(), 3),
+                'mean_distance': round(self.df['nearest_metro_distance_km'].mean(), 3),
                 'excellent_access': len(self.df[self.df['metro_accessibility_tier'] == 'Excellent']),
                 'good_access': len(self.df[self.df['metro_accessibility_tier'] == 'Good']),
                 'moderate_access': len(self.df[self.df['metro_accessibility_tier'] == 'Moderate']),
@@ -139,9 +152,9 @@ class SimpleAdvancedDashboard:
         # Distance distribution
         fig1 = px.histogram(
             self.df, 
-            x='nearest_healthcare_distance_km_x',
+            x='nearest_healthcare_distance_km',
             title='Healthcare Distance Distribution',
-            labels={'nearest_healthcare_distance_km_x': 'Distance (km)', 'count': 'Number of Schools'},
+            labels={'nearest_healthcare_distance_km': 'Distance (km)', 'count': 'Number of Schools'},
             color_discrete_sequence=['#2E86AB']
         )
         fig1.update_layout(
@@ -164,15 +177,15 @@ class SimpleAdvancedDashboard:
         
         # School type analysis
         school_type_analysis = self.df.groupby('type_of_school').agg({
-            'nearest_healthcare_distance_km_x': 'mean'
+            'nearest_healthcare_distance_km': 'mean'
         }).reset_index()
         
         fig3 = px.bar(
             school_type_analysis,
             x='type_of_school',
-            y='nearest_healthcare_distance_km_x',
+            y='nearest_healthcare_distance_km',
             title='Average Healthcare Distance by School Type',
-            color='nearest_healthcare_distance_km_x',
+            color='nearest_healthcare_distance_km',
             color_continuous_scale='RdYlGn_r'
         )
         fig3.update_layout(
@@ -190,9 +203,9 @@ class SimpleAdvancedDashboard:
         # Distance distribution
         fig1 = px.histogram(
             self.df, 
-            x='nearest_metro_distance_km_x',
+            x='nearest_metro_distance_km',
             title='Metro Distance Distribution',
-            labels={'nearest_metro_distance_km_x': 'Distance (km)', 'count': 'Number of Schools'},
+            labels={'nearest_metro_distance_km': 'Distance (km)', 'count': 'Number of Schools'},
             color_discrete_sequence=['#A23B72']
         )
         fig1.update_layout(
@@ -216,14 +229,14 @@ class SimpleAdvancedDashboard:
         # Metro access vs healthcare access scatter
         fig3 = px.scatter(
             self.df,
-            x='nearest_healthcare_distance_km_x',
-            y='nearest_metro_distance_km_x',
+            x='nearest_healthcare_distance_km',
+            y='nearest_metro_distance_km',
             color='comprehensive_accessibility_score',
             size='final_urban_score',
             title='Healthcare vs Metro Access Correlation',
             labels={
-                'nearest_healthcare_distance_km_x': 'Healthcare Distance (km)',
-                'nearest_metro_distance_km_x': 'Metro Distance (km)',
+                'nearest_healthcare_distance_km': 'Healthcare Distance (km)',
+                'nearest_metro_distance_km': 'Metro Distance (km)',
                 'comprehensive_accessibility_score': 'Accessibility Score'
             }
         )
@@ -331,8 +344,8 @@ class SimpleAdvancedDashboard:
             size='final_urban_score',
             hover_data=[
                 'school_name', 'type_of_school', 
-                'nearest_healthcare_distance_km_x', 
-                'nearest_metro_distance_km_x',
+                'nearest_healthcare_distance_km', 
+                'nearest_metro_distance_km',
                 'nearest_community_distance_km'
             ],
             title='School Locations and Accessibility Scores',
@@ -354,13 +367,13 @@ class SimpleAdvancedDashboard:
         """Create correlation heatmap"""
         # Select numeric columns for correlation
         numeric_cols = [
-            'nearest_healthcare_distance_km_x',
-            'nearest_metro_distance_km_x', 
+            'nearest_healthcare_distance_km',
+            'nearest_metro_distance_km', 
             'nearest_community_distance_km',
             'comprehensive_accessibility_score',
             'final_urban_score',
-            'healthcare_within_1km_x',
-            'metro_within_1km_x',
+            'healthcare_within_1km',
+            'metro_within_1km',
             'communities_within_1km',
             'population_within_1km'
         ]
@@ -380,9 +393,9 @@ class SimpleAdvancedDashboard:
     
     def create_top_performers_table(self):
         """Create top performers table"""
-        top_performers = self.df.nlargest(20, 'final_urban_score')[[
+        top_performers = self.rankings.top('final_urban_score', 20)[[
             'school_name', 'type_of_school', 'location',
-            'nearest_healthcare_distance_km_x', 'nearest_metro_distance_km_x',
+            'nearest_healthcare_distance_km', 'nearest_metro_distance_km',
             'nearest_community_distance_km', 'comprehensive_accessibility_score',
             'final_urban_score'
         ]].round(3)
@@ -393,8 +406,8 @@ class SimpleAdvancedDashboard:
                 {"name": "School Name", "id": "school_name"},
                 {"name": "Type", "id": "type_of_school"},
                 {"name": "Location", "id": "location"},
-                {"name": "Healthcare Dist (km)", "id": "nearest_healthcare_distance_km_x"},
-                {"name": "Metro Dist (km)", "id": "nearest_metro_distance_km_x"},
+                {"name": "Healthcare Dist (km)", "id": "nearest_healthcare_distance_km"},
+                {"name": "Metro Dist (km)", "id": "nearest_metro_distance_km"},
                 {"name": "Community Dist (km)", "id": "nearest_community_distance_km"},
                 {"name": "Accessibility Score", "id": "comprehensive_accessibility_score"},
                 {"name": "Urban Score", "id": "final_urban_score"}
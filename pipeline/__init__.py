@@ -0,0 +1,9 @@
+"""
+Incremental pipeline runner for the school selection platform
+Stages (preprocessing -> gis_integration 01-05 -> phase2 -> dashboards) are
+declared with their inputs and outputs; only stages whose inputs changed re-run
+"""
+
+from .stages import STAGES
+from .runner import (REPO_ROOT, path_digest, stage_fingerprint, outputs_fingerprint, build_dag, select_stages,
+                     run_pipeline)
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Run the pipeline from the repository root
+    python -m pipeline                       # run every stage whose inputs changed
+    python -m pipeline comprehensive_integration --dry-run
+    python -m pipeline --force distance_calculations
+"""
+
+import argparse
+import sys
+
+from .stages import STAGES
+from .runner import run_pipeline
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental pipeline runner")
+    parser.add_argument('targets', nargs='*',
+                        help="stages to bring up to date, with everything upstream of them (default: all)")
+    parser.add_argument('--jobs', type=int, default=4, help="maximum stages running at once")
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE',
+                        help="re-run these stages even if their inputs are unchanged ('all' for every stage)")
+    parser.add_argument('--dry-run', action='store_true', help="report which stages would run without running them")
+    parser.add_argument('--list', action='store_true', help="list the declared stages and exit")
+    args = parser.parse_args()
+    
+    if args.list:
+        for stage in STAGES:
+            print(f"{stage['name']:<28} {stage['script']}")
+        return 0
+    
+    status = run_pipeline(STAGES, targets=args.targets, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    
+    return 1 if 'failed' in status.values() else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
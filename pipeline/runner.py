@@ -0,0 +1,238 @@
+"""
+Incremental DAG runner: each stage is fingerprinted by the content hash of
+its script, arguments and inputs, and re-runs only when that fingerprint (or
+its recorded outputs) changed. Stages whose upstream stages are done run in
+parallel as separate processes
+"""
+
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Fingerprints and per-stage logs, kept under the repository root
+STATE_DIR_NAME = '.pipeline'
+
+SKIPPED_PARTS = {'__pycache__'}
+
+def path_digest(path, root=REPO_ROOT):
+    """SHA-256 over a file, or over every file (relative path + contents) under a directory"""
+    digest = hashlib.sha256()
+    full = root / path
+    
+    if full.is_dir():
+        files = sorted(p for p in full.rglob('*') if p.is_file() and not SKIPPED_PARTS & set(p.parts))
+    elif full.is_file():
+        files = [full]
+    else:
+        return None
+    
+    for file in files:
+        digest.update(file.relative_to(root).as_posix().encode())
+        with open(file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    
+    return digest.hexdigest()
+
+def stage_fingerprint(stage, root=REPO_ROOT):
+    """Content hash of everything a stage reads: script, arguments, working directory and inputs"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([stage['script'], stage.get('cwd', '.'), stage.get('args', [])]).encode())
+    for path in [stage['script']] + sorted(stage['inputs']):
+        digest.update(f"{path}={path_digest(path, root)}".encode())
+    
+    return digest.hexdigest()
+
+def outputs_fingerprint(stage, root=REPO_ROOT):
+    """Content hash of a stage's outputs (None when any output is missing)"""
+    digests = [path_digest(path, root) for path in stage['outputs']]
+    if any(d is None for d in digests):
+        return None
+    
+    return hashlib.sha256('|'.join(digests).encode()).hexdigest()
+
+def contains(outer, inner):
+    """Whether path inner is outer or lies underneath it"""
+    return inner == outer or inner.startswith(outer.rstrip('/') + '/')
+
+def build_dag(stages):
+    """
+    {stage name: set of upstream stage names}, derived from declared paths:
+    a stage depends on the stage that writes (a directory holding) one of its inputs
+    """
+    names = [stage['name'] for stage in stages]
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate stage names in pipeline")
+    
+    upstream = {stage['name']: set() for stage in stages}
+    for stage in stages:
+        for path in stage['inputs']:
+            producers = {other['name'] for other in stages if other is not stage
+                         for output in other['outputs'] if contains(output, path) or contains(path, output)}
+            if len(producers) > 1:
+                raise ValueError(f"Input {path} of {stage['name']} is written by several stages: {sorted(producers)}")
+            upstream[stage['name']] |= producers
+    
+    # Kahn's algorithm, only to reject cycles up front
+    remaining = {name: set(deps) for name, deps in upstream.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Pipeline has a dependency cycle among {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    
+    return upstream
+
+def select_stages(stages, upstream, targets):
+    """Names of the target stages plus everything upstream of them"""
+    known = {stage['name'] for stage in stages}
+    unknown = set(targets) - known
+    if unknown:
+        raise ValueError(f"Unknown stages: {sorted(unknown)}")
+    
+    selected, pending = set(), list(targets)
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(upstream[name])
+    
+    return selected
+
+def load_state(root=REPO_ROOT):
+    """Fingerprints recorded by earlier runs"""
+    path = root / STATE_DIR_NAME / 'state.json'
+    if path.exists():
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+def save_state(state, root=REPO_ROOT):
+    path = root / STATE_DIR_NAME / 'state.json'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+def is_current(stage, state, fingerprint, root=REPO_ROOT):
+    """A stage is current when its inputs and its outputs both match the last successful run"""
+    recorded = state.get(stage['name'])
+    if recorded is None or recorded['fingerprint'] != fingerprint:
+        return False
+    
+    return recorded['outputs'] == outputs_fingerprint(stage, root)
+
+def log_path(name, root=REPO_ROOT):
+    return root / STATE_DIR_NAME / 'logs' / f'{name}.log'
+
+def run_stage(stage, root=REPO_ROOT):
+    """Run one stage script in its working directory, logging its output; returns (returncode, seconds)"""
+    log = log_path(stage['name'], root)
+    log.parent.mkdir(parents=True, exist_ok=True)
+    start = time.time()
+    
+    with open(log, 'w') as f:
+        result = subprocess.run(
+            [sys.executable, str(root / stage['script'])] + list(stage.get('args', [])),
+            cwd=root / stage.get('cwd', '.'), stdout=f, stderr=subprocess.STDOUT
+        )
+    
+    return result.returncode, time.time() - start
+
+def log_tail(name, lines=20, root=REPO_ROOT):
+    with open(log_path(name, root), errors='replace') as f:
+        return ''.join(f.readlines()[-lines:])
+
+def run_pipeline(stages, targets=None, jobs=4, force=(), dry_run=False, root=REPO_ROOT):
+    """
+    Run the stages needed for targets (default: all) in dependency order
+    force   - stage names to re-run regardless of fingerprints ('all' for every stage)
+    dry_run - only report which stages would run
+    Returns {stage name: 'ran' | 'current' | 'would run' | 'failed' | 'not run'}
+    """
+    print("🔗 PIPELINE RUNNER")
+    print("=" * 60)
+    
+    by_name = {stage['name']: stage for stage in stages}
+    upstream = build_dag(stages)
+    selected = select_stages(stages, upstream, targets) if targets else set(by_name)
+    force = set(by_name) if 'all' in force else set(force)
+    
+    state = load_state(root)
+    status = {}
+    ran = set()
+    order = [stage['name'] for stage in stages if stage['name'] in selected]
+    
+    def ready(name):
+        return name not in status and all(status.get(dep) in ('ran', 'current', 'would run')
+                                          for dep in upstream[name] if dep in selected)
+    
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        running = {}
+        running_names = set()
+        failed = False
+        
+        while True:
+            # Decide every stage whose upstream has settled; fingerprints are taken now, after upstream wrote
+            for name in order:
+                if failed or name in running_names or not ready(name):
+                    continue
+                stage = by_name[name]
+                upstream_ran = any(dep in ran for dep in upstream[name])
+                fingerprint = stage_fingerprint(stage, root)
+                
+                if name not in force and is_current(stage, state, fingerprint, root) and not (dry_run and upstream_ran):
+                    status[name] = 'current'
+                    print(f"✅ {name}: up to date")
+                elif dry_run:
+                    status[name] = 'would run'
+                    ran.add(name)
+                    print(f"🔄 {name}: would run")
+                else:
+                    print(f"🚀 {name}: running...")
+                    running[pool.submit(run_stage, stage, root)] = (name, fingerprint)
+                    running_names.add(name)
+            
+            if not running:
+                break
+            
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, fingerprint = running.pop(future)
+                running_names.discard(name)
+                returncode, seconds = future.result()
+                outputs = outputs_fingerprint(by_name[name], root) if returncode == 0 else None
+                
+                if outputs is not None:
+                    status[name] = 'ran'
+                    ran.add(name)
+                    state[name] = {'fingerprint': fingerprint, 'outputs': outputs}
+                    save_state(state, root)
+                    print(f"✅ {name}: done in {seconds:.1f}s")
+                else:
+                    # Fail fast: let running stages finish but start nothing new
+                    status[name] = 'failed'
+                    failed = True
+                    if returncode == 0:
+                        missing = [path for path in by_name[name]['outputs'] if path_digest(path, root) is None]
+                        print(f"❌ {name}: exited cleanly but did not write {missing} after {seconds:.1f}s")
+                    else:
+                        print(f"❌ {name}: exited with {returncode} after {seconds:.1f}s")
+                    print(log_tail(name, root=root))
+    
+    for name in order:
+        status.setdefault(name, 'not run')
+    
+    print("=" * 60)
+    counts = {outcome: sum(1 for s in status.values() if s == outcome) for outcome in sorted(set(status.values()))}
+    print("📊 " + ", ".join(f"{outcome}: {count}" for outcome, count in counts.items()))
+    
+    return status
@@ -0,0 +1,171 @@
+"""
+Declared pipeline stages: script, working directory and the files each stage
+reads and writes (paths relative to the repository root)
+Dependencies are not declared; a stage depends on whichever stage writes one of its inputs
+Inputs include every repository module a stage imports, so code changes invalidate it
+"""
+
+DISTANCE_CODE = ['geo_kernel', 'gis_integration/04_distance_calculations/distance_store.py']
+
+STAGES = [
+    # Preprocessing: the four raw datasets are independent of each other
+    {
+        'name': 'preprocess_schools',
+        'script': 'preprocessing/preprocess_private_schools.py',
+        'inputs': ['datasets/Private-Schools_Database_-(English).xlsx', 'preprocessing/ingest_cache.py'],
+        'outputs': ['preprocessed_datasets/Private-Schools_Database_-(English)_cleaned.csv']
+    },
+    {
+        'name': 'preprocess_population',
+        'script': 'preprocessing/preprocess_dubai_population.py',
+        'inputs': ['datasets/dubai_pop_2019.csv'],
+        'outputs': ['preprocessed_datasets/dubai_pop_2019_cleaned.csv']
+    },
+    {
+        'name': 'preprocess_metro',
+        'script': 'preprocessing/preprocess_metro_venues.py',
+        'inputs': ['datasets/metro_venues_total.csv'],
+        'outputs': ['preprocessed_datasets/metro_venues_total_cleaned.csv']
+    },
+    {
+        'name': 'preprocess_healthcare',
+        'script': 'preprocessing/preprocess_healthcare_facilities.py',
+        'inputs': ['datasets/Sheryan_Facility_Detail.csv', 'preprocessing/keyword_classifier.py'],
+        'outputs': ['preprocessed_datasets/Sheryan_Facility_Detail_cleaned.csv']
+    },
+
+    # Community coordinates (run from inside community_coordinates/)
+    {
+        'name': 'community_coordinates',
+        'script': 'community_coordinates/perfect_coordinates.py',
+        'cwd': 'community_coordinates',
+        'inputs': ['preprocessed_datasets/dubai_pop_2019_cleaned.csv'],
+        'outputs': ['community_coordinates/community_coordinates/dubai_communities_perfect_coordinates.csv']
+    },
+
+    # GIS integration 01-05
+    {
+        'name': 'data_validation',
+        'script': 'gis_integration/01_data_validation/validate_datasets.py',
+        'inputs': [
+            'preprocessed_datasets/Private-Schools_Database_-(English)_cleaned.csv',
+            'preprocessed_datasets/dubai_pop_2019_cleaned.csv',
+            'preprocessed_datasets/metro_venues_total_cleaned.csv',
+            'preprocessed_datasets/Sheryan_Facility_Detail_cleaned.csv'
+        ],
+        # Validation only reports; the runner's log of the run stands in as its output
+        'outputs': ['.pipeline/logs/data_validation.log']
+    },
+    {
+        'name': 'coordinate_standardization',
+        'script': 'gis_integration/02_coordinate_standardization/fix_coordinates.py',
+        'inputs': [
+            'preprocessed_datasets/Private-Schools_Database_-(English)_cleaned.csv',
+            'preprocessed_datasets/metro_venues_total_cleaned.csv',
+            'preprocessed_datasets/Sheryan_Facility_Detail_cleaned.csv'
+        ],
+        'outputs': [
+            'preprocessed_datasets/Sheryan_Facility_Detail_coordinates_cleaned.csv',
+            'preprocessed_datasets/Private-Schools_Database_coordinates_validated.csv'
+        ]
+    },
+    {
+        'name': 'spatial_preparation',
+        'script': 'gis_integration/03_spatial_preparation/prepare_spatial_data.py',
+        'inputs': [
+            'preprocessed_datasets/Private-Schools_Database_coordinates_validated.csv',
+            'preprocessed_datasets/Sheryan_Facility_Detail_coordinates_cleaned.csv',
+            'preprocessed_datasets/metro_venues_total_cleaned.csv',
+            'preprocessed_datasets/dubai_pop_2019_cleaned.csv',
+            'community_coordinates/community_coordinates/dubai_communities_perfect_coordinates.csv'
+        ] + DISTANCE_CODE,
+        'outputs': [
+            'gis_integration/03_spatial_preparation/spatial_prepared_data',
+            'gis_integration/03_spatial_preparation/spatial_indexes'
+        ]
+    },
+    {
+        'name': 'distance_calculations',
+        'script': 'gis_integration/04_distance_calculations/calculate_distances.py',
+        'inputs': [
+            'gis_integration/03_spatial_preparation/spatial_prepared_data',
+            'gis_integration/03_spatial_preparation/spatial_indexes',
+            'scoring'
+        ] + DISTANCE_CODE,
+        'outputs': ['gis_integration/04_distance_calculations/distance_results']
+    },
+    {
+        'name': 'data_integration',
+        'script': 'gis_integration/05_data_integration/integrate_final_dataset.py',
+        'inputs': ['gis_integration/04_distance_calculations/distance_results', 'scoring'] + DISTANCE_CODE,
+        'outputs': ['gis_integration/05_data_integration/final_integrated_data']
+    },
+
+    # Phase 2 (run from inside phase2_integration/)
+    {
+        'name': 'phase2_community',
+        'script': 'phase2_integration/phase2_school_community_integration.py',
+        'cwd': 'phase2_integration',
+        'inputs': [
+            'community_coordinates/community_coordinates/dubai_communities_perfect_coordinates.csv',
+            'gis_integration/05_data_integration/final_integrated_data/comprehensive_school_profiles.csv',
+            'scoring'
+        ] + DISTANCE_CODE,
+        'outputs': ['phase2_integration/phase2_integration/results']
+    },
+    {
+        'name': 'comprehensive_integration',
+        'script': 'phase2_integration/comprehensive_integration.py',
+        'cwd': 'phase2_integration',
+        'inputs': [
+            'community_coordinates/community_coordinates/dubai_communities_perfect_coordinates.csv',
+            'gis_integration/05_data_integration/final_integrated_data/comprehensive_school_profiles.csv',
+            'gis_integration/03_spatial_preparation/spatial_prepared_data/healthcare_spatial_ready.csv',
+            'gis_integration/03_spatial_preparation/spatial_prepared_data/metro_stations_spatial_ready.csv',
+            'gis_integration/04_distance_calculations/distance_results/distance_store',
+            'phase2_integration/phase2_integration/results/community_distance_store',
+            'phase2_integration/phase2_school_community_integration.py',
+            'phase2_integration/profile_schema.py',
+            'scoring'
+        ] + DISTANCE_CODE,
+        'outputs': [
+            'phase2_integration/phase2_integration/comprehensive_results/comprehensive_school_profiles_all_datasets.csv',
+            'phase2_integration/phase2_integration/comprehensive_results/comprehensive_insights.json',
+            'phase2_integration/phase2_integration/comprehensive_results/comprehensive_summary_report.md',
+            'phase2_integration/phase2_integration/comprehensive_results/school_features.csv'
+        ]
+    },
+    {
+        'name': 'corrected_insights',
+        'script': 'phase2_integration/corrected_insights.py',
+        'cwd': 'phase2_integration',
+        'inputs': [
+            'phase2_integration/phase2_integration/comprehensive_results/comprehensive_school_profiles_all_datasets.csv',
+            'phase2_integration/phase2_integration/comprehensive_results/comprehensive_insights.json',
+            'phase2_integration/profile_schema.py',
+            'scoring'
+        ],
+        'outputs': [
+            'phase2_integration/phase2_integration/comprehensive_results/corrected_insights.json',
+            'phase2_integration/phase2_integration/comprehensive_results/corrected_summary_report.md'
+        ]
+    },
+
+    # Dashboards
+    {
+        'name': 'dashboard_data',
+        'script': 'dashboard_creation/create_dashboard_data.py',
+        'inputs': ['gis_integration/05_data_integration/final_integrated_data'],
+        'outputs': ['dashboard_creation/dashboard_data', 'dashboard_creation/dashboard_creation_instructions.md']
+    },
+    {
+        'name': 'static_dashboard',
+        'script': 'phase3_dashboard/create_static_dashboard.py',
+        'inputs': [
+            'phase2_integration/phase2_integration/comprehensive_results/comprehensive_school_profiles_all_datasets.csv',
+            'phase2_integration/phase2_integration/comprehensive_results/comprehensive_insights.json',
+            'phase2_integration/profile_schema.py'
+        ],
+        'outputs': ['phase3_dashboard/static_dashboard.html']
+    }
+]
@@ -0,0 +1,56 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import pandas as pd
+
+# Cache directory, created next to the source file
+cache_dir_name = '.ingest_cache'
+
+def file_digest(path, block_size=1 << 20):
+    """SHA-256 of a file's contents, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_key(path, read_kwargs):
+    """
+    Key for a parsed file: source contents, read options and pandas version
+    (pickles are only guaranteed to load with the pandas that wrote them)
+    """
+    key = hashlib.sha256()
+    key.update(file_digest(path).encode())
+    key.update(json.dumps(read_kwargs, sort_keys=True, default=str).encode())
+    key.update(pd.__version__.encode())
+    return key.hexdigest()[:16]
+
+def read_excel_cached(path, cache_dir=None, **read_kwargs):
+    """
+    pd.read_excel(path, **read_kwargs), served from a binary cache of the
+    parsed frame while the workbook's contents are unchanged
+    """
+    path = Path(path)
+    cache_dir = Path(cache_dir) if cache_dir else path.parent / cache_dir_name
+    cached = cache_dir / f'{path.stem}-{cache_key(path, read_kwargs)}.pkl'
+    
+    if cached.exists():
+        print(f'Loaded {path} from ingest cache {cached}')
+        return pd.read_pickle(cached)
+    
+    df = pd.read_excel(path, **read_kwargs)
+    
+    # Replace any entries cached for older versions of the workbook
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for stale in cache_dir.iterdir():
+        if stale.name.startswith(f'{path.stem}-') and stale.suffix == '.pkl':
+            stale.unlink()
+    
+    # Write then rename, so a concurrent reader never sees a partial file
+    partial = cached.with_suffix(f'.{os.getpid()}.tmp')
+    df.to_pickle(partial)
+    os.replace(partial, cached)
+    print(f'Cached parsed {path} as {cached}')
+    
+    return df
@@ -0,0 +1,35 @@
+import re
+import numpy as np
+import pandas as pd
+
+class KeywordClassifier:
+    """
+    Case-insensitive "contains any keyword" test compiled into one regex
+    Results are memoized per distinct value, so classifying a column costs
+    one regex search per unseen category rather than one per row
+    """
+    
+    def __init__(self, keywords):
+        # One alternation over the lowercased keywords, matched against lowercased values
+        self.pattern = re.compile('|'.join(re.escape(k) for k in sorted({k.lower() for k in keywords})))
+        self.cache = {}
+    
+    def matches_value(self, value):
+        """Whether a single (non-missing) value contains a keyword"""
+        if value not in self.cache:
+            self.cache[value] = bool(self.pattern.search(str(value).lower()))
+        return self.cache[value]
+    
+    def matches(self, column):
+        """Boolean array: which entries of column contain a keyword"""
+        codes, uniques = pd.factorize(column)
+        # Missing values get code -1, which picks the trailing False
+        lookup = np.array([self.matches_value(value) for value in uniques] + [False], dtype=bool)
+        return lookup[codes]
+    
+    def matches_any(self, frame, columns):
+        """Boolean array: rows where any of columns contains a keyword"""
+        result = np.zeros(len(frame), dtype=bool)
+        for column in columns:
+            result |= self.matches(frame[column])
+        return result
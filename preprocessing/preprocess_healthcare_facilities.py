@@ -1,37 +1,68 @@
 import pandas as pd
 import os
+import argparse
+from keyword_classifier import KeywordClassifier
 
 # Input and output paths
 dataset_path = 'datasets/Sheryan_Facility_Detail.csv'
 output_path = 'preprocessed_datasets/Sheryan_Facility_Detail_cleaned.csv'
 
-# Read the CSV file (handle large files efficiently)
-df = pd.read_csv(dataset_path, low_memory=False)
+# Read only the columns the cleaned output needs (skips the Arabic text, address and contact fields)
+source_dtypes = {
+    'f_name_english': 'str',
+    'facility_category_name_english': 'str',
+    'facilitysubcategorynameenglish': 'str',
+    'x_coordinate': 'float64',
+    'y_coordinate': 'float64'
+}
+
+# Rows per chunk: memory stays bounded by one chunk however large the registry is
+chunksize = 50000
 
 # Define keywords to filter for hospitals/clinics
 keywords = ['hospital', 'clinic', 'polyclinic']
 
 # Filter rows where facility_category_name_english or facilitysubcategorynameenglish contains relevant keywords
-def is_healthcare(row):
-    cat = str(row['facility_category_name_english']).lower()
-    subcat = str(row['facilitysubcategorynameenglish']).lower()
-    return any(k in cat for k in keywords) or any(k in subcat for k in keywords)
-
-filtered = df[df.apply(is_healthcare, axis=1)]
-
-# Select and rename relevant columns
-filtered = filtered.rename(columns={
-    'f_name_english': 'Facility_Name',
-    'x_coordinate': 'Latitude',
-    'y_coordinate': 'Longitude',
-    'facility_category_name_english': 'Type'
-})
-filtered = filtered[['Facility_Name', 'Latitude', 'Longitude', 'Type']]
-
-# Drop rows with missing essential values
-filtered = filtered.dropna(subset=['Facility_Name', 'Latitude', 'Longitude', 'Type'])
-
-# Save cleaned data
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
-filtered.to_csv(output_path, index=False)
-print(f'Preprocessed data saved to {output_path}') 
\ No newline at end of file
+# (one compiled regex, memoized over the few dozen distinct categories across all chunks)
+healthcare_classifier = KeywordClassifier(keywords)
+
+def is_healthcare(chunk):
+    return healthcare_classifier.matches_any(chunk, ['facility_category_name_english', 'facilitysubcategorynameenglish'])
+
+def clean_chunk(chunk):
+    filtered = chunk[is_healthcare(chunk)]
+    
+    # Select and rename relevant columns
+    filtered = filtered.rename(columns={
+        'f_name_english': 'Facility_Name',
+        'x_coordinate': 'Latitude',
+        'y_coordinate': 'Longitude',
+        'facility_category_name_english': 'Type'
+    })
+    filtered = filtered[['Facility_Name', 'Latitude', 'Longitude', 'Type']]
+    
+    # Drop rows with missing essential values
+    return filtered.dropna(subset=['Facility_Name', 'Latitude', 'Longitude', 'Type'])
+
+def main(chunksize=chunksize):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    
+    # Stream the registry in chunks and append each cleaned chunk to the output
+    rows_read = rows_kept = 0
+    reader = pd.read_csv(dataset_path, usecols=list(source_dtypes), dtype=source_dtypes, chunksize=chunksize)
+    for i, chunk in enumerate(reader):
+        cleaned = clean_chunk(chunk)
+        cleaned.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        rows_read += len(chunk)
+        rows_kept += len(cleaned)
+    
+    print(f'Kept {rows_kept} of {rows_read} facilities')
+    print(f'Preprocessed data saved to {output_path}')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Clean the Sheryan healthcare facility registry')
+    parser.add_argument('--chunksize', type=int, default=chunksize,
+                        help='rows read per chunk (bounds memory for large registries)')
+    args = parser.parse_args()
+    
+    main(chunksize=args.chunksize)
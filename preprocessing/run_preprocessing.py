@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Run the four preprocessing transforms concurrently in a process pool
+The datasets are independent, so end-to-end time is bounded by the slowest
+one (the Excel and Sheryan reads) instead of their sum
+Run from the repository root: python preprocessing/run_preprocessing.py
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+import traceback
+from multiprocessing import Pool
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Dataset -> preprocessing module (each exposes main())
+TRANSFORMS = {
+    'schools': 'preprocess_private_schools',
+    'population': 'preprocess_dubai_population',
+    'metro': 'preprocess_metro_venues',
+    'healthcare': 'preprocess_healthcare_facilities'
+}
+
+def run_transform(dataset):
+    """Run one dataset's transform; returns (dataset, seconds, error traceback or None)"""
+    start = time.time()
+    try:
+        importlib.import_module(TRANSFORMS[dataset]).main()
+    except (Exception, SystemExit):
+        return dataset, time.time() - start, traceback.format_exc()
+    
+    return dataset, time.time() - start, None
+
+def run_all(datasets=None, workers=None):
+    """
+    Run the transforms for datasets (default: all) and report per-dataset timings
+    Stops at the first failure, terminating the transforms still running
+    Returns {dataset: seconds} for the transforms that completed
+    """
+    datasets = list(datasets or TRANSFORMS)
+    unknown = set(datasets) - set(TRANSFORMS)
+    if unknown:
+        raise ValueError(f"Unknown datasets: {sorted(unknown)}")
+    
+    print("🧹 PREPROCESSING: ALL DATASETS")
+    print("=" * 60)
+    
+    # The transforms use paths relative to the repository root
+    os.chdir(REPO_ROOT)
+    
+    timings = {}
+    start = time.time()
+    with Pool(processes=workers or len(datasets)) as pool:
+        for dataset, seconds, error in pool.imap_unordered(run_transform, datasets):
+            if error is not None:
+                pool.terminate()
+                print(f"❌ {dataset} failed after {seconds:.2f}s:\n{error}")
+                raise RuntimeError(f"Preprocessing failed for {dataset}")
+            
+            timings[dataset] = seconds
+            print(f"✅ {dataset}: {seconds:.2f}s")
+    
+    elapsed = time.time() - start
+    print("=" * 60)
+    print(f"⏱️ Wall time: {elapsed:.2f}s (sum of datasets: {sum(timings.values()):.2f}s, "
+          f"slowest: {max(timings, key=timings.get)})")
+    
+    return timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run all preprocessing transforms in parallel")
+    parser.add_argument('datasets', nargs='*', metavar='DATASET',
+                        help=f"datasets to preprocess: {', '.join(TRANSFORMS)} (default: all)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: one per dataset)")
+    args = parser.parse_args()
+    
+    try:
+        run_all(args.datasets, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    except RuntimeError:
+        sys.exit(1)
@@ -0,0 +1,17 @@
+"""
+Vectorized scoring engine for the school selection platform
+Score ladders (distance bands, count bonuses, multipliers, clipping) are
+declared as data in specs and evaluated over whole columns with np.digitize
+and np.select instead of row-by-row DataFrame.apply
+"""
+
+from .engine import (column_values, band_scores, tier_values, select_scores, score_ladder, score_weighted_terms,
+                     weighted_term_features)
+from .specs import (COMMUNITY_ACCESSIBILITY, HEALTHCARE_ACCESSIBILITY, METRO_ACCESSIBILITY, COMMUNITY_DENSITY,
+                    HEALTHCARE_PROXIMITY, METRO_PROXIMITY, URBAN_AMENITY)
+from .weights import DEFAULT_WEIGHTS_PATH, load_weights, weighted_sum
+from .features import FEATURE_STORE_PATH, extract_features, save_feature_store, load_feature_store, rescore
+from .sensitivity import sample_weight_vectors, rank_columns, weight_sensitivity
+from .ranking import TopKIndex, RankingIndex, top_k
+from .insights import (PHASE2_INSIGHTS, COMPREHENSIVE_INSIGHTS, InsightAggregator, metric_columns,
+                       aggregate_insights)
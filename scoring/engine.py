@@ -0,0 +1,107 @@
+"""
+Evaluate declarative score ladders over whole DataFrame columns
+"""
+
+import numpy as np
+import pandas as pd
+
+def column_values(frame, column, default=np.nan):
+    """A column as a float array, or default everywhere when the frame lacks it (like row.get)"""
+    if column in frame.columns:
+        return frame[column].to_numpy(dtype=float)
+    
+    return np.full(len(frame), default, dtype=float)
+
+def band_scores(values, bands, above):
+    """
+    Step score from ascending (upper_bound, score) bands: the first band whose
+    bound is >= value wins; values past every bound (or NaN) score above
+    """
+    bounds = np.array([bound for bound, _ in bands], dtype=float)
+    scores = np.array([score for _, score in bands] + [above], dtype=float)
+    
+    # right=True puts value == bound in that band, matching `value <= bound`
+    return scores[np.digitize(values, bounds, right=True)]
+
+def tier_values(values, tiers, default=0.0):
+    """Value of the first (min_value, result) tier with value >= min_value, else default"""
+    conditions = [values >= min_value for min_value, _ in tiers]
+    
+    return np.select(conditions, [result for _, result in tiers], default=default)
+
+def select_scores(frame, conditions, default):
+    """Score of the first (column, min_value, score) condition that holds, else default"""
+    checks = [column_values(frame, column) >= min_value for column, min_value, _ in conditions]
+    
+    return np.select(checks, [score for _, _, score in conditions], default=default)
+
+def score_ladder(frame, ladder):
+    """
+    Score every row of frame with a declared ladder:
+      base        - ('bands', column, default, bands, above), ('column', column, default)
+                    or ('select', conditions, default)
+      bonuses     - [(column, default, tiers)]: each adds its first matching tier
+      multipliers - [conditions]: each multiplies by the factor of its first matching
+                    (column, min_value, factor) condition, or 1.0
+      clip        - (low, high) bounds; round - decimals
+    """
+    kind = ladder['base'][0]
+    if kind == 'bands':
+        _, column, default, bands, above = ladder['base']
+        scores = band_scores(column_values(frame, column, default), bands, above)
+    elif kind == 'column':
+        _, column, default = ladder['base']
+        scores = column_values(frame, column, default)
+    else:
+        _, conditions, default = ladder['base']
+        scores = select_scores(frame, conditions, default)
+    
+    for column, default, tiers in ladder.get('bonuses', []):
+        scores = scores + tier_values(column_values(frame, column, default), tiers, 0.0)
+    
+    for conditions in ladder.get('multipliers', []):
+        scores = scores * select_scores(frame, conditions, 1.0)
+    
+    if 'clip' in ladder:
+        scores = np.clip(scores, *ladder['clip'])
+    if 'round' in ladder:
+        scores = np.round(scores, ladder['round'])
+    
+    return scores
+
+def score_weighted_terms(frame, spec):
+    """
+    Weighted sum of distance terms normalized as max(0, 1 - distance / max_km)
+    plus a capped bonus per counted amenity
+      terms   - [(column, max_km, weight)]
+      variety - (columns, per_item, cap); round - decimals
+    NaN distances and counts contribute 0 and the cap respectively, as max()/min() did
+    """
+    scores = np.zeros(len(frame))
+    for column, max_km, weight in spec['terms']:
+        scores += np.fmax(0.0, 1 - column_values(frame, column) / max_km) * weight
+    
+    columns, per_item, cap = spec['variety']
+    amenities = sum(column_values(frame, column) for column in columns)
+    scores += np.fmin(cap, amenities * per_item)
+    
+    if 'round' in spec:
+        scores = np.round(scores, spec['round'])
+    
+    return scores
+
+def weighted_term_features(frame, spec):
+    """
+    The per-term values score_weighted_terms sums, with their weights, so the
+    score can be reweighted as a plain linear combination
+    """
+    features, weights = {}, {}
+    for column, max_km, weight in spec['terms']:
+        features[column] = np.fmax(0.0, 1 - column_values(frame, column) / max_km)
+        weights[column] = weight
+    
+    columns, per_item, cap = spec['variety']
+    features['amenity_variety'] = np.fmin(cap, sum(column_values(frame, column) for column in columns) * per_item)
+    weights['amenity_variety'] = 1.0
+    
+    return pd.DataFrame(features, index=frame.index), weights
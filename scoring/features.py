@@ -0,0 +1,88 @@
+"""
+Per-school feature store: the ladder inputs behind the comprehensive scores,
+so new weights can be applied without rerunning the distance pipeline
+"""
+
+import pandas as pd
+from pathlib import Path
+
+from .engine import column_values, score_ladder
+from .specs import COMMUNITY_ACCESSIBILITY, HEALTHCARE_ACCESSIBILITY, METRO_ACCESSIBILITY, COMMUNITY_DENSITY
+from .weights import load_weights, weighted_sum
+
+FEATURE_STORE_PATH = (Path(__file__).resolve().parents[1] / 'phase2_integration' / 'phase2_integration' /
+                      'comprehensive_results' / 'school_features.csv')
+
+# Component scores recomputed from the stored features
+COMPONENT_LADDERS = {
+    'community_accessibility_score': COMMUNITY_ACCESSIBILITY,
+    'healthcare_accessibility_score': HEALTHCARE_ACCESSIBILITY,
+    'metro_accessibility_score': METRO_ACCESSIBILITY,
+    'community_density_score': COMMUNITY_DENSITY
+}
+
+# Upstream scores carried into the store as-is
+UPSTREAM_SCORES = ['overall_urban_score']
+
+def ladder_inputs(ladder):
+    """(column, default) for every column a ladder reads"""
+    base = ladder['base']
+    if base[0] == 'select':
+        inputs = [(column, float('nan')) for column, _, _ in base[1]]
+    else:
+        inputs = [(base[1], base[2])]
+    
+    inputs += [(column, default) for column, default, _ in ladder.get('bonuses', [])]
+    for conditions in ladder.get('multipliers', []):
+        inputs += [(column, float('nan')) for column, _, _ in conditions]
+    
+    return inputs
+
+def extract_features(profiles):
+    """Feature vectors per school, resolving missing columns to the ladder defaults"""
+    features = {'school_name': profiles['school_name'].values}
+    for ladder in COMPONENT_LADDERS.values():
+        for column, default in ladder_inputs(ladder):
+            if column not in features:
+                features[column] = column_values(profiles, column, default)
+    
+    for column in UPSTREAM_SCORES:
+        if column in profiles.columns:
+            features[column] = profiles[column].values
+    
+    return pd.DataFrame(features)
+
+def save_feature_store(features, path=FEATURE_STORE_PATH):
+    """Write the per-school feature vectors"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    features.to_csv(path, index=False)
+    
+    return path
+
+def load_feature_store(path=FEATURE_STORE_PATH):
+    """Read the per-school feature vectors"""
+    return pd.read_csv(path)
+
+def rescore(features, weights=None):
+    """
+    Component, comprehensive and final urban scores from stored features
+    weights - loaded weights (defaults from weights.json)
+    """
+    if weights is None:
+        weights = load_weights()
+    
+    scores = pd.DataFrame({'school_name': features['school_name'].values})
+    for score, ladder in COMPONENT_LADDERS.items():
+        scores[score] = score_ladder(features, ladder)
+    
+    scores['comprehensive_accessibility_score'] = weighted_sum(scores, weights['comprehensive_accessibility_score'])
+    
+    # Without the upstream urban score the comprehensive score stands alone
+    if 'overall_urban_score' in features.columns:
+        scores['overall_urban_score'] = features['overall_urban_score'].values
+        scores['final_urban_score'] = weighted_sum(scores, weights['final_urban_score'])
+    else:
+        scores['final_urban_score'] = scores['comprehensive_accessibility_score']
+    
+    return scores
@@ -0,0 +1,142 @@
+"""
+Single-pass insight aggregation: summary metrics are declared as data and
+evaluated with one NumPy reduction per column (no boolean-filtered frame
+copies). Running totals are kept so a changed school row updates every
+metric in O(metrics) instead of recomputing the whole table
+"""
+
+import numpy as np
+
+# Metric declarations: (insight_name, 'mean', column) or (insight_name, 'count_le', column, threshold)
+COMMUNITY_INSIGHTS = [
+    ('avg_nearest_community_distance', 'mean', 'nearest_community_distance_km'),
+    ('schools_within_1km_community', 'count_le', 'nearest_community_distance_km', 1.0),
+    ('schools_within_2km_community', 'count_le', 'nearest_community_distance_km', 2.0),
+    ('schools_within_5km_community', 'count_le', 'nearest_community_distance_km', 5.0),
+    ('avg_communities_within_1km', 'mean', 'communities_within_1km'),
+    ('avg_communities_within_2km', 'mean', 'communities_within_2km'),
+    ('avg_communities_within_5km', 'mean', 'communities_within_5km'),
+    ('avg_population_within_1km', 'mean', 'population_within_1km'),
+    ('avg_population_within_2km', 'mean', 'population_within_2km'),
+    ('avg_population_within_5km', 'mean', 'population_within_5km')
+]
+
+HEALTHCARE_INSIGHTS = [
+    ('avg_nearest_healthcare_distance', 'mean', 'nearest_healthcare_distance_km'),
+    ('schools_within_1km_healthcare', 'count_le', 'nearest_healthcare_distance_km', 1.0),
+    ('schools_within_2km_healthcare', 'count_le', 'nearest_healthcare_distance_km', 2.0),
+    ('schools_within_5km_healthcare', 'count_le', 'nearest_healthcare_distance_km', 5.0),
+    ('avg_healthcare_within_1km', 'mean', 'healthcare_within_1km'),
+    ('avg_healthcare_within_2km', 'mean', 'healthcare_within_2km'),
+    ('avg_healthcare_within_5km', 'mean', 'healthcare_within_5km')
+]
+
+METRO_INSIGHTS = [
+    ('avg_nearest_metro_distance', 'mean', 'nearest_metro_distance_km'),
+    ('schools_within_1km_metro', 'count_le', 'nearest_metro_distance_km', 1.0),
+    ('schools_within_2km_metro', 'count_le', 'nearest_metro_distance_km', 2.0),
+    ('schools_within_5km_metro', 'count_le', 'nearest_metro_distance_km', 5.0),
+    ('avg_metro_within_1km', 'mean', 'metro_within_1km'),
+    ('avg_metro_within_2km', 'mean', 'metro_within_2km'),
+    ('avg_metro_within_5km', 'mean', 'metro_within_5km')
+]
+
+# Phase 2 school-community insights
+PHASE2_INSIGHTS = COMMUNITY_INSIGHTS + [
+    ('avg_community_accessibility_score', 'mean', 'community_accessibility_score'),
+    ('avg_community_density_score', 'mean', 'community_density_score'),
+    ('avg_overall_community_score', 'mean', 'overall_community_score')
+]
+
+# Comprehensive (all datasets) insights
+COMPREHENSIVE_INSIGHTS = COMMUNITY_INSIGHTS + HEALTHCARE_INSIGHTS + METRO_INSIGHTS + [
+    ('avg_community_accessibility_score', 'mean', 'community_accessibility_score'),
+    ('avg_healthcare_accessibility_score', 'mean', 'healthcare_accessibility_score'),
+    ('avg_metro_accessibility_score', 'mean', 'metro_accessibility_score'),
+    ('avg_comprehensive_accessibility_score', 'mean', 'comprehensive_accessibility_score'),
+    ('avg_final_urban_score', 'mean', 'final_urban_score')
+]
+
+METRIC_KINDS = ('mean', 'count_le')
+
+def metric_columns(metrics):
+    """Columns read by a metric list, in first-use order"""
+    return list(dict.fromkeys(metric[2] for metric in metrics))
+
+class InsightAggregator:
+    """
+    Running per-column aggregates for a declared metric list
+    Each column keeps its values, NaN-skipping sum and count, and one
+    counter per declared threshold; metrics are read off those totals
+    """
+    
+    def __init__(self, metrics):
+        for metric in metrics:
+            if metric[1] not in METRIC_KINDS:
+                raise ValueError(f"Unknown metric kind '{metric[1]}' for {metric[0]}")
+        
+        self.metrics = list(metrics)
+        self.columns = metric_columns(self.metrics)
+        self.thresholds = {
+            column: np.array(sorted({metric[3] for metric in self.metrics
+                                     if metric[2] == column and metric[1] == 'count_le'}), dtype=float)
+            for column in self.columns
+        }
+        self.values = {}
+        self.sums = {}
+        self.valid_counts = {}
+        self.threshold_counts = {}
+    
+    def fit(self, frame):
+        """Aggregate every declared column of frame in one reduction per column"""
+        for column in self.columns:
+            values = frame[column].to_numpy(dtype=float, na_value=np.nan, copy=True)
+            valid = ~np.isnan(values)
+            
+            self.values[column] = values
+            # Zero-filled sum over the full column, as pandas' mean does
+            self.sums[column] = np.where(valid, values, 0.0).sum()
+            self.valid_counts[column] = int(valid.sum())
+            # NaN compares False, so missing values never count as within a threshold
+            self.threshold_counts[column] = (values[:, None] <= self.thresholds[column]).sum(axis=0)
+        
+        return self
+    
+    def update(self, position, row):
+        """
+        Replace the declared columns of the row at position (0-based) with the
+        values in row (a mapping or Series) and adjust the running totals
+        """
+        for column in self.columns:
+            if column not in row:
+                continue
+            
+            old = self.values[column][position]
+            new = float(row[column]) if row[column] is not None else np.nan
+            
+            self.sums[column] += (0.0 if np.isnan(new) else new) - (0.0 if np.isnan(old) else old)
+            self.valid_counts[column] += int(not np.isnan(new)) - int(not np.isnan(old))
+            self.threshold_counts[column] += ((new <= self.thresholds[column]).astype(int)
+                                              - (old <= self.thresholds[column]).astype(int))
+            self.values[column][position] = new
+        
+        return self.results()
+    
+    def metric_value(self, metric):
+        """Current value of one declared metric"""
+        column = metric[2]
+        
+        if metric[1] == 'mean':
+            count = self.valid_counts[column]
+            return float(self.sums[column] / count) if count else float('nan')
+        
+        index = int(np.searchsorted(self.thresholds[column], metric[3]))
+        return int(self.threshold_counts[column][index])
+    
+    def results(self):
+        """All metrics as {insight_name: value}, in declared order"""
+        return {metric[0]: self.metric_value(metric) for metric in self.metrics}
+
+def aggregate_insights(frame, metrics):
+    """Evaluate a declared metric list over frame"""
+    return InsightAggregator(metrics).fit(frame).results()
@@ -0,0 +1,86 @@
+"""
+Top-k rankings from partial sorts: each score column keeps an
+argpartition-built prefix of its sort order that grows only when a
+filtered subset needs more rows than it holds
+"""
+
+import numpy as np
+
+class TopKIndex:
+    """Partial sort order of one score column (NaN rows rank last, in row order)"""
+    
+    def __init__(self, values, ascending=True):
+        values = np.asarray(values, dtype=float)
+        self.keys = values if ascending else -values
+        self.valid = np.flatnonzero(~np.isnan(self.keys))
+        self.missing = np.flatnonzero(np.isnan(self.keys))
+        self.prefix = np.empty(0, dtype=np.intp)
+        self.depth = 0
+    
+    def _extend(self, depth):
+        """Sort the depth best rows (plus anything tied with the last) in O(n + depth log depth)"""
+        depth = min(depth, len(self.valid))
+        if depth == 0:
+            self.prefix, self.depth = np.empty(0, dtype=np.intp), 0
+            return
+        
+        valid_keys = self.keys[self.valid]
+        threshold = np.partition(valid_keys, depth - 1)[depth - 1]
+        
+        # Keep every row tied at the threshold so the prefix is an exact prefix of the stable sort
+        candidates = self.valid[valid_keys <= threshold]
+        self.prefix = candidates[np.lexsort((candidates, self.keys[candidates]))]
+        self.depth = depth if len(self.prefix) < len(self.valid) else len(self.valid)
+    
+    def top(self, k, mask=None):
+        """
+        Positions of the k best rows, best first, ties in row order
+        mask - optional boolean array restricting the ranking to a subset
+        """
+        depth = max(self.depth, k)
+        if mask is not None and depth > self.depth:
+            # Expect about k / selectivity rows of the prefix to be needed
+            depth = max(depth, int(1.5 * k * len(self.keys) / max(1, mask.sum())))
+        
+        while True:
+            if depth > self.depth:
+                self._extend(depth)
+            
+            selected = self.prefix if mask is None else self.prefix[mask[self.prefix]]
+            
+            if len(selected) >= k:
+                return selected[:k]
+            
+            # Every valid row is ranked, so pad with NaN rows as nsmallest/nlargest do
+            if len(self.prefix) >= len(self.valid):
+                missing = self.missing if mask is None else self.missing[mask[self.missing]]
+                return np.concatenate([selected, missing[:k - len(selected)]])
+            
+            depth = max(2 * depth, self.depth + 1)
+
+class RankingIndex:
+    """Top-k lookups over several score columns of one frame"""
+    
+    def __init__(self, frame, directions):
+        """directions - {column: ascending}"""
+        self.frame = frame
+        self.directions = directions
+        self.indexes = {}
+    
+    def positions(self, column, k, mask=None):
+        """Positions of the k best rows for column within an optional boolean mask"""
+        if column not in self.indexes:
+            self.indexes[column] = TopKIndex(self.frame[column].values, self.directions[column])
+        
+        if mask is not None:
+            mask = np.asarray(mask, dtype=bool)
+        
+        return self.indexes[column].top(k, mask)
+    
+    def top(self, column, k, mask=None):
+        """The k best rows for column, like nsmallest/nlargest with keep='first'"""
+        return self.frame.iloc[self.positions(column, k, mask)]
+
+def top_k(frame, column, k, ascending=True):
+    """One-off top-k rows of a frame by column"""
+    return RankingIndex(frame, {column: ascending}).top(column, k)
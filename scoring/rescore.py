@@ -0,0 +1,65 @@
+"""
+Rescore schools from the feature store with new weights
+Usage: python -m scoring.rescore [--weights my_weights.json] [--set final_urban_score.overall_urban_score=0.5]
+"""
+
+import argparse
+import time
+
+from .features import FEATURE_STORE_PATH, load_feature_store, rescore
+from .weights import load_weights
+
+def parse_overrides(assignments):
+    """{score: {input: weight}} from score.input=weight assignments"""
+    overrides = {}
+    for assignment in assignments:
+        key, _, value = assignment.partition('=')
+        score, _, column = key.partition('.')
+        try:
+            weight = float(value)
+        except ValueError:
+            weight = None
+        if not score or not column or weight is None:
+            raise ValueError(f"Invalid weight override '{assignment}', expected SCORE.INPUT=WEIGHT")
+        overrides.setdefault(score, {})[column] = weight
+    
+    return overrides
+
+def main():
+    """Recompute comprehensive and final urban scores with the requested weights"""
+    parser = argparse.ArgumentParser(description='Rescore schools from the feature store')
+    parser.add_argument('--features', default=FEATURE_STORE_PATH, help='Feature store CSV')
+    parser.add_argument('--weights', default=None, help='JSON file with weights layered over scoring/weights.json')
+    parser.add_argument('--set', action='append', default=[], metavar='SCORE.INPUT=WEIGHT',
+                        help='Override a single weight (repeatable)')
+    parser.add_argument('--output', default=None, help='Write the rescored table to this CSV')
+    parser.add_argument('--top', type=int, default=10, help='Number of top schools to print')
+    args = parser.parse_args()
+    
+    print("🧮 RESCORING SCHOOLS FROM FEATURE STORE")
+    print("=" * 60)
+    
+    start = time.perf_counter()
+    try:
+        weights = load_weights(args.weights, parse_overrides(args.set))
+    except ValueError as e:
+        parser.error(str(e))
+    features = load_feature_store(args.features)
+    scores = rescore(features, weights)
+    elapsed = time.perf_counter() - start
+    
+    print(f"✅ Rescored {len(scores)} schools in {elapsed * 1000:.1f} ms")
+    for score in ['comprehensive_accessibility_score', 'final_urban_score']:
+        terms = ', '.join(f"{column}={weight}" for column, weight in weights[score].items())
+        print(f"   - {score}: {terms}")
+    
+    print(f"\n🏆 Top {args.top} by final urban score:")
+    for i, (_, school) in enumerate(scores.nlargest(args.top, 'final_urban_score').iterrows(), 1):
+        print(f"   {i}. {school['school_name']} - {school['final_urban_score']:.3f}")
+    
+    if args.output:
+        scores.to_csv(args.output, index=False)
+        print(f"\n💾 Rescored table saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Declared score ladders: thresholds, scores and bonuses as data
+"""
+
+# Nearest-distance bands shared by the 0-5 accessibility ladders (lower is better)
+DISTANCE_BANDS_KM = [(0.5, 1.0), (1.0, 2.0), (2.0, 3.0), (5.0, 4.0)]
+
+# Community accessibility (0-5, lower is better)
+COMMUNITY_ACCESSIBILITY = {
+    'base': ('bands', 'nearest_community_distance_km', 999, DISTANCE_BANDS_KM, 5.0),
+    'bonuses': [
+        ('communities_within_1km', 0, [(3, -0.5), (1, -0.2)]),
+        ('communities_within_2km', 0, [(5, -0.3)])
+    ],
+    'clip': (1.0, 5.0)
+}
+
+# Healthcare accessibility (0-5, lower is better)
+HEALTHCARE_ACCESSIBILITY = {
+    'base': ('bands', 'nearest_healthcare_distance_km', 999, DISTANCE_BANDS_KM, 5.0),
+    'bonuses': [
+        ('healthcare_within_1km', 0, [(5, -0.5), (2, -0.2)]),
+        ('healthcare_within_2km', 0, [(10, -0.3)])
+    ],
+    'clip': (1.0, 5.0)
+}
+
+# Metro accessibility (0-5, lower is better)
+METRO_ACCESSIBILITY = {
+    'base': ('bands', 'nearest_metro_distance_km', 999, DISTANCE_BANDS_KM, 5.0),
+    'bonuses': [
+        ('metro_within_1km', 0, [(2, -0.5), (1, -0.2)]),
+        ('metro_within_2km', 0, [(3, -0.3)])
+    ],
+    'clip': (1.0, 5.0)
+}
+
+# Community density from catchment population (0-5, higher is better)
+COMMUNITY_DENSITY = {
+    'base': ('select', [
+        ('population_within_1km', 50000, 5.0),
+        ('population_within_1km', 25000, 4.0),
+        ('population_within_2km', 50000, 3.0),
+        ('population_within_5km', 100000, 2.0)
+    ], 1.0)
+}
+
+# Healthcare proximity: nearest distance with a 20% / 10% bonus for facilities within 1 / 2 km (lower is better)
+HEALTHCARE_PROXIMITY = {
+    'base': ('column', 'nearest_healthcare_distance_km', float('nan')),
+    'multipliers': [
+        [('healthcare_within_1km', 1, 0.8), ('healthcare_within_2km', 1, 0.9)]
+    ],
+    'round': 3
+}
+
+# Metro proximity: nearest distance with a 20% / 10% bonus for stations within 1 / 2 km (lower is better)
+METRO_PROXIMITY = {
+    'base': ('column', 'nearest_metro_distance_km', float('nan')),
+    'multipliers': [
+        [('metro_within_1km', 1, 0.8), ('metro_within_2km', 1, 0.9)]
+    ],
+    'round': 3
+}
+
+# Urban amenity score: normalized healthcare / metro proximity plus a capped amenity variety bonus
+URBAN_AMENITY = {
+    'terms': [
+        ('nearest_healthcare_distance_km', 10.0, 0.4),
+        ('nearest_metro_distance_km', 5.0, 0.6)
+    ],
+    'variety': (['hospitals_within_5km', 'clinics_within_5km', 'food_venues_within_5km'], 0.01, 0.2),
+    'round': 3
+}
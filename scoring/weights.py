@@ -0,0 +1,43 @@
+"""
+Scoring weights declared in weights.json: score column -> {input column: weight}
+"""
+
+import json
+from pathlib import Path
+
+DEFAULT_WEIGHTS_PATH = Path(__file__).with_name('weights.json')
+
+def load_weights(path=None, overrides=None):
+    """
+    Load the default weights, layering an optional weights file and
+    {score: {input: weight}} overrides on top
+    """
+    with open(DEFAULT_WEIGHTS_PATH) as f:
+        weights = json.load(f)
+    
+    layers = []
+    if path is not None:
+        with open(path) as f:
+            layers.append(json.load(f))
+    if overrides:
+        layers.append(overrides)
+    
+    for layer in layers:
+        for score, terms in layer.items():
+            if score not in weights:
+                raise ValueError(f"Unknown score '{score}', expected one of {sorted(weights)}")
+            for column in terms:
+                if column not in weights[score]:
+                    raise ValueError(f"Unknown input '{column}' for score '{score}', expected one of {sorted(weights[score])}")
+            weights[score] = {**weights[score], **terms}
+    
+    return weights
+
+def weighted_sum(frame, terms):
+    """Sum of frame[column] * weight over the {column: weight} terms, in declared order"""
+    total = None
+    for column, weight in terms.items():
+        term = frame[column] * weight
+        total = term if total is None else total + term
+    
+    return total